@@ -1,16 +1,32 @@
 import os
-from flask import Flask, render_template, session
+from flask import Flask, render_template, request, session, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from src.frontend.test_routes import test_bp
-from src.data.database import init_db, seed_questions
+from src.frontend.dashboard_routes import dashboard_bp
+from src.data.database import db, init_db, seed_questions
+from src.data.write_behind import group_writer
 from src.utils.cli import register_cli
+from src.utils.result_cache import result_cache
+from src.utils.fragment_cache import fragment_cache
+from src.utils.templates import init_template_cache
+from src.utils.percentiles import score_norms
+from src.utils.adaptive import adaptive_bank
+from src.utils.near_duplicates import answer_index
+from src.utils.score_matrix import score_matrix
+from src.utils.similar import similar_index
+from src.utils.metrics import metrics
+from src.utils.query_stats import query_stats
+from src.utils.profiler import request_profiler
+from src.utils.memory import memory_report, start_tracing
+from src.utils.prefork import preload
+from src.utils.warmup import init_readiness, get_readiness, warm_up
 
 # Load environment variables
 load_dotenv()
 
-def create_app(config_name=None):
-    """Create and configure the Flask application."""
+def create_app(config_name=None, test_config=None):
+    """Create and configure the Flask application, overriding the configuration with test_config if given."""
     app = Flask(__name__)
     CORS(app)
     
@@ -23,18 +39,94 @@ def create_app(config_name=None):
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URI', f'sqlite:///{db_path}')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SESSION_TYPE'] = 'filesystem'
+    app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+    app.config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', 300))
+    app.config['FRAGMENT_CACHE_BACKEND'] = os.environ.get('FRAGMENT_CACHE_BACKEND', 'memory')
+    app.config['FRAGMENT_CACHE_TTL'] = float(os.environ.get('FRAGMENT_CACHE_TTL', 600))
+    app.config['FRAGMENT_CACHE_DIR'] = os.environ.get('FRAGMENT_CACHE_DIR', os.path.join(base_dir, 'cache', 'fragments'))
+    app.config['TEMPLATE_CACHE_DIR'] = os.environ.get('TEMPLATE_CACHE_DIR', os.path.join(base_dir, 'cache', 'templates'))
+    app.config['TEMPLATE_PRELOAD'] = os.environ.get('TEMPLATE_PRELOAD', 'false').lower() == 'true'
+    app.config['MAX_BATCH_SUBMISSIONS'] = int(os.environ.get('MAX_BATCH_SUBMISSIONS', 500))
+    app.config['PASS_THRESHOLD'] = float(os.environ.get('PASS_THRESHOLD', 3.0))
+    app.config['NORMS_REFRESH_INTERVAL'] = float(os.environ.get('NORMS_REFRESH_INTERVAL', 60))
+    app.config['ADAPTIVE_TESTING'] = os.environ.get('ADAPTIVE_TESTING', 'false').lower() == 'true'
+    app.config['ADAPTIVE_SE_TARGET'] = float(os.environ.get('ADAPTIVE_SE_TARGET', 0.4))
+    app.config['ADAPTIVE_MAX_ITEMS'] = int(os.environ.get('ADAPTIVE_MAX_ITEMS', 0))
+    app.config['DUPLICATE_THRESHOLD'] = float(os.environ.get('DUPLICATE_THRESHOLD', 0.8))
+    app.config['DUPLICATE_INDEX_REFRESH_INTERVAL'] = float(os.environ.get('DUPLICATE_INDEX_REFRESH_INTERVAL', 60))
+    app.config['SCORE_MATRIX_DIR'] = os.environ.get('SCORE_MATRIX_DIR', os.path.join(base_dir, 'cache', 'score_matrix'))
+    app.config['SCORE_MATRIX_REFRESH_INTERVAL'] = float(os.environ.get('SCORE_MATRIX_REFRESH_INTERVAL', 30))
+    app.config['SIMILAR_INDEX_REBUILD_SIZE'] = int(os.environ.get('SIMILAR_INDEX_REBUILD_SIZE', 1000))
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    app.config['SQL_QUERY_STATS'] = os.environ.get('SQL_QUERY_STATS', 'false').lower() == 'true'
+    app.config['SQL_SLOW_QUERY_THRESHOLD'] = float(os.environ.get('SQL_SLOW_QUERY_THRESHOLD', 0.5))
+    app.config['SQL_REPEAT_THRESHOLD'] = int(os.environ.get('SQL_REPEAT_THRESHOLD', 5))
+    app.config['PROFILER_ENABLED'] = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    app.config['PROFILER_SAMPLE_RATE'] = float(os.environ.get('PROFILER_SAMPLE_RATE', 0.01))
+    app.config['PROFILER_SLOW_THRESHOLD'] = float(os.environ.get('PROFILER_SLOW_THRESHOLD', 1.0))
+    app.config['PROFILER_SAMPLE_INTERVAL'] = float(os.environ.get('PROFILER_SAMPLE_INTERVAL', 0.005))
+    app.config['PROFILER_MAX_FILES'] = int(os.environ.get('PROFILER_MAX_FILES', 200))
+    app.config['PROFILER_DIR'] = os.environ.get('PROFILER_DIR', os.path.join(base_dir, 'cache', 'profiles'))
+    app.config['MEMORY_DIAGNOSTICS'] = os.environ.get('MEMORY_DIAGNOSTICS', 'false').lower() == 'true'
+    app.config['MEMORY_TRACING'] = os.environ.get('MEMORY_TRACING', 'false').lower() == 'true'
+    app.config['MEMORY_TRACE_FRAMES'] = int(os.environ.get('MEMORY_TRACE_FRAMES', 25))
+    app.config['WRITE_BEHIND'] = os.environ.get('WRITE_BEHIND', 'false').lower() == 'true'
+    app.config['WRITE_BEHIND_ACK'] = os.environ.get('WRITE_BEHIND_ACK', 'commit')
+    app.config['WRITE_BEHIND_MAX_BATCH'] = int(os.environ.get('WRITE_BEHIND_MAX_BATCH', 100))
+    app.config['WRITE_BEHIND_MAX_DELAY'] = float(os.environ.get('WRITE_BEHIND_MAX_DELAY', 0.005))
+    app.config['WRITE_BEHIND_QUEUE_SIZE'] = int(os.environ.get('WRITE_BEHIND_QUEUE_SIZE', 1000))
+    app.config['WRITE_BEHIND_TIMEOUT'] = float(os.environ.get('WRITE_BEHIND_TIMEOUT', 30))
+    app.config['PREFORK'] = os.environ.get('PREFORK', 'false').lower() == 'true'
+    app.config['WARMUP'] = os.environ.get('WARMUP', str(config_name == 'production')).lower() == 'true'
+    
+    # Tests point the database and caches elsewhere before anything opens them
+    if test_config:
+        app.config.update(test_config)
+    
+    # Trace allocations from here on, so the memory report can attribute them
+    if app.config['MEMORY_TRACING']:
+        start_tracing(app.config['MEMORY_TRACE_FRAMES'])
     
     # Initialize database
     init_db(app)
     
+    # Count and time SQL statements, logging slow ones
+    with app.app_context():
+        query_stats.init_app(app, db.engine)
+    
+    # Configure the shared result view and rendered page caches
+    result_cache.init_app(app)
+    fragment_cache.init_app(app)
+    score_norms.init_app(app)
+    adaptive_bank.init_app(app)
+    answer_index.init_app(app)
+    score_matrix.init_app(app)
+    similar_index.init_app(app)
+    
+    # Time request stages when metrics are enabled
+    metrics.init_app(app)
+    
+    # Capture profiles of sampled and slow requests when profiling is enabled
+    request_profiler.init_app(app)
+    
+    # Batch submissions into group commits when write-behind is enabled
+    group_writer.init_app(app)
+    
     # Seed questions
     seed_questions(app)
     
+    # Not ready until warm-up (if enabled) has run
+    init_readiness(app)
+    
     # Register CLI commands
     register_cli(app)
     
     # Register blueprints
     app.register_blueprint(test_bp)
+    app.register_blueprint(dashboard_bp)
+    
+    # Load compiled templates from the bytecode cache
+    init_template_cache(app)
     
     # Main routes
     @app.route('/')
@@ -42,6 +134,35 @@ def create_app(config_name=None):
         """Render the main landing page"""
         return render_template('index.html')
     
+    @app.route('/healthz')
+    def health():
+        """Liveness probe: the process is up and serving requests"""
+        return jsonify({"status": "ok"})
+    
+    @app.route('/readyz')
+    def readiness():
+        """Readiness probe: the worker has warmed up and can take candidates"""
+        state = get_readiness(app)
+        return jsonify(state), 200 if state.get('ready') else 503
+    
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Prometheus metrics of this worker: requests, stage latencies, caches and the DB pool"""
+        if not metrics.enabled:
+            return jsonify({"error": "Metrics are disabled"}), 404
+        text = metrics.render(
+            caches={"results": result_cache.stats(), "fragments": fragment_cache.stats()},
+            pool=db.engine.pool
+        )
+        return text, 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+    
+    @app.route('/debug/memory')
+    def memory_endpoint():
+        """Memory of this worker by subsystem: object sizes, budgets and traced allocations"""
+        if not app.config['MEMORY_DIAGNOSTICS']:
+            return jsonify({"error": "Memory diagnostics are disabled"}), 404
+        return jsonify(memory_report(db.session, top=request.args.get('top', 10, type=int)))
+    
     # Error handlers
     @app.errorhandler(404)
     def page_not_found(e):
@@ -51,10 +172,17 @@ def create_app(config_name=None):
     def server_error(e):
         return render_template('500.html'), 500
     
+    # Exercise scoring, analysis, a rolled-back DB write and the templates
+    # before the first real candidate arrives
+    if app.config['WARMUP']:
+        warm_up(app)
+    
+    # Load the question catalog, analyzer models and templates once in the
+    # master process so pre-forked workers share them copy-on-write
+    if app.config['PREFORK']:
+        preload(app)
+    
     return app
 
-# Create the application instance
-app = create_app()
-
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    create_app().run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Gunicorn configuration for the sales aptitude test.
+
+The app is created in the master process (``preload_app``) so the question
+catalog, analyzer models and compiled templates are loaded once and shared
+copy-on-write by every worker. Set PREFORK=false to compare per-worker
+memory against workers that each build their own copy.
+"""
+
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+preload_app = os.environ.get('PREFORK', 'true').lower() == 'true'
+
+os.environ.setdefault('PREFORK', 'true' if preload_app else 'false')
+
+
+def post_fork(server, worker):
+    """Report each worker's memory right after it is forked."""
+    from src.utils.prefork import process_memory, format_memory
+    server.log.info("Worker %d memory after fork: %s", worker.pid, format_memory(process_memory()))
+
+
+def post_worker_init(worker):
+    """Report each worker's memory once the app is loaded in the worker."""
+    from src.utils.prefork import process_memory, format_memory
+    worker.log.info("Worker %d memory after init: %s", worker.pid, format_memory(process_memory()))
+
+
+def worker_exit(server, worker):
+    """Commit the submissions still queued for write-behind before the worker exits."""
+    from src.data.write_behind import group_writer
+    group_writer.close()
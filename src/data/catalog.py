@@ -0,0 +1,175 @@
+"""
+Read-only question catalog for the sales aptitude test.
+"""
+
+import json
+import threading
+
+
+class CatalogQuestion:
+    """Immutable snapshot of a question row, usable wherever a Question is scored."""
+
+    __slots__ = ('id', 'text', 'category', 'type', 'options', 'correct_index',
+                 'weight', 'min_words', 'max_words')
+
+    def __init__(self, id, text, category, type, options=None, correct_index=None,
+                 weight=1.0, min_words=None, max_words=None):
+        """
+        Initialize a catalog question.
+
+        Args:
+            id (int): Unique identifier for the question
+            text (str): The question text
+            category (str): The category or trait this question measures
+            type (str): 'likert', 'scenario' or 'open_ended'
+            options (tuple): The response options, if any
+            correct_index (int): Index of the best option for scenario questions
+            weight (float): The weight of this question in scoring
+            min_words (int): Minimum word count for open-ended responses
+            max_words (int): Maximum word count for open-ended responses
+        """
+        self.id = id
+        self.text = text
+        self.category = category
+        self.type = type
+        self.options = options
+        self.correct_index = correct_index
+        self.weight = weight
+        self.min_words = min_words
+        self.max_words = max_words
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a catalog question from a database Question row."""
+        return cls(
+            id=row.id,
+            text=row.text,
+            category=row.category,
+            type=row.type,
+            options=tuple(json.loads(row.options_json)) if row.options_json else None,
+            correct_index=row.correct_index,
+            weight=row.weight,
+            min_words=row.min_words,
+            max_words=row.max_words
+        )
+
+    def to_dict(self):
+        """Convert question to dictionary for JSON serialization."""
+        result = {
+            "id": self.id,
+            "text": self.text,
+            "category": self.category,
+            "type": self.type,
+            "weight": self.weight
+        }
+
+        if self.options is not None:
+            result["options"] = list(self.options)
+
+        if self.correct_index is not None:
+            result["correct_index"] = self.correct_index
+
+        if self.min_words:
+            result["min_words"] = self.min_words
+
+        if self.max_words:
+            result["max_words"] = self.max_words
+
+        return result
+
+
+class QuestionCatalog:
+    """
+    Process-wide snapshot of the question bank.
+
+    The catalog is loaded once (in the master process when pre-forking) and
+    never mutated afterwards, so forked workers share its pages copy-on-write.
+    The full ``/api/questions`` payload is kept pre-serialized as a single
+    bytes object.
+    """
+
+    def __init__(self):
+        """Initialize an empty catalog; it loads on first use."""
+        self._questions = None
+        self._by_id = None
+        self._payload = None
+        self._lock = threading.Lock()
+
+    def load(self, json_dumps=json.dumps):
+        """
+        Load (or reload) the catalog from the database.
+
+        Must be called inside an application context.
+
+        Args:
+            json_dumps (callable): Serializer used for the pre-built payload
+        """
+        from src.data.database import get_questions_from_db
+
+        questions = tuple(CatalogQuestion.from_row(row) for row in get_questions_from_db())
+        payload = json_dumps([q.to_dict() for q in questions]).encode('utf-8')
+
+        with self._lock:
+            self._questions = questions
+            self._by_id = {q.id: q for q in questions}
+            self._payload = payload
+
+    def _ensure_loaded(self):
+        if self._questions is None:
+            from flask import current_app
+            self.load(current_app.json.dumps)
+
+    @property
+    def loaded(self):
+        """Whether the catalog has been loaded."""
+        return self._questions is not None
+
+    @property
+    def questions(self):
+        """Tuple of all catalog questions, in database order."""
+        self._ensure_loaded()
+        return self._questions
+
+    @property
+    def payload(self):
+        """The full question list serialized as JSON bytes."""
+        self._ensure_loaded()
+        return self._payload
+
+    def get(self, question_id):
+        """
+        Get a question by ID.
+
+        Args:
+            question_id (int): ID of the question
+
+        Returns:
+            CatalogQuestion: The question, or None if not found
+        """
+        self._ensure_loaded()
+        return self._by_id.get(question_id)
+
+    def select(self, question_ids):
+        """
+        Get the questions with the given IDs, skipping unknown IDs.
+
+        Args:
+            question_ids (iterable): Question IDs
+
+        Returns:
+            list: List of CatalogQuestion objects
+        """
+        self._ensure_loaded()
+        by_id = self._by_id
+        return [by_id[qid] for qid in question_ids if qid in by_id]
+
+    def clear(self):
+        """Forget the loaded snapshot so the next use reloads it."""
+        with self._lock:
+            self._questions = None
+            self._by_id = None
+            self._payload = None
+
+
+# Shared question catalog
+question_catalog = QuestionCatalog()
@@ -3,7 +3,15 @@ Database module for the sales aptitude test.
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
 from datetime import datetime
+from src.utils.result_cache import result_cache
+from src.utils.fragment_cache import fragment_cache
+from src.utils.percentiles import score_norms, score_bin, NORM_BIN_COUNT
+from src.utils.dashboard import rollup_bin, ROLLUP_BIN_COUNT
+from src.utils.near_duplicates import answer_index, SIGNATURE_DTYPE
+from src.data.write_behind import group_writer
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
@@ -138,6 +146,207 @@ class Question(db.Model):
         return result
 
 
+class ScoreNormBin(db.Model):
+    """Histogram bin of historical scores for one category, used for percentiles."""
+    __tablename__ = 'score_norm_bins'
+    
+    category = db.Column(db.String(50), primary_key=True)
+    bin = db.Column(db.Integer, primary_key=True)  # score / NORM_BIN_WIDTH
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ScoreRollup(db.Model):
+    """Daily aggregate of one category's scores, maintained on every save."""
+    __tablename__ = 'score_rollups'
+    
+    day = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)  # Sum of scores
+    total_sq = db.Column(db.Float, nullable=False, default=0.0)  # Sum of squared scores
+    pass_count = db.Column(db.Integer, nullable=False, default=0)  # Scores >= PASS_THRESHOLD
+    
+    # Histogram of scores in bins of width 0.5 (hist_9 also holds 5.0)
+    hist_0 = db.Column(db.Integer, nullable=False, default=0)
+    hist_1 = db.Column(db.Integer, nullable=False, default=0)
+    hist_2 = db.Column(db.Integer, nullable=False, default=0)
+    hist_3 = db.Column(db.Integer, nullable=False, default=0)
+    hist_4 = db.Column(db.Integer, nullable=False, default=0)
+    hist_5 = db.Column(db.Integer, nullable=False, default=0)
+    hist_6 = db.Column(db.Integer, nullable=False, default=0)
+    hist_7 = db.Column(db.Integer, nullable=False, default=0)
+    hist_8 = db.Column(db.Integer, nullable=False, default=0)
+    hist_9 = db.Column(db.Integer, nullable=False, default=0)
+    
+    def to_dict(self):
+        """Convert rollup to dictionary for JSON serialization."""
+        return {
+            "day": self.day.isoformat(),
+            "category": self.category,
+            "count": self.count,
+            "total": self.total,
+            "total_sq": self.total_sq,
+            "pass_count": self.pass_count,
+            "histogram": [getattr(self, f'hist_{i}') for i in range(ROLLUP_BIN_COUNT)]
+        }
+
+
+class RoleProfile(db.Model):
+    """Hiring profile weighting the assessed categories for one role."""
+    __tablename__ = 'role_profiles'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+    description = db.Column(db.Text)
+    weights_json = db.Column(db.Text, nullable=False)  # Category -> weight
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @property
+    def weights(self):
+        """Get the category weights as a dictionary."""
+        import json
+        return json.loads(self.weights_json) if self.weights_json else {}
+    
+    def to_dict(self):
+        """Convert role profile to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "weights": self.weights,
+            "created_at": self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class AnswerSignature(db.Model):
+    """MinHash signature of an open-ended answer, used for near-duplicate detection."""
+    # Signatures of the earlier hash family are not comparable, so they stay in
+    # the old answer_signatures table and answers are signed again on backfill
+    __tablename__ = 'answer_signatures_v2'
+    
+    test_result_id = db.Column(db.Integer, db.ForeignKey('test_results.id'), primary_key=True)
+    question_id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)  # NUM_PERM uint32 values
+
+
+class ItemStatistic(db.Model):
+    """Psychometric statistics of one question, written by the item analysis."""
+    __tablename__ = 'item_statistics'
+    
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    category = db.Column(db.String(50), nullable=False)
+    responses = db.Column(db.Integer, nullable=False, default=0)
+    mean = db.Column(db.Float)
+    stddev = db.Column(db.Float)
+    difficulty = db.Column(db.Float)  # Mean score as a proportion of the maximum
+    discrimination = db.Column(db.Float)  # Corrected item-total correlation
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert item statistics to dictionary for JSON serialization."""
+        return {
+            "question_id": self.question_id,
+            "category": self.category,
+            "responses": self.responses,
+            "mean": self.mean,
+            "stddev": self.stddev,
+            "difficulty": self.difficulty,
+            "discrimination": self.discrimination,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class CategoryReliability(db.Model):
+    """Internal consistency of one category's items, written by the item analysis."""
+    __tablename__ = 'category_reliability'
+    
+    category = db.Column(db.String(50), primary_key=True)
+    items = db.Column(db.Integer, nullable=False, default=0)
+    alpha = db.Column(db.Float)  # Cronbach's alpha
+    mean_inter_item_correlation = db.Column(db.Float)
+    correlations_json = db.Column(db.Text)  # {"items": [...], "matrix": [[...]]}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert category reliability to dictionary for JSON serialization."""
+        import json
+        
+        return {
+            "category": self.category,
+            "items": self.items,
+            "alpha": self.alpha,
+            "mean_inter_item_correlation": self.mean_inter_item_correlation,
+            "correlations": json.loads(self.correlations_json) if self.correlations_json else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class ItemAnalysisState(db.Model):
+    """Running sums of the item analysis, so later runs only read new results."""
+    __tablename__ = 'item_analysis_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    last_result_id = db.Column(db.Integer, nullable=False, default=0)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    statistics = db.Column(db.LargeBinary, nullable=False)  # Compressed NumPy arrays
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class AttemptKey(db.Model):
+    """Key of a submitted attempt, mapped to the test result saved for it."""
+    # Keys in the old attempt_keys table carry no fingerprint to check retries against
+    __tablename__ = 'attempt_keys_v2'
+    
+    attempt_id = db.Column(db.String(64), primary_key=True)
+    test_result_id = db.Column(db.Integer, db.ForeignKey('test_results.id'), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # attempt_fingerprint() of the submission
+    response_json = db.Column(db.Text)  # Submit response, replayed to retries of the attempt
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DraftAttempt(db.Model):
+    """Autosaved answers of a test in progress, so a reloaded page can resume it."""
+    # Drafts in the old draft_attempts table are not bound to a session
+    __tablename__ = 'draft_attempts_v2'
+    
+    attempt_id = db.Column(db.String(64), primary_key=True)
+    owner = db.Column(db.String(32), nullable=False)  # Session token of the candidate
+    seq = db.Column(db.Integer, nullable=False, default=0)  # Last patch applied
+    position = db.Column(db.Integer, nullable=False, default=0)  # Question shown
+    data = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON of answers and question order
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert the draft to dictionary for JSON serialization."""
+        return {
+            "attempt_id": self.attempt_id,
+            "seq": self.seq,
+            "position": self.position,
+            **decode_draft(self.data),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+@event.listens_for(TestResult, 'after_update')
+@event.listens_for(TestResult, 'after_delete')
+def _invalidate_result_on_change(mapper, connection, target):
+    """Drop cached views of a result when it is rescored or deleted."""
+    invalidate_result_view(target.id)
+    
+    # Invalidate again once the change is committed, so a view re-cached
+    # from the old row by another thread in between does not survive
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('invalidated_results', set()).add(target.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_results_after_commit(session):
+    """Drop cached views of results changed by the committed transaction."""
+    for result_id in session.info.pop('invalidated_results', ()):
+        invalidate_result_view(result_id)
+
+
 def init_db(app):
     """Initialize the database with the Flask app."""
     db.init_app(app)
@@ -243,7 +452,8 @@ def get_user_by_email(email):
     return User.query.filter_by(email=email).first()
 
 
-def save_test_result(user_id, answers, scores, analysis, recommendations):
+def save_test_result(user_id, answers, scores, analysis, recommendations, commit=True,
+                     attempt_id=None, response_json=None):
     """
     Save a test result to the database.
     
@@ -253,11 +463,21 @@ def save_test_result(user_id, answers, scores, analysis, recommendations):
         scores (dict): Dictionary of category scores
         analysis (dict): Analysis results
         recommendations (list): List of recommendations
+        commit (bool): Commit the transaction; when False the rows are only
+            flushed and the caller owns the commit or rollback
+        attempt_id (str): Client key of the attempt, recorded as an
+            AttemptKey so retries are not saved twice
+        response_json (str): Submit response stored with the attempt key
         
     Returns:
-        TestResult: The created test result object
+        TestResult: The created test result object. With write-behind, the
+            result is saved by the group-commit writer: a detached copy is
+            returned once its batch commits, or, when submissions are
+            acknowledged on enqueue, the PendingResult (``id`` is None until
+            the batch commits)
     """
     import json
+    from sqlalchemy import delete, insert
     
     print(f"DEBUG: Saving test result - user_id: {user_id}")
     print(f"DEBUG: Scores: {scores}")
@@ -279,6 +499,31 @@ def save_test_result(user_id, answers, scores, analysis, recommendations):
     
     print(f"DEBUG: JSON strings - scores: {scores_json}, analysis: {analysis_json}")
     
+    # Hand the result to the group-commit writer when write-behind is enabled
+    # (and not shutting down)
+    pending = None
+    if commit and group_writer.enabled:
+        pending = group_writer.submit({
+            "user_id": user_id,
+            "answers": answers,
+            "scores": scores,
+            "analysis": analysis,
+            "recommendations": recommendations,
+            "attempt_id": attempt_id,
+            "response_json": response_json
+        })
+    if pending is not None:
+        if group_writer.ack == 'enqueue':
+            return pending
+        return TestResult(
+            id=pending.wait(group_writer.commit_timeout),
+            user_id=user_id,
+            overall_score=scores.get('overall', 0),
+            scores_json=scores_json,
+            analysis_json=analysis_json,
+            recommendations_json=recommendations_json
+        )
+    
     # Create test result
     test_result = TestResult(
         user_id=user_id,
@@ -293,34 +538,135 @@ def save_test_result(user_id, answers, scores, analysis, recommendations):
     
     print(f"DEBUG: Created test result with ID: {test_result.id}")
     
-    # Create answers
-    for question_id, answer_text in answers.items():
-        answer = Answer(
-            test_result_id=test_result.id,
-            question_id=int(question_id),
-            answer_text=answer_text
-        )
-        db.session.add(answer)
+    # Create answers with one multi-row INSERT rather than one per answer
+    if answers:
+        db.session.execute(insert(Answer), [
+            {"test_result_id": test_result.id, "question_id": int(question_id), "answer_text": answer_text}
+            for question_id, answer_text in answers.items()
+        ])
+    
+    # Key the result by the client's attempt ID; the primary key rejects a
+    # concurrent retry of the same attempt
+    if attempt_id:
+        db.session.execute(insert(AttemptKey), [
+            {"attempt_id": attempt_id, "test_result_id": test_result.id,
+             "fingerprint": attempt_fingerprint(user_id, answers), "response_json": response_json}
+        ])
+        db.session.execute(delete(DraftAttempt).where(DraftAttempt.attempt_id == attempt_id))
+    
+    # Count the scores in the historical norms and daily rollups within the
+    # same transaction
+    record_score_norms([scores])
+    record_score_rollups([(test_result.timestamp, scores)])
+    signatures = record_answer_signatures([(test_result.id, answers)])
+    
+    if not commit:
+        db.session.flush()
+        return test_result
+    
+    # Detach the flushed result so the commit does not expire its columns;
+    # reading them afterwards would otherwise re-select the row
+    db.session.expunge(test_result)
     
     # Commit the transaction to save everything to the database
     try:
         db.session.commit()
-        print(f"DEBUG: Successfully committed test result to database")
+        print(f"DEBUG: Successfully committed test result to database, ID: {test_result.id}")
     except Exception as e:
         db.session.rollback()
         print(f"DEBUG: Error committing test result to database: {e}")
         raise
     
-    # Verify the test result was saved
-    saved_result = TestResult.query.get(test_result.id)
-    if saved_result:
-        print(f"DEBUG: Verified test result was saved, ID: {saved_result.id}")
-    else:
-        print(f"DEBUG: Failed to verify test result was saved, ID: {test_result.id}")
+    # Update the in-process indexes only once the result is committed
+    score_norms.add(scores)
+    answer_index.add(signatures)
     
     return test_result
 
 
+def save_test_results_bulk(records, commit=True):
+    """
+    Save many scored test results with a handful of multi-row statements.
+    
+    Results and answers are inserted with executemany-style bulk INSERTs
+    (bypassing per-object unit-of-work bookkeeping) and the score norms are
+    updated with one upsert, all in a single transaction.
+    
+    Args:
+        records (list): Dicts with user_id, answers, scores, analysis,
+            recommendations and optionally a timestamp (datetime), an
+            attempt_id (recorded as an AttemptKey) and its response_json
+        commit (bool): Commit the transaction; when False the caller owns it
+        
+    Returns:
+        list: IDs of the created test results, in input order
+    """
+    import json
+    from sqlalchemy import delete, insert
+    
+    if not records:
+        return []
+    
+    now = datetime.utcnow()
+    result_rows = [
+        {
+            "user_id": record["user_id"],
+            "timestamp": record.get("timestamp") or now,
+            "overall_score": record["scores"].get("overall", 0),
+            "scores_json": json.dumps(record["scores"]),
+            "analysis_json": json.dumps(record["analysis"]),
+            "recommendations_json": json.dumps(record["recommendations"])
+        }
+        for record in records
+    ]
+    
+    try:
+        result_ids = list(db.session.scalars(
+            insert(TestResult).returning(TestResult.id, sort_by_parameter_order=True),
+            result_rows
+        ))
+        
+        answer_rows = [
+            {"test_result_id": result_id, "question_id": int(question_id), "answer_text": answer_text}
+            for result_id, record in zip(result_ids, records)
+            for question_id, answer_text in record["answers"].items()
+        ]
+        if answer_rows:
+            db.session.execute(insert(Answer), answer_rows)
+        
+        attempt_rows = [
+            {"attempt_id": record["attempt_id"], "test_result_id": result_id,
+             "fingerprint": attempt_fingerprint(record["user_id"], record["answers"]),
+             "response_json": record.get("response_json"), "created_at": now}
+            for result_id, record in zip(result_ids, records)
+            if record.get("attempt_id")
+        ]
+        if attempt_rows:
+            db.session.execute(insert(AttemptKey), attempt_rows)
+            db.session.execute(delete(DraftAttempt).where(
+                DraftAttempt.attempt_id.in_([row["attempt_id"] for row in attempt_rows])
+            ))
+        
+        record_score_norms([record["scores"] for record in records])
+        record_score_rollups([(row["timestamp"], record["scores"]) for row, record in zip(result_rows, records)])
+        signatures = record_answer_signatures(
+            [(result_id, record["answers"]) for result_id, record in zip(result_ids, records)]
+        )
+        
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    if commit:
+        for record in records:
+            score_norms.add(record["scores"])
+        answer_index.add(signatures)
+    
+    return result_ids
+
+
 def get_test_results_for_user(user_id):
     """
     Get all test results for a user.
@@ -334,6 +680,177 @@ def get_test_results_for_user(user_id):
     return TestResult.query.filter_by(user_id=user_id).order_by(TestResult.timestamp.desc()).all()
 
 
+def get_attempt_result_id(attempt_id):
+    """
+    Get the ID of the test result saved for an attempt key.
+    
+    Args:
+        attempt_id (str): Key the attempt was submitted with
+        
+    Returns:
+        int: ID of the test result, or None if none is committed yet
+    """
+    return db.session.scalar(
+        db.select(AttemptKey.test_result_id).where(AttemptKey.attempt_id == attempt_id)
+    )
+
+
+def attempt_fingerprint(user_id, answers):
+    """
+    Hash who submitted an attempt and what, so only a true retry is replayed.
+    
+    Args:
+        user_id: User ID of the submission
+        answers (dict): Question ID -> answer
+        
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    import hashlib
+    import json
+    
+    payload = json.dumps([str(user_id), answers], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_attempt(attempt_id):
+    """
+    Get the key of a committed attempt.
+    
+    Args:
+        attempt_id (str): Key the attempt was submitted with
+        
+    Returns:
+        AttemptKey: The attempt key with its result ID and stored response,
+            or None if the attempt is not committed
+    """
+    return db.session.get(AttemptKey, attempt_id)
+
+
+def encode_draft(answers, question_ids):
+    """Pack draft answers and question order into compressed JSON."""
+    import json
+    import zlib
+    
+    return zlib.compress(json.dumps({"answers": answers, "question_ids": question_ids},
+                                    separators=(',', ':')).encode('utf-8'))
+
+
+def decode_draft(data):
+    """Unpack draft answers and question order."""
+    import json
+    import zlib
+    
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+
+def get_draft(attempt_id, owner=None):
+    """
+    Get the autosaved draft of an attempt.
+    
+    Args:
+        attempt_id (str): Client key of the attempt
+        owner (str): Session token the draft must belong to (None for any)
+        
+    Returns:
+        DraftAttempt: The draft, or None if nothing was saved (by this owner)
+    """
+    draft = db.session.get(DraftAttempt, attempt_id)
+    if draft is None or (owner is not None and draft.owner != owner):
+        return None
+    return draft
+
+
+def apply_draft_patch(attempt_id, owner, seq, changes, position=None, question_ids=None):
+    """
+    Apply the answers changed since the last autosave to a draft.
+    
+    Patches carry an increasing sequence number; a patch older than the
+    draft (e.g. a delayed retry) is not applied. Concurrent patches are
+    applied atomically: the first one inserts the draft, and later ones
+    only update it if no other patch landed since it was read, re-reading
+    and merging again otherwise. Every lost race means a patch with a
+    higher sequence number committed, so this ends once the patch is
+    either applied or stale. Only the session that created a draft can
+    patch it.
+    
+    Args:
+        attempt_id (str): Client key of the attempt
+        owner (str): Session token of the candidate
+        seq (int): Sequence number of the patch
+        changes (dict): Question ID -> new answer, or None to clear it
+        position (int): Index of the question shown, if it changed
+        question_ids (list): Order of the questions served, if it changed
+        
+    Returns:
+        tuple: (DraftAttempt, whether the patch was applied); the draft is
+            None if it belongs to another session
+    """
+    from sqlalchemy import insert, update
+    from sqlalchemy.exc import IntegrityError
+    
+    while True:
+        draft = db.session.get(DraftAttempt, attempt_id)
+        if draft is not None and draft.owner != owner:
+            return None, False
+        if draft is not None and seq <= draft.seq:
+            return draft, False
+        
+        state = decode_draft(draft.data) if draft is not None else {"answers": {}, "question_ids": []}
+        answers = state["answers"]
+        for question_id, answer in changes.items():
+            if answer is None:
+                answers.pop(question_id, None)
+            else:
+                answers[question_id] = answer
+        if question_ids is not None:
+            state["question_ids"] = question_ids
+        
+        values = {"seq": seq, "data": encode_draft(answers, state["question_ids"]), "updated_at": datetime.utcnow()}
+        if position is not None:
+            values["position"] = position
+        
+        try:
+            if draft is None:
+                db.session.execute(insert(DraftAttempt).values(attempt_id=attempt_id, owner=owner, **values))
+            else:
+                updated = db.session.execute(
+                    update(DraftAttempt)
+                    .where(DraftAttempt.attempt_id == attempt_id, DraftAttempt.seq == draft.seq)
+                    .values(**values)
+                ).rowcount
+                if not updated:
+                    db.session.rollback()  # Another patch landed first
+                    continue
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another first patch inserted the draft
+            continue
+        except Exception:
+            db.session.rollback()
+            raise
+        return db.session.get(DraftAttempt, attempt_id), True
+
+
+def delete_stale_drafts(max_age_days):
+    """
+    Delete drafts of attempts abandoned before submission.
+    
+    Args:
+        max_age_days (float): Age of the last autosave after which a draft is deleted
+        
+    Returns:
+        int: Number of drafts deleted
+    """
+    from datetime import timedelta
+    from sqlalchemy import delete
+    
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    deleted = db.session.execute(delete(DraftAttempt).where(DraftAttempt.updated_at < cutoff)).rowcount
+    db.session.commit()
+    return deleted
+
+
 def get_test_result(result_id):
     """
     Get a test result by ID.
@@ -358,6 +875,503 @@ def get_test_result(result_id):
     return result
 
 
+def _load_result_view(result_id):
+    """Load and decode a test result row into a results-page view."""
+    result = db.session.get(TestResult, result_id)
+    if not result:
+        return None
+    
+    view = result.to_dict()
+    
+    # Ensure scores and analysis exist
+    if not view['scores']:
+        view['scores'] = {'overall': 0}
+    
+    if not view['analysis']:
+        view['analysis'] = {'overall_assessment': 'Assessment not available'}
+    
+    return view
+
+
+def get_result_view(result_id):
+    """
+    Get a decoded test result by ID, served from the shared result cache.
+    
+    The returned dictionary is shared between requests and must be treated
+    as read-only.
+    
+    Args:
+        result_id (int): ID of the test result
+        
+    Returns:
+        dict: The decoded result (see TestResult.to_dict), or None if not found
+    """
+    return result_cache.get_or_load(result_id, _load_result_view)
+
+
+def invalidate_result_view(result_id):
+    """
+    Drop the cached view and rendered pages of a test result.
+    
+    Args:
+        result_id (int): ID of the test result
+    """
+    result_cache.invalidate(result_id)
+    fragment_cache.invalidate(result_id)
+
+
+def record_score_norms(score_dicts):
+    """
+    Add results to the per-category score histograms in the current transaction.
+    
+    All increments are applied with one upsert statement, so concurrent
+    submissions never lose counts.
+    
+    Args:
+        score_dicts (list): Category score dictionaries, one per result
+    """
+    from collections import Counter
+    
+    increments = Counter()
+    for scores in score_dicts:
+        for category, score in scores.items():
+            if isinstance(score, (int, float)):
+                increments[(category, score_bin(score))] += 1
+    
+    if not increments:
+        return
+    
+    rows = [
+        {"category": category, "bin": bin_index, "count": count}
+        for (category, bin_index), count in increments.items()
+    ]
+    
+    _increment_rows(ScoreNormBin, rows, ['category', 'bin'])
+
+
+def _increment_rows(model, rows, key_columns):
+    """
+    Add counters to aggregate rows, creating the rows that do not exist yet.
+    
+    Uses a single INSERT ... ON CONFLICT DO UPDATE statement on SQLite and
+    PostgreSQL, so concurrent writers never lose increments.
+    
+    Args:
+        model: The aggregate model class
+        rows (list): Dicts of key column values plus the amounts to add
+            to every other column
+        key_columns (list): Names of the columns identifying a row
+    """
+    value_columns = [name for name in rows[0] if name not in key_columns]
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        # Portable fallback: update each row, inserting the ones that are missing
+        for row in rows:
+            updated = model.query.filter_by(
+                **{name: row[name] for name in key_columns}
+            ).update({
+                getattr(model, name): getattr(model, name) + row[name]
+                for name in value_columns
+            })
+            if not updated:
+                db.session.add(model(**row))
+        return
+    
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: getattr(model, name) + stmt.excluded[name] for name in value_columns}
+    )
+    db.session.execute(stmt)
+
+
+def _rollup_increments(entries, pass_threshold):
+    """Aggregate (timestamp, scores) pairs into per day and category rollup rows."""
+    aggregates = {}
+    for timestamp, scores in entries:
+        day = (timestamp or datetime.utcnow()).date()
+        for category, score in scores.items():
+            if not isinstance(score, (int, float)):
+                continue
+            row = aggregates.get((day, category))
+            if row is None:
+                row = aggregates[(day, category)] = {
+                    "day": day, "category": category,
+                    "count": 0, "total": 0.0, "total_sq": 0.0, "pass_count": 0
+                }
+                row.update({f'hist_{i}': 0 for i in range(ROLLUP_BIN_COUNT)})
+            row["count"] += 1
+            row["total"] += score
+            row["total_sq"] += score * score
+            row["pass_count"] += 1 if score >= pass_threshold else 0
+            row[f'hist_{rollup_bin(score)}'] += 1
+    return list(aggregates.values())
+
+
+def record_score_rollups(entries):
+    """
+    Add results to the daily per-category rollups in the current transaction.
+    
+    Args:
+        entries (list): (timestamp, category scores) pairs, one per result
+    """
+    from flask import current_app
+    
+    rows = _rollup_increments(entries, current_app.config.get('PASS_THRESHOLD', 3.0))
+    if rows:
+        _increment_rows(ScoreRollup, rows, ['day', 'category'])
+
+
+def get_score_rollups(since=None, until=None):
+    """
+    Get the daily rollups within a date range.
+    
+    Args:
+        since (date): First day to include
+        until (date): Last day to include
+        
+    Returns:
+        list: ScoreRollup objects ordered by day
+    """
+    query = ScoreRollup.query
+    if since is not None:
+        query = query.filter(ScoreRollup.day >= since)
+    if until is not None:
+        query = query.filter(ScoreRollup.day <= until)
+    return query.order_by(ScoreRollup.day, ScoreRollup.category).all()
+
+
+def rebuild_score_rollups(batch_size=1000):
+    """
+    Recompute the daily rollups from every stored result in a single pass.
+    
+    Args:
+        batch_size (int): Number of result rows fetched per batch
+        
+    Returns:
+        int: Number of results counted
+    """
+    import json
+    from flask import current_app
+    
+    pass_threshold = current_app.config.get('PASS_THRESHOLD', 3.0)
+    totals = {}
+    counted = 0
+    
+    rows = db.session.query(TestResult.timestamp, TestResult.scores_json).execution_options(yield_per=batch_size)
+    for timestamp, scores_json in rows:
+        if not scores_json:
+            continue
+        for row in _rollup_increments([(timestamp, json.loads(scores_json))], pass_threshold):
+            key = (row["day"], row["category"])
+            if key in totals:
+                for name, value in row.items():
+                    if name not in ("day", "category"):
+                        totals[key][name] += value
+            else:
+                totals[key] = row
+        counted += 1
+    
+    # Replace the stored rollups in one transaction
+    ScoreRollup.query.delete()
+    db.session.add_all([ScoreRollup(**row) for row in totals.values()])
+    db.session.commit()
+    
+    return counted
+
+
+def load_score_norms():
+    """
+    Load the per-category score histograms into the shared percentile tables.
+    """
+    import numpy as np
+    
+    histograms = {}
+    for category, bin_index, count in db.session.query(
+        ScoreNormBin.category, ScoreNormBin.bin, ScoreNormBin.count
+    ):
+        if category not in histograms:
+            histograms[category] = np.zeros(NORM_BIN_COUNT, dtype=np.int64)
+        histograms[category][bin_index] = count
+    
+    score_norms.set_histograms(histograms)
+
+
+def get_score_percentiles(scores):
+    """
+    Rank category scores against the historical norm group.
+    
+    Args:
+        scores (dict): Category -> score
+        
+    Returns:
+        dict: Category -> percentile (share of results scoring below, in %)
+    """
+    if score_norms.is_stale:
+        load_score_norms()
+    
+    return score_norms.percentiles(scores)
+
+
+def rebuild_score_norms(batch_size=1000):
+    """
+    Recompute the score histograms from every stored result in a single pass.
+    
+    Args:
+        batch_size (int): Number of result rows fetched per batch
+        
+    Returns:
+        int: Number of results counted
+    """
+    import json
+    import numpy as np
+    
+    histograms = {}
+    counted = 0
+    
+    rows = db.session.query(TestResult.scores_json).execution_options(yield_per=batch_size)
+    for (scores_json,) in rows:
+        if not scores_json:
+            continue
+        for category, score in json.loads(scores_json).items():
+            if not isinstance(score, (int, float)):
+                continue
+            if category not in histograms:
+                histograms[category] = np.zeros(NORM_BIN_COUNT, dtype=np.int64)
+            histograms[category][score_bin(score)] += 1
+        counted += 1
+    
+    # Replace the stored histograms in one transaction
+    ScoreNormBin.query.delete()
+    db.session.add_all([
+        ScoreNormBin(category=category, bin=int(bin_index), count=int(counts[bin_index]))
+        for category, counts in histograms.items()
+        for bin_index in np.flatnonzero(counts)
+    ])
+    db.session.commit()
+    
+    score_norms.set_histograms(histograms)
+    return counted
+
+
+def get_max_result_id():
+    """
+    Get the highest stored test result ID.
+    
+    Returns:
+        int: The ID, or None when there are no results
+    """
+    return db.session.query(db.func.max(TestResult.id)).scalar()
+
+
+def iter_result_scores(after_result_id=0, batch_size=10000):
+    """
+    Stream the decoded scores of results after a given ID, in ID order.
+    
+    Args:
+        after_result_id (int): Only results with a greater ID
+        batch_size (int): Rows fetched per database round trip
+        
+    Yields:
+        tuple: (result ID, user ID, timestamp, scores dict)
+    """
+    import json
+    
+    rows = db.session.query(
+        TestResult.id, TestResult.user_id, TestResult.timestamp, TestResult.scores_json
+    ).filter(TestResult.id > after_result_id).order_by(TestResult.id).execution_options(yield_per=batch_size)
+    
+    for result_id, user_id, timestamp, scores_json in rows:
+        yield result_id, user_id, timestamp, json.loads(scores_json) if scores_json else {}
+
+
+def create_role_profile(name, weights, description=None):
+    """
+    Create a role profile.
+    
+    Args:
+        name (str): Unique profile name
+        weights (dict): Category -> non-negative weight
+        description (str): Optional description
+        
+    Returns:
+        RoleProfile: The created profile
+    """
+    import json
+    
+    profile = RoleProfile(name=name, description=description, weights_json=json.dumps(weights))
+    db.session.add(profile)
+    db.session.commit()
+    return profile
+
+
+def record_answer_signatures(entries):
+    """
+    Store MinHash signatures of the open-ended answers of new results.
+    
+    Args:
+        entries (list): (test_result_id, answers) pairs
+        
+    Returns:
+        list: (test_result_id, question_id, signature) tuples, to add to the
+            in-process index once the transaction commits
+    """
+    from sqlalchemy import insert
+    from src.data.catalog import question_catalog
+    
+    signatures = []
+    for result_id, answers in entries:
+        for qid, answer in answers.items():
+            question = question_catalog.get(int(qid)) if str(qid).isdigit() else None
+            if question is None or question.type != 'open_ended' or not isinstance(answer, str):
+                continue
+            signature = answer_index.hasher.signature(answer)
+            if signature is not None:
+                signatures.append((result_id, int(qid), signature))
+    
+    if signatures:
+        db.session.execute(insert(AnswerSignature), [
+            {"test_result_id": result_id, "question_id": question_id, "signature": signature.tobytes()}
+            for result_id, question_id, signature in signatures
+        ])
+    return signatures
+
+
+def iter_answer_signatures(after_result_id=0, batch_size=10000):
+    """
+    Stream stored answer signatures in result order.
+    
+    Args:
+        after_result_id (int): Only signatures of results with a greater ID
+        batch_size (int): Rows fetched per database round trip
+        
+    Yields:
+        tuple: (test_result_id, question_id, signature array)
+    """
+    import numpy as np
+    
+    rows = db.session.query(
+        AnswerSignature.test_result_id, AnswerSignature.question_id, AnswerSignature.signature
+    ).filter(
+        AnswerSignature.test_result_id > after_result_id
+    ).order_by(AnswerSignature.test_result_id).execution_options(yield_per=batch_size)
+    
+    for result_id, question_id, signature in rows:
+        yield result_id, question_id, np.frombuffer(signature, dtype=SIGNATURE_DTYPE)
+
+
+def backfill_answer_signatures(batch_size=1000):
+    """
+    Compute signatures for stored open-ended answers that have none yet.
+    
+    Args:
+        batch_size (int): Answers signed per transaction
+        
+    Returns:
+        int: Number of signatures added
+    """
+    from src.data.catalog import question_catalog
+    
+    open_ended_ids = [q.id for q in question_catalog.questions if q.type == 'open_ended']
+    if not open_ended_ids:
+        return 0
+    
+    added = 0
+    after = (0, 0)  # (test_result_id, question_id) of the last answer seen
+    while True:
+        batch = db.session.query(
+            Answer.test_result_id, Answer.question_id, Answer.answer_text
+        ).outerjoin(
+            AnswerSignature,
+            (AnswerSignature.test_result_id == Answer.test_result_id)
+            & (AnswerSignature.question_id == Answer.question_id)
+        ).filter(
+            Answer.question_id.in_(open_ended_ids),
+            (Answer.test_result_id > after[0])
+            | ((Answer.test_result_id == after[0]) & (Answer.question_id > after[1])),
+            AnswerSignature.test_result_id.is_(None)
+        ).order_by(Answer.test_result_id, Answer.question_id).limit(batch_size).all()
+        
+        if not batch:
+            return added
+        
+        # Blank answers get no signature, so resume after the batch's last
+        # answer rather than relying on the anti-join alone
+        added += len(record_answer_signatures([
+            (result_id, {str(question_id): answer_text}) for result_id, question_id, answer_text in batch
+        ]))
+        db.session.commit()
+        after = (batch[-1][0], batch[-1][1])
+
+
+def update_item_analysis(full=False, max_cells=4_000_000, progress=None):
+    """
+    Bring the item analysis report up to date with the stored results.
+    
+    Only results added since the previous run are read, unless ``full`` is
+    set or the question set has changed, in which case every result is.
+    
+    Args:
+        full (bool): Discard the saved running sums and start over
+        max_cells (int): Upper bound on attempts x items held in memory at once
+        progress (callable): Called with the running sums after each chunk
+        
+    Returns:
+        ItemAnalysisAccumulator: The updated running sums
+    """
+    import json
+    from src.data.catalog import question_catalog
+    from src.utils.item_analysis import run_item_analysis
+    
+    state = db.session.get(ItemAnalysisState, 1)
+    accumulator = run_item_analysis(
+        db.session,
+        question_catalog.questions,
+        state=None if full or state is None else state.statistics,
+        max_cells=max_cells,
+        progress=progress
+    )
+    
+    if state is None:
+        state = ItemAnalysisState(id=1)
+        db.session.add(state)
+    state.last_result_id = accumulator.last_result_id
+    state.attempts = accumulator.attempts
+    state.statistics = accumulator.to_bytes()
+    state.updated_at = accumulator.analyzed_at
+    
+    # Replace the report in the same transaction as the running sums
+    ItemStatistic.query.delete()
+    CategoryReliability.query.delete()
+    db.session.add_all([
+        ItemStatistic(updated_at=accumulator.analyzed_at, **item)
+        for item in accumulator.item_statistics()
+    ])
+    db.session.add_all([
+        CategoryReliability(
+            category=category["category"],
+            items=len(category["items"]),
+            alpha=category["alpha"],
+            mean_inter_item_correlation=category["mean_inter_item_correlation"],
+            correlations_json=json.dumps({"items": category["items"], "matrix": category["correlations"]}),
+            updated_at=accumulator.analyzed_at
+        )
+        for category in accumulator.category_statistics()
+    ])
+    db.session.commit()
+    
+    # Adaptive item parameters are derived from these statistics
+    from src.utils.adaptive import adaptive_bank
+    adaptive_bank.clear()
+    
+    return accumulator
+
+
 def get_questions_from_db():
     """
     Get all questions from the database.
@@ -0,0 +1,325 @@
+"""
+Write-behind group commit for test submissions.
+
+With WRITE_BEHIND enabled, ``save_test_result`` hands its record to a
+bounded in-process queue instead of committing it. One writer thread per
+worker drains the queue, saving every WRITE_BEHIND_MAX_DELAY seconds or
+WRITE_BEHIND_MAX_BATCH records (whichever comes first) through the bulk
+write path, so a burst of submissions shares one transaction and one fsync.
+
+WRITE_BEHIND_ACK chooses when a submit is acknowledged:
+
+* ``commit``: the request waits until its batch is committed (durable, and
+  errors reach the request).
+* ``enqueue``: the request returns as soon as the record is queued; a crash
+  before the next batch commits loses it. Records carry an attempt key so
+  the results page can find the result once it lands, from any worker.
+
+The queue is drained and committed on shutdown; submissions arriving after
+that are left to the caller to save directly.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+
+
+class PendingResult:
+    """A queued submission, resolved once its batch commits."""
+
+    def __init__(self, record):
+        self.record = record
+        self.attempt_id = record["attempt_id"]
+        self._done = threading.Event()
+        self._result_id = None
+        self._error = None
+
+    def resolve(self, result_id=None, error=None):
+        """Record the outcome of the batch holding this submission."""
+        self._result_id = result_id
+        self._error = error
+        self._done.set()
+
+    def done(self):
+        """Whether the batch holding this submission has finished."""
+        return self._done.is_set()
+
+    @property
+    def id(self):
+        """ID of the saved test result, or None until it is committed."""
+        return self._result_id
+
+    def wait(self, timeout=None):
+        """
+        Wait for the submission to be committed.
+
+        Args:
+            timeout (float): Seconds to wait (None for no limit)
+
+        Returns:
+            int: ID of the saved test result
+
+        Raises:
+            TimeoutError: If the batch did not finish in time
+            Exception: The error that made saving fail
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Submission {self.attempt_id} was not committed within {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._result_id
+
+
+class GroupCommitWriter:
+    """Bounded submission queue drained by one batching writer thread."""
+
+    _STOP = object()
+
+    def __init__(self, max_batch=100, max_delay=0.005, queue_size=1000, ack='commit'):
+        """
+        Initialize a disabled writer.
+
+        Args:
+            max_batch (int): Records committed per transaction at most
+            max_delay (float): Seconds a queued record waits for more to batch with
+            queue_size (int): Queued records before submitters block
+            ack (str): ``commit`` or ``enqueue`` (see the module docstring)
+        """
+        self.enabled = False
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue_size = queue_size
+        self.ack = ack
+        self.commit_timeout = 30.0
+        self.batches = 0
+        self.committed = 0
+        self.failed = 0
+        self._app = None
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._pending = {}  # attempt key -> PendingResult, until resolved
+        self._submitting = 0  # Submits between taking the queue and putting on it
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._exit_hook = False
+
+    def init_app(self, app):
+        """
+        Configure the writer from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('WRITE_BEHIND', False)
+        app.config.setdefault('WRITE_BEHIND_MAX_BATCH', self.max_batch)
+        app.config.setdefault('WRITE_BEHIND_MAX_DELAY', self.max_delay)
+        app.config.setdefault('WRITE_BEHIND_QUEUE_SIZE', self.queue_size)
+        app.config.setdefault('WRITE_BEHIND_ACK', self.ack)
+        app.config.setdefault('WRITE_BEHIND_TIMEOUT', self.commit_timeout)
+        if app.config['WRITE_BEHIND_ACK'] not in ('commit', 'enqueue'):
+            raise ValueError(f"Unknown write-behind acknowledgement: {app.config['WRITE_BEHIND_ACK']}")
+
+        self.close()
+        self.enabled = app.config['WRITE_BEHIND']
+        self.max_batch = app.config['WRITE_BEHIND_MAX_BATCH']
+        self.max_delay = app.config['WRITE_BEHIND_MAX_DELAY']
+        self.queue_size = app.config['WRITE_BEHIND_QUEUE_SIZE']
+        self.ack = app.config['WRITE_BEHIND_ACK']
+        self.commit_timeout = app.config['WRITE_BEHIND_TIMEOUT']
+        self._app = app
+
+        if not self._exit_hook:
+            atexit.register(self.close)
+            self._exit_hook = True
+
+    def _ensure_running(self):
+        """Start the writer thread in this process (threads do not survive fork)."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._pending = {}
+        self._thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        """
+        Queue a scored submission for the next batch.
+
+        Blocks while the queue is full, so a burst larger than the queue
+        slows submitters down instead of growing memory.
+
+        Args:
+            record (dict): user_id, answers, scores, analysis, recommendations
+                and optionally attempt_id (one is generated otherwise)
+
+        Returns:
+            PendingResult: Resolved when the batch commits, or None once the
+                writer is closed (the caller saves the record itself)
+        """
+        record = dict(record, attempt_id=record.get("attempt_id") or uuid.uuid4().hex)
+        pending = PendingResult(record)
+        with self._lock:
+            if not self.enabled:
+                return None
+            self._ensure_running()
+            self._pending[pending.attempt_id] = pending
+            # Put on the queue the writer thread drains, even if it is replaced meanwhile
+            work_queue = self._queue
+            self._submitting += 1
+        try:
+            work_queue.put(pending)
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                self._idle.notify_all()
+        return pending
+
+    def pending(self, attempt_id):
+        """Get a queued submission of this worker that is not committed yet, or None."""
+        with self._lock:
+            return self._pending.get(attempt_id)
+
+    def resolve(self, attempt_id, timeout=1.0, poll_interval=0.05):
+        """
+        Find the test result saved for an attempt key.
+
+        Waits for the submission when this worker still holds it, otherwise
+        polls the attempt keys committed by any worker.
+
+        Args:
+            attempt_id (str): Key the submission was queued with
+            timeout (float): Seconds to wait for the commit
+            poll_interval (float): Seconds between lookups of other workers' commits
+
+        Returns:
+            int: ID of the saved test result, or None if it is not committed
+                (or failed) within the timeout
+        """
+        from src.data.database import get_attempt_result_id
+
+        pending = self.pending(attempt_id)
+        if pending is not None:
+            try:
+                return pending.wait(timeout)
+            except Exception:
+                return None
+
+        deadline = time.monotonic() + timeout
+        while True:
+            result_id = get_attempt_result_id(attempt_id)
+            if result_id is not None or time.monotonic() >= deadline:
+                return result_id
+            time.sleep(poll_interval)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is self._STOP:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._commit(batch)
+            if stop:
+                # Drain whatever was queued behind the stop marker
+                rest = []
+                while True:
+                    try:
+                        rest.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                rest = [item for item in rest if item is not self._STOP]
+                for start in range(0, len(rest), self.max_batch):
+                    self._commit(rest[start:start + self.max_batch])
+                return
+
+    def _commit(self, batch):
+        """Save a batch in one transaction, falling back to one record at a time."""
+        from src.data.database import save_test_results_bulk
+
+        with self._app.app_context():
+            try:
+                result_ids = save_test_results_bulk([pending.record for pending in batch])
+                outcomes = [(pending, result_id, None) for pending, result_id in zip(batch, result_ids)]
+            except Exception:
+                # One bad record must not fail the submissions batched with it
+                outcomes = []
+                for pending in batch:
+                    try:
+                        outcomes.append((pending, save_test_results_bulk([pending.record])[0], None))
+                    except Exception as e:
+                        self._app.logger.exception("Write-behind failed to save submission %s", pending.attempt_id)
+                        outcomes.append((pending, None, e))
+
+        with self._lock:
+            self.batches += 1
+            for pending, result_id, error in outcomes:
+                self._pending.pop(pending.attempt_id, None)
+                if error is None:
+                    self.committed += 1
+                else:
+                    self.failed += 1
+        for pending, result_id, error in outcomes:
+            pending.resolve(result_id, error)
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything queued so far is committed.
+
+        Args:
+            timeout (float): Seconds to wait for each queued submission
+        """
+        with self._lock:
+            waiting = list(self._pending.values())
+        for pending in waiting:
+            try:
+                pending.wait(timeout)
+            except Exception:
+                pass  # Logged by the writer; flush only waits
+
+    def close(self, timeout=30.0):
+        """Commit everything queued, stop the writer thread and disable write-behind."""
+        with self._lock:
+            self.enabled = False
+            thread, work_queue = self._thread, self._queue
+            if thread is None or self._pid != os.getpid() or not thread.is_alive():
+                self._thread = None
+                return
+            # Submits already past the enabled check land ahead of the stop marker
+            self._idle.wait_for(lambda: self._submitting == 0, timeout)
+        work_queue.put(self._STOP)
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        """Report queue depth and commit counters."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ack": self.ack,
+                "queued": len(self._pending),
+                "batches": self.batches,
+                "committed": self.committed,
+                "failed": self.failed,
+                "mean_batch": round(self.committed / self.batches, 2) if self.batches else 0.0
+            }
+
+
+# Shared write-behind writer
+group_writer = GroupCommitWriter()
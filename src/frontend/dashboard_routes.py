@@ -0,0 +1,171 @@
+"""
+Controller for the hiring manager dashboard APIs.
+"""
+
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, request, jsonify
+from src.data.question_bank import CATEGORIES
+from src.data.database import (
+    db, User, TestResult, RoleProfile, get_score_rollups, create_role_profile,
+    get_max_result_id, iter_result_scores
+)
+from src.utils.dashboard import build_dashboard
+from src.utils.score_matrix import score_matrix
+from src.utils.similar import similar_index
+
+# Create blueprint
+dashboard_bp = Blueprint('dashboard', __name__)
+
+
+@dashboard_bp.route('/api/dashboard', methods=['GET'])
+def dashboard():
+    """API endpoint with live counts, category means and daily pass-rate trends."""
+    # Get query parameters
+    days = request.args.get('days', 30, type=int)
+    days = min(max(days, 1), 366)
+    
+    until = datetime.utcnow().date()
+    since = until - timedelta(days=days - 1)
+    
+    # Read only the daily rollups, never the results themselves
+    rollups = [rollup.to_dict() for rollup in get_score_rollups(since, until)]
+    
+    payload = build_dashboard(rollups, current_app.config.get('PASS_THRESHOLD', 3.0))
+    payload.update({"since": since.isoformat(), "until": until.isoformat()})
+    
+    return jsonify(payload)
+
+
+@dashboard_bp.route('/api/roles', methods=['GET'])
+def list_roles():
+    """API endpoint listing the role profiles."""
+    return jsonify([profile.to_dict() for profile in RoleProfile.query.order_by(RoleProfile.name)])
+
+
+@dashboard_bp.route('/api/roles', methods=['POST'])
+def create_role():
+    """API endpoint creating a role profile from per-category weights."""
+    data = request.get_json(silent=True) or {}
+    name = (data.get('name') or '').strip()
+    weights = data.get('weights')
+    
+    if not name:
+        return jsonify({"error": "A name is required"}), 400
+    if not isinstance(weights, dict) or not weights:
+        return jsonify({"error": "Weights must map categories to numbers"}), 400
+    
+    unknown = sorted(set(weights) - set(CATEGORIES))
+    if unknown:
+        return jsonify({"error": f"Unknown categories: {', '.join(unknown)}"}), 400
+    if not all(isinstance(w, (int, float)) and not isinstance(w, bool) and w >= 0 for w in weights.values()) \
+            or not sum(weights.values()):
+        return jsonify({"error": "Weights must be non-negative and not all zero"}), 400
+    if RoleProfile.query.filter_by(name=name).first():
+        return jsonify({"error": "A role profile with this name already exists"}), 409
+    
+    profile = create_role_profile(name, weights, data.get('description'))
+    return jsonify(profile.to_dict()), 201
+
+
+@dashboard_bp.route('/api/roles/<int:role_id>/candidates', methods=['GET'])
+def rank_candidates(role_id):
+    """API endpoint ranking candidates by their fit to a role profile."""
+    profile = db.session.get(RoleProfile, role_id)
+    if profile is None:
+        return jsonify({"error": "Role profile not found"}), 404
+    
+    # Get query parameters
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    min_coverage = min(max(request.args.get('min_coverage', 0.5, type=float), 0.0), 1.0)
+    distinct = request.args.get('distinct', 'true').lower() != 'false'
+    try:
+        since = datetime.fromisoformat(request.args['since']) if request.args.get('since') else None
+        until = datetime.fromisoformat(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({"error": "Dates must be in ISO format"}), 400
+    
+    # Pick up results stored since the last ranking
+    score_matrix.refresh(get_max_result_id, iter_result_scores)
+    
+    total, ranked = score_matrix.rank(
+        profile.weights,
+        offset=(page - 1) * per_page,
+        limit=per_page,
+        since=since,
+        until=until,
+        user_id=request.args.get('user_id', type=int),
+        min_coverage=min_coverage,
+        distinct_users=distinct
+    )
+    
+    # Load display details for this page only
+    result_ids = [entry["result_id"] for entry in ranked]
+    details = {
+        row.id: row for row in db.session.query(
+            TestResult.id, TestResult.timestamp, TestResult.overall_score, User.username
+        ).outerjoin(User, User.id == TestResult.user_id).filter(TestResult.id.in_(result_ids))
+    }
+    
+    candidates = []
+    for rank, entry in enumerate(ranked, (page - 1) * per_page + 1):
+        row = details.get(entry["result_id"])
+        if row is None:
+            continue  # Deleted since the matrix was built
+        candidates.append(dict(
+            entry,
+            rank=rank,
+            username=row.username,
+            overall_score=row.overall_score,
+            timestamp=row.timestamp.isoformat() if row.timestamp else None
+        ))
+    
+    return jsonify({
+        "role": profile.to_dict(),
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "candidates": candidates
+    })
+
+
+@dashboard_bp.route('/api/results/<int:result_id>/similar', methods=['GET'])
+def similar_candidates(result_id):
+    """API endpoint finding the candidates whose scores most resemble a result's."""
+    k = min(max(request.args.get('k', 10, type=int), 1), 100)
+    distinct = request.args.get('distinct', 'true').lower() != 'false'
+    
+    # Pick up results stored since the last search
+    score_matrix.refresh(get_max_result_id, iter_result_scores)
+    similar_index.sync(score_matrix)
+    
+    row = score_matrix.find(result_id)
+    if row is None:
+        return jsonify({"error": "Result not found"}), 404
+    
+    _, _, meta = score_matrix.arrays()
+    neighbours = similar_index.query(score_matrix, row, k=k, distinct_users=distinct)
+    
+    # Load display details for the neighbours only
+    result_ids = [int(meta[neighbour, 0]) for neighbour, _ in neighbours]
+    details = {
+        row.id: row for row in db.session.query(
+            TestResult.id, TestResult.user_id, TestResult.timestamp, TestResult.overall_score, User.username
+        ).outerjoin(User, User.id == TestResult.user_id).filter(TestResult.id.in_(result_ids))
+    }
+    
+    candidates = []
+    for neighbour_id, (_, distance) in zip(result_ids, neighbours):
+        row = details.get(neighbour_id)
+        if row is None:
+            continue  # Deleted since the matrix was built
+        candidates.append({
+            "result_id": row.id,
+            "user_id": row.user_id,
+            "username": row.username,
+            "overall_score": row.overall_score,
+            "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+            "distance": round(distance, 4)
+        })
+    
+    return jsonify({"result_id": result_id, "k": k, "candidates": candidates})
@@ -2,11 +2,24 @@
 Controller for the test interface.
 """
 
-from flask import Blueprint, render_template, request, jsonify, session, redirect, url_for
+import re
+import secrets
+
+from flask import Blueprint, current_app, render_template, request, jsonify, session, redirect, url_for, send_from_directory
+from sqlalchemy.exc import IntegrityError
 from src.data.question_bank import CATEGORIES
-from src.data.database import get_questions_from_db, save_test_result, get_test_result
-from src.models.result_model import TestResult
+from src.data.catalog import question_catalog
+from src.data.database import save_test_result, save_test_results_bulk, get_result_view, get_score_percentiles, get_attempt
+from src.data.database import get_draft, apply_draft_patch, attempt_fingerprint
+from src.data.write_behind import group_writer
+from src.models.result_model import TestResult, calculate_scores_batch
 from src.utils.ai_analyzer import ResponseAnalyzer
+from src.utils.result_cache import result_cache
+from src.utils.fragment_cache import fragment_cache
+from src.utils.percentiles import top_percent
+from src.utils.adaptive import adaptive_bank
+from src.utils.near_duplicates import answer_index
+from src.utils.metrics import metrics
 
 # Create blueprint
 test_bp = Blueprint('test', __name__)
@@ -14,11 +27,28 @@ test_bp = Blueprint('test', __name__)
 # Initialize response analyzer
 analyzer = ResponseAnalyzer()
 
+# Ranking slots of a cached results page, filled in on every view
+RANKING_SLOT = re.compile(r'<!--rank:(\w+)-->(.*?)<!--/rank-->', re.S)
+
+# Longest open-ended answer accepted by autosave
+MAX_DRAFT_ANSWER_LENGTH = 20000
+
 
 @test_bp.route('/test')
 def test_page():
     """Render the test interface."""
-    return render_template('test.html', categories=CATEGORIES)
+    mode = request.args.get('mode')
+    adaptive = mode == 'adaptive' if mode else current_app.config.get('ADAPTIVE_TESTING', False)
+    return render_template('test.html', categories=CATEGORIES, adaptive=adaptive)
+
+
+@test_bp.route('/sw.js')
+def service_worker():
+    """Serve the test interface's service worker from the root, so its scope covers the API."""
+    response = send_from_directory(current_app.static_folder, 'js/sw.js', mimetype='application/javascript')
+    # Browsers check for a new worker on each visit; never serve a stale one
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 
 @test_bp.route('/api/questions', methods=['GET'])
@@ -28,8 +58,12 @@ def get_questions():
     num_questions = request.args.get('num_questions', type=int)
     categories = request.args.getlist('categories')
     
-    # Get questions from database
-    questions = get_questions_from_db()
+    # Serve the pre-serialized catalog when no filtering is requested
+    if not num_questions and not categories:
+        return current_app.response_class(question_catalog.payload, mimetype='application/json')
+    
+    # Get questions from the shared catalog
+    questions = list(question_catalog.questions)
     
     # Filter by category if specified
     if categories:
@@ -45,6 +79,18 @@ def get_questions():
     return jsonify(questions_dict)
 
 
+@test_bp.route('/api/adaptive/next', methods=['POST'])
+def adaptive_next_question():
+    """API endpoint returning the next question of an adaptive test."""
+    data = request.get_json(silent=True) or {}
+    answers = data.get('answers', {})
+    
+    if not isinstance(answers, dict):
+        return jsonify({"error": "Answers must be an object"}), 400
+    
+    return jsonify(adaptive_bank.next_question(answers))
+
+
 @test_bp.route('/api/submit', methods=['POST'])
 def submit_test():
     """API endpoint to submit test answers and get results."""
@@ -59,10 +105,20 @@ def submit_test():
         print("DEBUG: No answers provided")
         return jsonify({"error": "No answers provided"}), 400
     
+    # A retry of an attempt already submitted gets the stored response,
+    # without scoring and analyzing the answers again
+    attempt_id = data.get('attempt_id')
+    if attempt_id is not None and (not isinstance(attempt_id, str) or not 0 < len(attempt_id) <= 64):
+        return jsonify({"error": "Invalid attempt ID"}), 400
+    if attempt_id:
+        replay = _replay_submission(attempt_id, user_id, answers)
+        if replay is not None:
+            return replay
+    
     # Get the questions used in the test
-    question_ids = [int(qid) for qid in answers.keys()]
-    questions = get_questions_from_db()
-    test_questions = [q for q in questions if q.id in question_ids]
+    with metrics.stage('catalog'):
+        question_ids = [int(qid) for qid in answers.keys()]
+        test_questions = question_catalog.select(question_ids)
     
     print(f"DEBUG: Found {len(test_questions)} questions for the test")
     
@@ -70,72 +126,338 @@ def submit_test():
     result = TestResult(user_id, answers)
     
     # Calculate scores
-    scores = result.calculate_scores(test_questions)
+    with metrics.stage('scoring'):
+        scores = result.calculate_scores(test_questions)
     print(f"DEBUG: Calculated scores: {scores}")
     
     # Generate analysis
-    result.generate_analysis()
+    with metrics.stage('analysis'):
+        result.generate_analysis()
     print(f"DEBUG: Generated analysis: {result.analysis}")
     
     # Add AI-based analysis
-    pattern_analysis = analyzer.analyze_response_patterns(answers)
+    with metrics.stage('patterns'):
+        pattern_analysis = analyzer.analyze_response_patterns(answers)
     
     # Generate personalized feedback
-    feedback = analyzer.generate_personalized_feedback(scores, result.analysis)
+    with metrics.stage('feedback'):
+        feedback = analyzer.generate_personalized_feedback(scores, result.analysis)
     
-    # Save result to database
-    db_result = save_test_result(
-        user_id=user_id,
-        answers=answers,
-        scores=scores,
-        analysis=result.analysis,
-        recommendations=result.recommendations
-    )
+    # Flag open-ended answers copied from earlier candidates, keeping the
+    # flags with the stored analysis for reviewers
+    with metrics.stage('duplicates'):
+        duplicate_answers = answer_index.find(answers, question_catalog.get)
+    if duplicate_answers:
+        result.analysis["duplicate_answers"] = duplicate_answers
     
-    print(f"DEBUG: Saved test result to database, ID: {db_result.id}")
-    
-    # Store result ID in session for results page
-    session['test_result_id'] = db_result.id
-    print(f"DEBUG: Stored test_result_id in session: {session['test_result_id']}")
-    
-    # Return the results
+    # Build the response first so it is stored with the attempt for retries
     response = {
         "scores": scores,
         "analysis": result.analysis,
         "recommendations": result.recommendations,
         "feedback": feedback,
-        "pattern_analysis": pattern_analysis
+        "pattern_analysis": pattern_analysis,
+        "percentiles": get_score_percentiles(scores),
+        "duplicate_answers": duplicate_answers
     }
+    response_json = current_app.json.dumps(response) if attempt_id else None
+    
+    # Save result to database
+    try:
+        with metrics.stage('db_commit'):
+            db_result = save_test_result(
+                user_id=user_id,
+                answers=answers,
+                scores=scores,
+                analysis=result.analysis,
+                recommendations=result.recommendations,
+                attempt_id=attempt_id,
+                response_json=response_json
+            )
+    except IntegrityError:
+        # A concurrent retry of the same attempt was saved first
+        replay = _replay_submission(attempt_id, user_id, answers) if attempt_id else None
+        if replay is None:
+            raise
+        return replay
+    
+    print(f"DEBUG: Saved test result to database, ID: {db_result.id}")
     
+    # Store result ID in session for results page; a submission acknowledged
+    # before its write-behind batch commits is found by its attempt key
+    if db_result.id is None:
+        session.pop('test_result_id', None)
+        session['pending_attempt'] = db_result.attempt_id
+    else:
+        session.pop('pending_attempt', None)
+        session['test_result_id'] = db_result.id
+    print(f"DEBUG: Stored test_result_id in session: {session.get('test_result_id')}")
+    
+    # Return the results
+    if response_json is not None:
+        return current_app.response_class(response_json, mimetype='application/json')
     return jsonify(response)
 
 
+def _replay_submission(attempt_id, user_id, answers):
+    """
+    Build the response to a retried submission from storage.
+    
+    Only a retry by the same user with the same answers is replayed, so an
+    attempt ID alone does not reveal someone else's result.
+    
+    Args:
+        attempt_id (str): Client key of the attempt
+        user_id: User ID of the retry
+        answers (dict): Answers of the retry
+        
+    Returns:
+        Response: The stored submit response, a 409 response if the attempt
+            was submitted by someone else, or None if it was never submitted
+    """
+    fingerprint = attempt_fingerprint(user_id, answers)
+    
+    pending = group_writer.pending(attempt_id)
+    if pending is not None:
+        # Still queued for write-behind in this worker
+        if attempt_fingerprint(pending.record["user_id"], pending.record["answers"]) != fingerprint:
+            return jsonify({"error": "Attempt ID already used by another submission"}), 409
+        session.pop('test_result_id', None)
+        session['pending_attempt'] = attempt_id
+        response_json = pending.record["response_json"]
+    else:
+        attempt = get_attempt(attempt_id)
+        if attempt is None:
+            return None
+        if attempt.fingerprint != fingerprint:
+            return jsonify({"error": "Attempt ID already used by another submission"}), 409
+        session.pop('pending_attempt', None)
+        session['test_result_id'] = attempt.test_result_id
+        response_json = attempt.response_json
+    
+    current_app.logger.debug("Replaying stored response of attempt %s", attempt_id)
+    response = current_app.response_class(response_json, mimetype='application/json')
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def _draft_owner():
+    """Get the token binding this session's drafts to it, creating it on first use."""
+    if 'draft_owner' not in session:
+        session['draft_owner'] = secrets.token_hex(16)
+    return session['draft_owner']
+
+
+@test_bp.route('/api/drafts/<attempt_id>', methods=['GET'])
+def resume_draft(attempt_id):
+    """API endpoint returning the autosaved answers of a test in progress."""
+    # Drafts are only readable by the session that saved them
+    draft = get_draft(attempt_id, _draft_owner())
+    if draft is None:
+        return jsonify({"error": "Draft not found"}), 404
+    return jsonify(draft.to_dict())
+
+
+@test_bp.route('/api/drafts/<attempt_id>', methods=['PATCH'])
+def autosave_draft(attempt_id):
+    """API endpoint applying the answers changed since the last autosave."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Patch must be an object"}), 400
+    
+    seq = data.get('seq')
+    changes = data.get('changes', {})
+    position = data.get('position')
+    question_ids = data.get('question_ids')
+    
+    if len(attempt_id) > 64:
+        return jsonify({"error": "Invalid attempt ID"}), 400
+    if not isinstance(seq, int) or isinstance(seq, bool) or seq < 1:
+        return jsonify({"error": "seq must be a positive integer"}), 400
+    if not isinstance(changes, dict):
+        return jsonify({"error": "Changes must be an object"}), 400
+    for qid, answer in changes.items():
+        if not qid.isdigit() or question_catalog.get(int(qid)) is None:
+            return jsonify({"error": f"Unknown question: {qid}"}), 400
+        if answer is not None and (not isinstance(answer, str) or len(answer) > MAX_DRAFT_ANSWER_LENGTH):
+            return jsonify({"error": f"Invalid answer to question {qid}"}), 400
+    if position is not None and (not isinstance(position, int) or position < 0):
+        return jsonify({"error": "Invalid position"}), 400
+    if question_ids is not None and (not isinstance(question_ids, list)
+                                     or not all(isinstance(qid, int) for qid in question_ids)):
+        return jsonify({"error": "Invalid question IDs"}), 400
+    
+    # A patch sent after the submission must not bring the draft back
+    if get_attempt(attempt_id) is not None:
+        return jsonify({"error": "Attempt already submitted"}), 409
+    
+    draft, applied = apply_draft_patch(attempt_id, _draft_owner(), seq, changes, position, question_ids)
+    if draft is None:
+        return jsonify({"error": "Draft not found"}), 404
+    if not applied:
+        return jsonify({"error": "Stale patch", "seq": draft.seq}), 409
+    return jsonify({"seq": draft.seq})
+
+
+@test_bp.route('/api/submit/batch', methods=['POST'])
+def submit_test_batch():
+    """API endpoint to submit many attempts at once, e.g. queued by proctoring kiosks."""
+    data = request.get_json(silent=True)
+    attempts = data.get('attempts') if isinstance(data, dict) else data
+    
+    if not isinstance(attempts, list) or not attempts:
+        return jsonify({"error": "No attempts provided"}), 400
+    
+    max_batch = current_app.config.get('MAX_BATCH_SUBMISSIONS', 500)
+    if len(attempts) > max_batch:
+        return jsonify({"error": f"At most {max_batch} attempts per batch"}), 413
+    
+    default_user_id = session.get('user_id', 1)  # Default to user ID 1 if not logged in
+    items = [None] * len(attempts)
+    valid = []  # (index, user_id, answers)
+    
+    # Validate every attempt; invalid ones are reported without failing the batch
+    for index, attempt in enumerate(attempts):
+        answers = attempt.get('answers') if isinstance(attempt, dict) else None
+        if not answers or not isinstance(answers, dict):
+            items[index] = {"index": index, "error": "No answers provided"}
+            continue
+        if not all(str(qid).isdigit() for qid in answers):
+            items[index] = {"index": index, "error": "Invalid question ID"}
+            continue
+        if not all(isinstance(answer, str) for answer in answers.values()):
+            items[index] = {"index": index, "error": "Answers must be strings"}
+            continue
+        valid.append((index, attempt.get('user_id', default_user_id), answers))
+    
+    # Score every attempt in one vectorized pass
+    all_scores = calculate_scores_batch([answers for _, _, answers in valid], question_catalog.questions)
+    
+    # Analyze open-ended responses batched per category
+    open_ended_scores = _analyze_open_ended_batch(valid)
+    
+    records = []
+    for (index, user_id, answers), scores in zip(valid, all_scores):
+        result = TestResult(user_id, answers)
+        result.scores = scores
+        result.generate_analysis()
+        
+        duplicate_answers = answer_index.find(answers, question_catalog.get)
+        if duplicate_answers:
+            result.analysis["duplicate_answers"] = duplicate_answers
+        
+        records.append({
+            "user_id": user_id,
+            "answers": answers,
+            "scores": scores,
+            "analysis": result.analysis,
+            "recommendations": result.recommendations
+        })
+        items[index] = {
+            "index": index,
+            "scores": scores,
+            "analysis": result.analysis,
+            "recommendations": result.recommendations,
+            "feedback": analyzer.generate_personalized_feedback(scores, result.analysis),
+            "pattern_analysis": analyzer.analyze_response_patterns(answers),
+            "open_ended_scores": open_ended_scores.get(index, {}),
+            "duplicate_answers": duplicate_answers
+        }
+    
+    # Persist everything in one transaction
+    try:
+        result_ids = save_test_results_bulk(records)
+    except Exception:
+        current_app.logger.exception("Error saving batch submission")
+        return jsonify({"error": "Failed to save submissions"}), 500
+    
+    for (index, _, _), result_id in zip(valid, result_ids):
+        items[index]["result_id"] = result_id
+        items[index]["percentiles"] = get_score_percentiles(items[index]["scores"])
+    
+    return jsonify({
+        "results": items,
+        "saved": len(result_ids),
+        "failed": len(attempts) - len(result_ids)
+    })
+
+
+def _analyze_open_ended_batch(valid):
+    """Score the open-ended answers of many attempts with one analyzer call per category."""
+    by_category = {}
+    for index, _, answers in valid:
+        for qid, answer in answers.items():
+            question = question_catalog.get(int(qid))
+            if question and question.type == 'open_ended' and isinstance(answer, str):
+                by_category.setdefault(question.category, []).append((index, qid, answer))
+    
+    scores = {}
+    for category, entries in by_category.items():
+        values = analyzer.analyze_open_ended_responses([answer for _, _, answer in entries], category)
+        for (index, qid, _), value in zip(entries, values):
+            scores.setdefault(index, {})[qid] = value
+    return scores
+
+
+def _session_result_id():
+    """Get the ID of the result submitted in this session, or None."""
+    result_id = session.get('test_result_id')
+    
+    if not result_id and session.get('pending_attempt'):
+        result_id = group_writer.resolve(session['pending_attempt'])
+        if result_id:
+            session['test_result_id'] = result_id
+            session.pop('pending_attempt')
+    
+    return result_id
+
+
 @test_bp.route('/results')
 def results_page():
     """Render the results page."""
     # Get result ID from session
-    result_id = session.get('test_result_id')
+    result_id = _session_result_id()
     
     if not result_id:
         # No result in session, redirect to no results page
         return render_template('no_results.html')
     
-    # Get result from database
-    result = get_test_result(result_id)
+    # A saved result never changes, so repeat views are served as cached HTML
+    html = fragment_cache.get_or_render(
+        result_id,
+        current_app.jinja_env,
+        'results.html',
+        lambda: _render_results_page(result_id)
+    )
     
-    if not result:
+    if html is None:
         # Result not found, redirect to no results page
         return render_template('no_results.html')
     
-    # Convert to dictionary
-    result_dict = result.to_dict()
+    # Its rankings do change as norms grow, so they are filled in per view
+    return _fill_rankings(html, get_result_view(result_id))
+
+
+def _fill_rankings(html, result_dict):
+    """Fill the ranking slots of a results page with the current "top X%" figures, dropping unranked ones."""
+    percentiles = get_score_percentiles(result_dict['scores']) if result_dict else {}
     
-    # Ensure scores and analysis exist
-    if 'scores' not in result_dict or not result_dict['scores']:
-        result_dict['scores'] = {'overall': 0}
+    def fill(match):
+        category, slot = match.groups()
+        if category not in percentiles:
+            return ''
+        return slot.replace('<!--top-->', str(top_percent(percentiles[category])))
     
-    if 'analysis' not in result_dict or not result_dict['analysis']:
-        result_dict['analysis'] = {'overall_assessment': 'Assessment not available'}
+    return RANKING_SLOT.sub(fill, html)
+
+
+def _render_results_page(result_id):
+    """Render the results page for a result, or return None if it does not exist."""
+    # Get the decoded result (served from the result cache on refresh)
+    result_dict = get_result_view(result_id)
+    
+    if not result_dict:
+        return None
     
     # Generate feedback
     feedback = analyzer.generate_personalized_feedback(
@@ -160,4 +482,26 @@ def results_page():
         result=result_dict,
         feedback=feedback,
         categories=CATEGORIES
-    ) 
\ No newline at end of file
+    )
+
+
+@test_bp.route('/api/results/<int:result_id>', methods=['GET'])
+def get_result(result_id):
+    """API endpoint to retrieve the test result submitted in this session."""
+    # Like the results page, only the caller's own result is served
+    result_dict = get_result_view(result_id) if result_id == _session_result_id() else None
+    
+    if not result_dict:
+        return jsonify({"error": "Result not found"}), 404
+    
+    # Percentiles move as norms grow, so they are ranked on every request
+    return jsonify(dict(result_dict, percentiles=get_score_percentiles(result_dict['scores'])))
+
+
+@test_bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """API endpoint reporting hit ratios and memory use of the result caches."""
+    return jsonify({
+        "results": result_cache.stats(),
+        "fragments": fragment_cache.stats()
+    })
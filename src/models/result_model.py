@@ -4,6 +4,136 @@ Result model for the sales aptitude test.
 
 import datetime
 
+import numpy as np
+
+
+# Numeric value (1-5) of each Likert response
+LIKERT_VALUES = {
+    "Strongly Disagree": 1,
+    "Disagree": 2,
+    "Neutral": 3,
+    "Agree": 4,
+    "Strongly Agree": 5
+}
+
+
+def score_answer(question, answer):
+    """
+    Score a single answer on the 1-5 scale.
+    
+    Args:
+        question: The question answered (any object with type/options/correct_index)
+        answer: The response given
+        
+    Returns:
+        int: The score, or None if the answer does not count towards its category
+    """
+    if question.type == "likert":
+        # Convert Likert response to numeric value (1-5)
+        try:
+            return LIKERT_VALUES.get(answer)
+        except TypeError:
+            return None
+            
+    elif question.type == "scenario" and getattr(question, 'correct_index', None) is not None:
+        # Score based on whether the correct option was selected
+        try:
+            if getattr(question, 'options', None):
+                selected_index = question.options.index(answer)
+                if selected_index == question.correct_index:
+                    return 5  # Max score for correct
+                # Partial credit based on distance from correct answer
+                # (simplified scoring - could be more sophisticated)
+                distance = abs(selected_index - question.correct_index)
+                return max(5 - distance, 1)  # Minimum score of 1
+        except (ValueError, TypeError, AttributeError):
+            # Skip if answer is invalid
+            pass
+        return None
+    
+    # For open-ended questions, assign a default score of 3 (neutral)
+    elif question.type == "open_ended":
+        return 3
+    
+    return None
+
+
+def calculate_scores_batch(answer_sets, questions):
+    """
+    Calculate category scores for many attempts in one vectorized pass.
+    
+    Each answer is scored once (repeated question/answer pairs hit a lookup
+    table), then the weighted sums and weights of every (attempt, category)
+    cell are aggregated with a single ``np.bincount`` each. The result for
+    each attempt is identical to ``TestResult.calculate_scores``.
+    
+    Args:
+        answer_sets (list): One dictionary of question IDs to responses per attempt
+        questions (list): Question objects the answers refer to
+        
+    Returns:
+        list: One dictionary of category scores (plus 'overall') per attempt
+    """
+    questions_by_id = {q.id: q for q in questions}
+    categories = list(dict.fromkeys(q.category for q in questions))
+    category_index = {category: i for i, category in enumerate(categories)}
+    num_categories = max(len(categories), 1)
+    
+    cells, weighted_values, weights = [], [], []
+    seen_categories = []  # per attempt, category indexes in first-seen order
+    value_table = {}
+    
+    for attempt_index, answers in enumerate(answer_sets):
+        seen = {}
+        for question_id_str, answer in answers.items():
+            try:
+                question = questions_by_id.get(int(question_id_str))
+            except ValueError:
+                continue
+            if not question:
+                continue
+            
+            c = category_index[question.category]
+            seen.setdefault(c, None)
+            
+            key = (question.id, answer)
+            try:
+                value = value_table[key]
+            except KeyError:
+                value = value_table[key] = score_answer(question, answer)
+            except TypeError:
+                # Unhashable answer: score it without the lookup table
+                value = score_answer(question, answer)
+            if value is None:
+                continue
+            
+            weight = question.weight or 1
+            cells.append(attempt_index * num_categories + c)
+            weighted_values.append(value * weight)
+            weights.append(weight)
+        seen_categories.append(seen)
+    
+    size = len(answer_sets) * num_categories
+    sums = np.bincount(np.asarray(cells, dtype=np.int64), weights=weighted_values, minlength=size)
+    counts = np.bincount(np.asarray(cells, dtype=np.int64), weights=weights, minlength=size)
+    
+    results = []
+    for attempt_index, seen in enumerate(seen_categories):
+        scores = {}
+        for c in seen:
+            cell = attempt_index * num_categories + c
+            if counts[cell] > 0:
+                scores[categories[c]] = round(float(sums[cell]) / float(counts[cell]), 2)
+            else:
+                scores[categories[c]] = 0
+        
+        # Calculate overall score (average of category scores)
+        if scores:
+            scores["overall"] = round(sum(scores.values()) / len(scores), 2)
+        results.append(scores)
+    
+    return results
+
 
 class TestResult:
     """Class representing the results of a completed sales aptitude test."""
@@ -36,6 +166,7 @@ class TestResult:
         category_counts = {}
         
         # Process each answer
+        questions_by_id = {q.id: q for q in questions}
         for question_id_str, answer in self.answers.items():
             # Convert question_id to int
             try:
@@ -44,7 +175,7 @@ class TestResult:
                 continue
                 
             # Find the corresponding question
-            question = next((q for q in questions if q.id == question_id), None)
+            question = questions_by_id.get(question_id)
             if not question:
                 continue
                 
@@ -54,42 +185,9 @@ class TestResult:
                 category_counts[question.category] = 0
             
             # Calculate score based on question type
-            if question.type == "likert":
-                # Convert Likert response to numeric value (1-5)
-                likert_values = {
-                    "Strongly Disagree": 1,
-                    "Disagree": 2,
-                    "Neutral": 3,
-                    "Agree": 4,
-                    "Strongly Agree": 5
-                }
-                
-                if answer in likert_values:
-                    value = likert_values[answer]
-                    category_scores[question.category] += value * (question.weight or 1)
-                    category_counts[question.category] += (question.weight or 1)
-                    
-            elif question.type == "scenario" and hasattr(question, 'correct_index') and question.correct_index is not None:
-                # Score based on whether the correct option was selected
-                try:
-                    if hasattr(question, 'options') and question.options:
-                        selected_index = question.options.index(answer)
-                        if selected_index == question.correct_index:
-                            category_scores[question.category] += 5 * (question.weight or 1)  # Max score for correct
-                        else:
-                            # Partial credit based on distance from correct answer
-                            # (simplified scoring - could be more sophisticated)
-                            distance = abs(selected_index - question.correct_index)
-                            score = max(5 - distance, 1)  # Minimum score of 1
-                            category_scores[question.category] += score * (question.weight or 1)
-                        category_counts[question.category] += (question.weight or 1)
-                except (ValueError, TypeError, AttributeError):
-                    # Skip if answer is invalid
-                    pass
-            
-            # For open-ended questions, assign a default score of 3 (neutral)
-            elif question.type == "open_ended":
-                category_scores[question.category] += 3 * (question.weight or 1)
+            value = score_answer(question, answer)
+            if value is not None:
+                category_scores[question.category] += value * (question.weight or 1)
                 category_counts[question.category] += (question.weight or 1)
         
         # Calculate average scores for each category
@@ -0,0 +1,249 @@
+"""
+Computerized adaptive testing for the sales aptitude test.
+
+Every Likert and keyed scenario item is modelled with a graded response
+model on the 1-5 score scale, one latent ability per category. Category
+response probabilities and item information are precomputed once over a
+fixed ability grid, so updating an ability estimate is a sum of table rows
+and choosing the next item is a single matrix-vector product and argmax.
+"""
+
+import threading
+
+import numpy as np
+
+from src.models.result_model import score_answer
+
+
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+SCORE_LEVELS = 5  # Item scores 1-5
+
+# Thresholds of an average item, relative to its location
+DEFAULT_THRESHOLDS = np.array([-1.5, -0.5, 0.5, 1.5])
+DEFAULT_DISCRIMINATION = 1.0
+
+
+def item_parameters(statistics=None):
+    """
+    Approximate graded response parameters from classical item statistics.
+
+    Discrimination comes from the item-total correlation (the usual normal
+    ogive conversion) and location from the mean score; items not analyzed
+    yet get average parameters.
+
+    Args:
+        statistics (dict): Item statistics (see ItemStatistic.to_dict), or None
+
+    Returns:
+        tuple: (discrimination, array of SCORE_LEVELS - 1 thresholds)
+    """
+    discrimination = DEFAULT_DISCRIMINATION
+    location = 0.0
+
+    if statistics:
+        r = statistics.get("discrimination")
+        if r is not None and 0 < r < 1:
+            discrimination = float(np.clip(1.702 * r / np.sqrt(1 - r * r), 0.3, 3.0))
+        if statistics.get("mean") is not None:
+            location = 3.0 - statistics["mean"]
+
+    return discrimination, DEFAULT_THRESHOLDS + location
+
+
+def grm_tables(discrimination, thresholds, grid=THETA_GRID):
+    """
+    Tabulate a graded response item over an ability grid.
+
+    Args:
+        discrimination (float): Item discrimination
+        thresholds (ndarray): Ordered category thresholds
+        grid (ndarray): Ability values
+
+    Returns:
+        tuple: (grid x levels response probabilities, grid item information)
+    """
+    # Probability of scoring at or above each level; level 1 is certain
+    above = 1.0 / (1.0 + np.exp(-discrimination * (grid[:, None] - thresholds[None, :])))
+    cumulative = np.hstack([np.ones((len(grid), 1)), above, np.zeros((len(grid), 1))])
+
+    probabilities = np.clip(cumulative[:, :-1] - cumulative[:, 1:], 1e-12, 1.0)
+    slopes = cumulative * (1.0 - cumulative)
+    information = discrimination ** 2 * (((slopes[:, :-1] - slopes[:, 1:]) ** 2) / probabilities).sum(axis=1)
+
+    return probabilities, information
+
+
+class AdaptiveItemBank:
+    """Precomputed item tables and the next-question rule of adaptive mode."""
+
+    def __init__(self, se_target=0.4, max_items=0):
+        """
+        Initialize an empty bank; it builds on first use.
+
+        Args:
+            se_target (float): Standard error at which a category is measured
+            max_items (int): Cap on scored items per attempt (0 for none)
+        """
+        self.se_target = se_target
+        self.max_items = max_items
+        self._tables = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the bank from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('ADAPTIVE_SE_TARGET', self.se_target)
+        app.config.setdefault('ADAPTIVE_MAX_ITEMS', self.max_items)
+        self.se_target = app.config['ADAPTIVE_SE_TARGET']
+        self.max_items = app.config['ADAPTIVE_MAX_ITEMS']
+        self.clear()
+
+    def build(self, questions, statistics=None):
+        """
+        Precompute the response and information tables of every scored item.
+
+        Args:
+            questions (iterable): Question catalog
+            statistics (dict): Question ID -> item statistics, if analyzed
+        """
+        statistics = statistics or {}
+        items = [
+            q for q in questions
+            if q.type == "likert" or (q.type == "scenario" and q.correct_index is not None)
+        ]
+        categories = list(dict.fromkeys(q.category for q in items))
+        category_index = {category: i for i, category in enumerate(categories)}
+
+        log_probabilities = np.empty((len(items), len(THETA_GRID), SCORE_LEVELS), dtype=np.float32)
+        information = np.empty((len(items), len(THETA_GRID)), dtype=np.float32)
+        for i, question in enumerate(items):
+            probabilities, info = grm_tables(*item_parameters(statistics.get(question.id)))
+            log_probabilities[i] = np.log(probabilities)
+            information[i] = info
+
+        tables = {
+            "items": items,
+            "row": {q.id: i for i, q in enumerate(items)},
+            "item_category": np.array([category_index[q.category] for q in items], dtype=np.int64),
+            "categories": categories,
+            "log_probabilities": log_probabilities,
+            "information": information,
+            "log_prior": -0.5 * THETA_GRID ** 2,
+            "open_ended": [q for q in questions if q.type == "open_ended"]
+        }
+
+        with self._lock:
+            self._tables = tables
+
+    def _ensure_built(self):
+        if self._tables is None:
+            from src.data.catalog import question_catalog
+            from src.data.database import ItemStatistic
+
+            statistics = {item.question_id: item.to_dict() for item in ItemStatistic.query}
+            self.build(question_catalog.questions, statistics)
+        return self._tables
+
+    def estimate(self, answers):
+        """
+        Estimate every category's ability from the answers so far.
+
+        Args:
+            answers (dict): Question ID -> response
+
+        Returns:
+            tuple: (categories x grid posterior, answered item rows)
+        """
+        tables = self._ensure_built()
+        items = tables["items"]
+
+        rows, levels = [], []
+        for qid, answer in answers.items():
+            row = tables["row"].get(int(qid)) if str(qid).isdigit() else None
+            if row is None:
+                continue
+            score = score_answer(items[row], answer)
+            if score is not None:
+                rows.append(row)
+                levels.append(int(score) - 1)
+
+        rows = np.array(rows, dtype=np.int64)
+        log_posterior = np.tile(tables["log_prior"], (len(tables["categories"]), 1))
+        if len(rows):
+            np.add.at(log_posterior, tables["item_category"][rows],
+                      tables["log_probabilities"][rows, :, np.array(levels)])
+
+        posterior = np.exp(log_posterior - log_posterior.max(axis=1, keepdims=True))
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        return posterior, rows
+
+    def next_question(self, answers):
+        """
+        Choose the next question of an adaptive attempt.
+
+        The category measured least precisely gets its most informative
+        unanswered item (expected information under the current posterior).
+        Once every category reaches the target precision, runs out of items
+        or the item cap is hit, the open-ended questions follow, since they
+        feed the written analysis rather than the ability estimates.
+
+        Args:
+            answers (dict): Question ID -> response so far
+
+        Returns:
+            dict: The next question (None when done), ability estimates,
+                completion flag and progress
+        """
+        tables = self._ensure_built()
+        posterior, rows = self.estimate(answers)
+        answered_ids = {str(qid) for qid in answers}
+
+        theta = posterior @ THETA_GRID
+        se = np.sqrt(np.maximum(posterior @ THETA_GRID ** 2 - theta ** 2, 0.0))
+
+        answered = np.zeros(len(tables["items"]), dtype=bool)
+        answered[rows] = True
+        remaining = np.bincount(tables["item_category"][~answered], minlength=len(tables["categories"]))
+        open_category = (se > self.se_target) & (remaining > 0)
+        capped = bool(self.max_items) and len(rows) >= self.max_items
+
+        question = None
+        if open_category.any() and not capped:
+            category = int(np.argmax(np.where(open_category, se, -np.inf)))
+            candidates = np.flatnonzero((tables["item_category"] == category) & ~answered)
+            expected_information = tables["information"][candidates] @ posterior[category]
+            question = tables["items"][candidates[int(np.argmax(expected_information))]]
+        else:
+            question = next((q for q in tables["open_ended"] if str(q.id) not in answered_ids), None)
+
+        finished = len(tables["categories"]) if capped else int((~open_category).sum())
+        open_ended_done = sum(1 for q in tables["open_ended"] if str(q.id) in answered_ids)
+        total = len(tables["categories"]) + len(tables["open_ended"])
+
+        return {
+            "question": question.to_dict() if question is not None else None,
+            "done": question is None,
+            "answered": len(answers),
+            "progress": round((finished + open_ended_done) / total, 3) if total else 1.0,
+            "estimates": {
+                category: {
+                    "theta": round(float(theta[i]), 3),
+                    "se": round(float(se[i]), 3),
+                    "answered": int((tables["item_category"][rows] == i).sum())
+                }
+                for i, category in enumerate(tables["categories"])
+            }
+        }
+
+    def clear(self):
+        """Drop the tables so the next use rebuilds them, e.g. after an item analysis."""
+        with self._lock:
+            self._tables = None
+
+
+# Shared adaptive item bank
+adaptive_bank = AdaptiveItemBank()
@@ -33,10 +33,18 @@ class ResponseAnalyzer:
             ]
         }
         
+        # Fit one vocabulary over all reference responses, so every
+        # category's vectors share the space responses are transformed into
+        self.vectorizer.fit([
+            response
+            for responses in self.reference_responses.values()
+            for response in responses
+        ])
+        
         # Vectorize reference responses
         self.reference_vectors = {}
         for category, responses in self.reference_responses.items():
-            self.reference_vectors[category] = self.vectorizer.fit_transform(responses)
+            self.reference_vectors[category] = self.vectorizer.transform(responses)
     
     def analyze_open_ended_response(self, response, category):
         """
@@ -67,6 +75,38 @@ class ResponseAnalyzer:
         
         return round(score, 2)
     
+    def analyze_open_ended_responses(self, responses, category):
+        """
+        Analyze many open-ended responses to the same category at once.
+        
+        All responses are vectorized with one transform and compared to the
+        category's references with one similarity computation; each score
+        equals what analyze_open_ended_response would return.
+        
+        Args:
+            responses (list): The users' response texts
+            category (str): The category being assessed
+            
+        Returns:
+            list: Scores between 1 and 5, one per response
+        """
+        if not responses:
+            return []
+        
+        if category not in self.reference_vectors:
+            return [3.0] * len(responses)  # Default neutral score
+        
+        # Vectorize all responses together
+        response_vectors = self.vectorizer.transform([response or "" for response in responses])
+        
+        # Best similarity of each response to the reference responses
+        max_similarities = cosine_similarity(response_vectors, self.reference_vectors[category]).max(axis=1)
+        
+        return [
+            round(float(1 + similarity * 4), 2) if response else 3.0
+            for response, similarity in zip(responses, max_similarities)
+        ]
+    
     def analyze_response_patterns(self, answers):
         """
         Analyze patterns in responses to detect inconsistencies or response biases.
@@ -0,0 +1,244 @@
+"""
+Bulk offline scoring import for the sales aptitude test.
+
+Assessment centres deliver attempts as JSON Lines files with one
+``{"user": ..., "answers": {...}}`` record per line (optionally with a
+``timestamp``). Records are read as a stream, scored and analyzed in a pool
+of worker processes, and committed in batches through the bulk write path.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+from src.models.result_model import TestResult
+
+
+# Per-process state of pool workers, set by _init_worker
+_worker_questions = None
+_worker_analyzer = None
+
+
+def _init_worker(questions):
+    """Initialize a pool worker with the question catalog and its own analyzer."""
+    global _worker_questions, _worker_analyzer
+    from src.utils.ai_analyzer import ResponseAnalyzer
+
+    _worker_questions = {q.id: q for q in questions}
+    _worker_analyzer = ResponseAnalyzer()
+
+
+def score_attempt(user_id, answers, questions_by_id, analyzer):
+    """
+    Score and analyze one attempt the same way a web submission is.
+
+    Args:
+        user_id (int): ID of the user who took the test
+        answers (dict): Dictionary mapping question IDs to responses
+        questions_by_id (dict): Question ID -> question
+        analyzer (ResponseAnalyzer): Analyzer for response patterns
+
+    Returns:
+        dict: Record ready for save_test_results_bulk (without a timestamp)
+    """
+    test_questions = [
+        questions_by_id[int(qid)] for qid in answers
+        if str(qid).isdigit() and int(qid) in questions_by_id
+    ]
+
+    result = TestResult(user_id, answers)
+    result.calculate_scores(test_questions)
+    result.generate_analysis()
+
+    # Offline imports have no response to return the pattern analysis in,
+    # so it is stored with the analysis
+    result.analysis["pattern_analysis"] = analyzer.analyze_response_patterns(answers)
+
+    return {
+        "user_id": user_id,
+        "answers": answers,
+        "scores": result.scores,
+        "analysis": result.analysis,
+        "recommendations": result.recommendations
+    }
+
+
+def _score_chunk(chunk):
+    """Score a chunk of (line number, user ID, answers, timestamp) tuples in a worker."""
+    scored = []
+    for line_no, user_id, answers, timestamp in chunk:
+        try:
+            record = score_attempt(user_id, answers, _worker_questions, _worker_analyzer)
+        except Exception as e:
+            scored.append((line_no, None, f"{type(e).__name__}: {e}"))
+            continue
+        record["timestamp"] = timestamp
+        scored.append((line_no, record, None))
+    return scored
+
+
+def iter_attempts(path, resolve_user):
+    """
+    Stream and validate attempt records from a JSON Lines file.
+
+    Args:
+        path (str): Path of the JSON Lines file
+        resolve_user (callable): Maps a record's ``user`` value to a user ID or None
+
+    Yields:
+        tuple: (line number, user ID, answers, timestamp, error); error is
+            None for valid records and a message for rejected ones
+    """
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, None, None, f"Invalid JSON: {e}"
+                continue
+
+            answers = record.get("answers") if isinstance(record, dict) else None
+            if not answers or not isinstance(answers, dict):
+                yield line_no, None, None, None, "No answers provided"
+                continue
+            bad_key = next((qid for qid in answers if not qid.isdigit()), None)
+            if bad_key is not None:
+                yield line_no, None, None, None, f"Invalid question ID: {bad_key!r}"
+                continue
+            bad_answer = next((qid for qid, answer in answers.items() if not isinstance(answer, str)), None)
+            if bad_answer is not None:
+                yield line_no, None, None, None, f"Invalid answer to question {bad_answer}"
+                continue
+
+            user_id = resolve_user(record.get("user", record.get("user_id")))
+            if user_id is None:
+                yield line_no, None, None, None, f"Unknown user: {record.get('user', record.get('user_id'))!r}"
+                continue
+
+            timestamp = None
+            if record.get("timestamp"):
+                try:
+                    timestamp = datetime.fromisoformat(record["timestamp"])
+                except (TypeError, ValueError):
+                    yield line_no, None, None, None, f"Invalid timestamp: {record['timestamp']!r}"
+                    continue
+
+            yield line_no, user_id, answers, timestamp, None
+
+
+class ImportStats:
+    """Progress and throughput counters of a bulk import."""
+
+    # Rejected records kept for reporting; the rest are only counted
+    MAX_REJECTION_SAMPLES = 100
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejections = []  # (line number, reason) samples
+
+    def reject(self, line_no, reason):
+        """Count a rejected record, keeping the first ones for the report."""
+        self.rejected += 1
+        if len(self.rejections) < self.MAX_REJECTION_SAMPLES:
+            self.rejections.append((line_no, reason))
+
+    @property
+    def elapsed(self):
+        """Seconds since the import started."""
+        return time.perf_counter() - self.started
+
+    @property
+    def throughput(self):
+        """Imported attempts per second."""
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def import_attempts(path, questions, resolve_user, save_batch, workers=None,
+                    chunk_size=500, batch_size=2000, progress=None):
+    """
+    Score every attempt in a JSON Lines file and save them in batches.
+
+    Chunks of records are scored in a process pool with a bounded number of
+    chunks in flight, so memory stays constant however large the file is.
+    With ``workers=0`` everything runs in the current process.
+
+    Args:
+        path (str): Path of the JSON Lines file
+        questions (iterable): Question catalog used for scoring
+        resolve_user (callable): Maps a record's ``user`` value to a user ID or None
+        save_batch (callable): Persists a list of scored records (one transaction)
+        workers (int): Number of worker processes (None for one per CPU, 0 for none)
+        chunk_size (int): Attempts sent to a worker at a time
+        batch_size (int): Attempts committed per transaction
+        progress (callable): Called with the ImportStats after each committed batch
+
+    Returns:
+        ImportStats: Counters of the finished import
+    """
+    questions = tuple(questions)
+    stats = ImportStats()
+    pending_records = []
+
+    def collect(scored):
+        for line_no, record, error in scored:
+            if error:
+                stats.reject(line_no, error)
+            else:
+                pending_records.append(record)
+        while len(pending_records) >= batch_size:
+            flush(pending_records[:batch_size])
+            del pending_records[:batch_size]
+
+    def flush(batch):
+        save_batch(batch)
+        stats.imported += len(batch)
+        if progress:
+            progress(stats)
+
+    def chunks():
+        chunk = []
+        for line_no, user_id, answers, timestamp, error in iter_attempts(path, resolve_user):
+            stats.read += 1
+            if error:
+                stats.reject(line_no, error)
+                continue
+            chunk.append((line_no, user_id, answers, timestamp))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    if workers == 0:
+        _init_worker(questions)
+        for chunk in chunks():
+            collect(_score_chunk(chunk))
+    else:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(questions,)) as pool:
+            max_in_flight = 2 * workers
+            in_flight = set()
+            for chunk in chunks():
+                in_flight.add(pool.submit(_score_chunk, chunk))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+            for future in in_flight:
+                collect(future.result())
+
+    if pending_records:
+        flush(pending_records[:])
+        pending_records.clear()
+
+    return stats
@@ -98,6 +98,478 @@ def reset_password_command(username, new_password):
     click.echo(f"Password reset for user '{username}'.")
 
 
+@click.group()
+def template_cli():
+    """Template management commands."""
+    pass
+
+
+@template_cli.command('precompile')
+@with_appcontext
+def precompile_templates_command():
+    """Compile every template into the bytecode cache."""
+    from flask import current_app
+    from src.utils.templates import precompile_templates
+    
+    if current_app.jinja_env.bytecode_cache is None:
+        click.echo("Error: TEMPLATE_CACHE_DIR is not configured.")
+        return
+    
+    names = precompile_templates(current_app)
+    
+    for name in names:
+        click.echo(f"Compiled {name}")
+    
+    click.echo(f"{len(names)} templates compiled into {current_app.config['TEMPLATE_CACHE_DIR']}")
+
+
+@click.group()
+def norms_cli():
+    """Score norm (percentile) commands."""
+    pass
+
+
+@norms_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True, help='Result rows fetched per batch')
+@with_appcontext
+def rebuild_norms_command(batch_size):
+    """Recompute the percentile norms from every stored result."""
+    from src.data.database import rebuild_score_norms
+    
+    counted = rebuild_score_norms(batch_size=batch_size)
+    click.echo(f"Norms rebuilt from {counted} results.")
+
+
+@click.group()
+def rollups_cli():
+    """Dashboard rollup commands."""
+    pass
+
+
+@rollups_cli.command('rebuild')
+@click.option('--batch-size', default=1000, show_default=True, help='Result rows fetched per batch')
+@with_appcontext
+def rebuild_rollups_command(batch_size):
+    """Recompute the daily dashboard rollups from every stored result."""
+    from src.data.database import rebuild_score_rollups
+    
+    counted = rebuild_score_rollups(batch_size=batch_size)
+    click.echo(f"Rollups rebuilt from {counted} results.")
+
+
+@click.group()
+def export_cli():
+    """Data export commands."""
+    pass
+
+
+@export_cli.command('results')
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--format', 'output_format', type=click.Choice(['csv', 'jsonl', 'parquet']), default='csv', show_default=True)
+@click.option('--since', type=click.DateTime(), help='Only results at or after this date')
+@click.option('--until', type=click.DateTime(), help='Only results before this date')
+@click.option('--user', 'username', help='Only results of this user')
+@click.option('--after-id', type=int, default=0, help='Only results with a greater ID')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='File recording the last exported ID, used to resume')
+@click.option('--batch-size', default=1000, show_default=True, help='Results fetched and written per batch')
+@with_appcontext
+def export_results_command(output, output_format, since, until, username, after_id, checkpoint, batch_size):
+    """Stream test results with their users and answers to a file."""
+    import os
+    from src.utils.export import WRITERS, iter_result_batches
+    
+    user_id = None
+    if username:
+        user = get_user_by_username(username)
+        if not user:
+            click.echo(f"Error: User '{username}' not found.")
+            return
+        user_id = user.id
+    
+    # Resume after the last ID recorded in the checkpoint file
+    resuming = False
+    if checkpoint and os.path.exists(checkpoint):
+        with open(checkpoint) as f:
+            content = f.read().strip()
+        if content:
+            after_id = max(after_id, int(content))
+            resuming = True
+    
+    try:
+        writer = WRITERS[output_format](output, append=resuming)
+    except RuntimeError as e:
+        click.echo(f"Error: {e}")
+        return
+    
+    exported = 0
+    try:
+        for batch in iter_result_batches(batch_size, since, until, user_id, after_id):
+            writer.write_batch(batch)
+            exported += len(batch)
+            
+            # Record progress only once the batch is on disk
+            if checkpoint:
+                with open(checkpoint, 'w') as f:
+                    f.write(str(batch[-1]['id']))
+    finally:
+        writer.close()
+    
+    click.echo(f"Exported {exported} results to {output}" + (f" (resumed after ID {after_id})" if resuming else ""))
+
+
+@click.group()
+def import_cli():
+    """Data import commands."""
+    pass
+
+
+@import_cli.command('attempts')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--workers', type=int, default=None, help='Scoring processes (default: one per CPU, 0: score in-process)')
+@click.option('--chunk-size', default=500, show_default=True, help='Attempts sent to a worker at a time')
+@click.option('--batch-size', default=2000, show_default=True, help='Attempts committed per transaction')
+@with_appcontext
+def import_attempts_command(path, workers, chunk_size, batch_size):
+    """Score and import offline attempts from a JSON Lines file."""
+    from src.data.catalog import question_catalog
+    from src.data.database import save_test_results_bulk
+    from src.utils.bulk_import import import_attempts
+    
+    user_ids = {}
+    
+    def resolve_user(value):
+        """Map a user ID, username or {"id"/"username": ...} object to a user ID."""
+        if isinstance(value, dict):
+            value = value.get('id', value.get('username'))
+        if value is None or isinstance(value, bool):
+            return None
+        if value not in user_ids:
+            if isinstance(value, int) or (isinstance(value, str) and value.isdigit()):
+                user = db.session.get(User, int(value))
+            else:
+                user = get_user_by_username(str(value))
+            user_ids[value] = user.id if user else None
+        return user_ids[value]
+    
+    def report(stats):
+        click.echo(f"{stats.imported} imported, {stats.rejected} rejected, "
+                   f"{stats.throughput:.0f} attempts/s")
+    
+    stats = import_attempts(
+        path,
+        question_catalog.questions,
+        resolve_user,
+        save_test_results_bulk,
+        workers=workers,
+        chunk_size=chunk_size,
+        batch_size=batch_size,
+        progress=report
+    )
+    
+    for line_no, reason in stats.rejections[:10]:
+        click.echo(f"Line {line_no}: {reason}")
+    if stats.rejected > 10:
+        click.echo(f"... and {stats.rejected - 10} more rejected records")
+    
+    click.echo(f"Imported {stats.imported} of {stats.read} attempts in {stats.elapsed:.1f}s "
+               f"({stats.throughput:.0f} attempts/s).")
+
+
+@click.group()
+def items_cli():
+    """Psychometric item analysis commands."""
+    pass
+
+
+@items_cli.command('analyze')
+@click.option('--full', is_flag=True, help='Reanalyze every result instead of only new ones')
+@click.option('--max-cells', default=4_000_000, show_default=True, help='Attempts x items held in memory per chunk')
+@with_appcontext
+def analyze_items_command(full, max_cells):
+    """Update item difficulty, discrimination and category reliability."""
+    from src.data.database import update_item_analysis, ItemStatistic, CategoryReliability
+    
+    accumulator = update_item_analysis(full=full, max_cells=max_cells)
+    click.echo(f"Item analysis covers {accumulator.attempts} attempts "
+               f"(up to result {accumulator.last_result_id}).")
+    
+    click.echo(f"{'Question':<10}{'Category':<25}{'N':>8}{'Difficulty':>12}{'Discrimination':>16}")
+    for item in ItemStatistic.query.order_by(ItemStatistic.category, ItemStatistic.question_id):
+        difficulty = f"{item.difficulty:.3f}" if item.difficulty is not None else "-"
+        discrimination = f"{item.discrimination:.3f}" if item.discrimination is not None else "-"
+        click.echo(f"{item.question_id:<10}{item.category:<25}{item.responses:>8}{difficulty:>12}{discrimination:>16}")
+    
+    for reliability in CategoryReliability.query.order_by(CategoryReliability.category):
+        alpha = f"{reliability.alpha:.3f}" if reliability.alpha is not None else "-"
+        click.echo(f"{reliability.category}: alpha {alpha} over {reliability.items} items")
+
+
+@click.group()
+def duplicates_cli():
+    """Near-duplicate answer detection commands."""
+    pass
+
+
+@duplicates_cli.command('clusters')
+@click.option('--threshold', type=float, default=None, help='Minimum estimated similarity (default: DUPLICATE_THRESHOLD)')
+@click.option('--min-size', default=2, show_default=True, help='Smallest cluster reported')
+@click.option('--limit', default=20, show_default=True, help='Clusters printed')
+@with_appcontext
+def duplicate_clusters_command(threshold, min_size, limit):
+    """Find clusters of near-duplicate open-ended answers across all results."""
+    from flask import current_app
+    from src.data.database import Answer, backfill_answer_signatures, iter_answer_signatures
+    from src.utils.near_duplicates import LshIndex, duplicate_clusters
+    
+    threshold = threshold if threshold is not None else current_app.config['DUPLICATE_THRESHOLD']
+    
+    added = backfill_answer_signatures()
+    if added:
+        click.echo(f"Signed {added} answers saved before duplicate detection.")
+    
+    index = LshIndex()
+    for result_id, question_id, signature in iter_answer_signatures():
+        index.add((result_id, question_id), signature)
+    
+    pairs = [(first, second) for first, second, value in index.candidate_pairs() if value >= threshold]
+    clusters = [keys for keys in duplicate_clusters(pairs) if len(keys) >= min_size]
+    
+    click.echo(f"{len(clusters)} clusters of near-duplicate answers among {len(index)} answers.")
+    for number, keys in enumerate(clusters[:limit], 1):
+        result_id, question_id = keys[0]
+        sample = db.session.query(Answer.answer_text).filter_by(
+            test_result_id=result_id, question_id=question_id
+        ).scalar() or ''
+        members = ', '.join(f"{r}/q{q}" for r, q in keys)
+        click.echo(f"{number}. {len(keys)} answers: {members}")
+        click.echo(f"   \"{sample[:80]}\"")
+
+
+@click.group()
+def ranking_cli():
+    """Candidate ranking commands."""
+    pass
+
+
+@ranking_cli.command('rebuild')
+@with_appcontext
+def rebuild_score_matrix_command():
+    """Recreate the ranking score matrix from every stored result."""
+    from src.data.database import iter_result_scores
+    from src.utils.score_matrix import score_matrix
+    
+    score_matrix.rebuild(iter_result_scores)
+    click.echo(f"Score matrix rebuilt with {score_matrix.rows} results.")
+
+
+@click.group()
+def load_cli():
+    """Load testing commands."""
+    pass
+
+
+@load_cli.command('run')
+@click.option('--url', help='Root URL of a running server (default: serve the app in-process on a temporary database)')
+@click.option('--concurrency', '-c', default=10, show_default=True, help='Concurrent candidates')
+@click.option('--duration', '-d', default=60.0, show_default=True, help='Seconds to run')
+@click.option('--ramp-up', default=0.0, show_default=True, help='Seconds to ramp up to the full concurrency')
+@click.option('--stage', 'stages', multiple=True, metavar='DURATION:TARGET',
+              help='Ramp stage, e.g. 30s:50; repeat for a profile (overrides the three options above)')
+@click.option('--sessions', type=int, default=None, help='Stop after this many candidate sessions')
+@click.option('--answer-size', type=click.Choice(['tiny', 'typical', 'heavy']), default='typical', show_default=True,
+              help='Length of the generated open-ended answers')
+@click.option('--timeout', default=60.0, show_default=True, help='Seconds to wait for a response')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+@with_appcontext
+def load_test_command(url, concurrency, duration, ramp_up, stages, sessions, answer_size, timeout, as_json):
+    """Replay candidate sessions (questions, submit, results) and report latency percentiles."""
+    import json
+    from contextlib import ExitStack
+    from flask import got_request_exception
+    from src.utils.load_test import (LoadStats, RampProfile, is_lock_error, parse_stages, run_load_test,
+                                     scratch_app, start_server)
+    
+    try:
+        profile = RampProfile(parse_stages(stages)) if stages else \
+            RampProfile.constant(concurrency, duration, ramp_up)
+    except ValueError as e:
+        click.echo(f"Error: {e}")
+        return
+    
+    stats = LoadStats()
+    server = None
+    
+    def count_lock_errors(sender, exception, **extra):
+        if is_lock_error(exception):
+            stats.lock_error()
+    
+    def report(progress_stats):
+        if not as_json:
+            click.echo(f"{progress_stats.elapsed:6.1f}s  {progress_stats.sessions} sessions, "
+                       f"{progress_stats.failed_sessions} failed")
+    
+    with ExitStack() as cleanup:
+        if not url:
+            # Serve a copy of the app on a throwaway database, so the synthetic
+            # results never reach the configured one
+            from app import create_app
+            app = cleanup.enter_context(scratch_app(create_app))
+            server, url = start_server(app)
+            cleanup.callback(server.shutdown)
+            got_request_exception.connect(count_lock_errors, app)
+            cleanup.callback(got_request_exception.disconnect, count_lock_errors, app)
+        
+        if not as_json:
+            click.echo(f"Running up to {profile.peak} candidates for {profile.duration:.0f}s against {url}")
+        run_load_test(url, profile, max_sessions=sessions, answer_size=answer_size, timeout=timeout,
+                      stats=stats, progress=report)
+    
+    summary = stats.summary()
+    if server is None:
+        summary["lock_errors"] = None  # Only observable when the app runs in-process
+    
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+        return
+    
+    click.echo(f"{summary['sessions']} sessions ({summary['failed_sessions']} failed) in {summary['elapsed']:.1f}s, "
+               f"{summary['sessions_per_second']:.2f} sessions/s")
+    click.echo(f"{'Endpoint':<16}{'Requests':>10}{'Errors':>8}{'Req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, endpoint_stats in summary['endpoints'].items():
+        percentiles = ''.join(
+            f"{endpoint_stats[key]:>10.1f}" if key in endpoint_stats else f"{'-':>10}"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+        )
+        click.echo(f"{endpoint:<16}{endpoint_stats['requests']:>10}{endpoint_stats['errors']:>8}"
+                   f"{endpoint_stats['throughput']:>9.2f}{percentiles}")
+    
+    statuses = ', '.join(f"{status}: {count}" for status, count in summary['statuses'].items())
+    click.echo(f"Status codes: {statuses or '-'}")
+    if summary['lock_errors'] is None:
+        click.echo("Database lock errors: not observable against a remote URL (see the server log)")
+    else:
+        click.echo(f"Database lock errors: {summary['lock_errors']}")
+
+
+@click.group()
+def profile_cli():
+    """Request profile commands."""
+    pass
+
+
+@profile_cli.command('hotspots')
+@click.option('--dir', 'directory', type=click.Path(file_okay=False), help='Capture directory (default: PROFILER_DIR)')
+@click.option('--endpoint', help='Only requests to this endpoint, e.g. test.submit_test')
+@click.option('--mode', type=click.Choice(['cprofile', 'sampling']), help='Only captures of this kind')
+@click.option('--min-duration', default=0.0, show_default=True, help='Only requests at least this many seconds long')
+@click.option('--sort', 'sort_by', type=click.Choice(['self', 'cumulative']), default='self', show_default=True)
+@click.option('--limit', default=20, show_default=True, help='Functions printed')
+@with_appcontext
+def profile_hotspots_command(directory, endpoint, mode, min_duration, sort_by, limit):
+    """Aggregate the hottest functions across captured request profiles."""
+    import os
+    from flask import current_app
+    from src.utils.profiler import aggregate_hotspots, load_captures
+    
+    directory = directory or current_app.config['PROFILER_DIR']
+    count, total, functions = aggregate_hotspots(
+        load_captures(directory, endpoint=endpoint, mode=mode, min_duration=min_duration)
+    )
+    if not count:
+        click.echo(f"No profiles captured in {directory}.")
+        return
+    
+    click.echo(f"{count} profiled requests, {total:.3f}s in total.")
+    column = 0 if sort_by == 'self' else 1
+    ranked = sorted(functions.items(), key=lambda item: -item[1][column])[:limit]
+    
+    click.echo(f"{'Self s':>10}{'Self %':>8}{'Cum s':>10}{'Requests':>10}  Function")
+    for key, (self_seconds, cumulative, requests) in ranked:
+        share = 100 * self_seconds / total if total else 0.0
+        # Paths inside the project are shown relative to it
+        if key.startswith(current_app.root_path + os.sep):
+            key = key[len(current_app.root_path) + 1:]
+        click.echo(f"{self_seconds:>10.4f}{share:>7.1f}%{cumulative:>10.4f}{requests:>10}  {key}")
+
+
+@click.group()
+def memory_cli():
+    """Memory accounting commands."""
+    pass
+
+
+@memory_cli.command('report')
+@click.option('--warm-up', 'warm', is_flag=True, help='Warm the worker up (catalog, analyzer, a submit) first')
+@click.option('--trace', is_flag=True, help='Trace allocations made from now on with tracemalloc')
+@click.option('--top', default=10, show_default=True, help='Largest allocation sites listed when tracing')
+@click.option('--json', 'as_json', is_flag=True, help='Print the report as JSON')
+@with_appcontext
+def memory_report_command(warm, trace, top, as_json):
+    """Report this process's memory by subsystem."""
+    import json
+    from flask import current_app
+    from src.utils.memory import memory_report, start_tracing
+    from src.utils.prefork import format_memory
+    from src.utils.warmup import warm_up
+    
+    if trace:
+        start_tracing(current_app.config['MEMORY_TRACE_FRAMES'])
+    if warm:
+        warm_up(current_app._get_current_object())
+    
+    report = memory_report(db.session, top=top)
+    if as_json:
+        click.echo(json.dumps(report, indent=2))
+        return
+    
+    click.echo(f"Process {report['pid']}: {format_memory(report['process'])}")
+    click.echo(f"{'Subsystem':<16}{'Objects':>10}{'MiB':>10}{'Budget MiB':>12}")
+    for name, size in report['subsystems'].items():
+        budget = f"{size['budget'] / (1024 * 1024):.1f}" if size['budget'] is not None else "-"
+        flag = "  OVER BUDGET" if size['over_budget'] else ""
+        click.echo(f"{name:<16}{size['objects']:>10}{size['bytes'] / (1024 * 1024):>10.2f}{budget:>12}{flag}")
+    
+    traced = report['tracemalloc']
+    if traced is None:
+        click.echo("Allocation tracing is off (use --trace, MEMORY_TRACING or PYTHONTRACEMALLOC=25).")
+        return
+    click.echo(f"Traced allocations: {traced['traced_bytes'] / (1024 * 1024):.2f} MiB "
+               f"(peak {traced['peak_bytes'] / (1024 * 1024):.2f} MiB)")
+    for name, size in traced['subsystems'].items():
+        click.echo(f"  {name:<16}{size / (1024 * 1024):>10.2f} MiB")
+    for site in traced['top']:
+        click.echo(f"  {site['bytes'] / 1024:>10.1f} KiB in {site['blocks']} blocks at {site['site']}")
+
+
+@click.group()
+def drafts_cli():
+    """Autosaved draft attempt commands."""
+    pass
+
+
+@drafts_cli.command('purge')
+@click.option('--max-age-days', default=7.0, show_default=True, help='Days since the last autosave')
+@with_appcontext
+def purge_drafts_command(max_age_days):
+    """Delete the drafts of attempts abandoned before submission."""
+    from src.data.database import delete_stale_drafts
+    
+    deleted = delete_stale_drafts(max_age_days)
+    click.echo(f"Deleted {deleted} stale drafts.")
+
+
 def register_cli(app):
     """Register CLI commands with the Flask app."""
-    app.cli.add_command(user_cli) 
\ No newline at end of file
+    app.cli.add_command(user_cli)
+    app.cli.add_command(template_cli)
+    app.cli.add_command(norms_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(export_cli)
+    app.cli.add_command(import_cli)
+    app.cli.add_command(items_cli)
+    app.cli.add_command(duplicates_cli)
+    app.cli.add_command(ranking_cli)
+    app.cli.add_command(load_cli)
+    app.cli.add_command(profile_cli)
+    app.cli.add_command(memory_cli)
+    app.cli.add_command(drafts_cli) 
\ No newline at end of file
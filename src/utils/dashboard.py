@@ -0,0 +1,91 @@
+"""
+Dashboard aggregation utilities for the sales aptitude test.
+
+The dashboard is computed only from the daily per-category rollups kept in
+the ``score_rollups`` table, so its cost depends on the number of days
+shown and not on the number of stored results.
+"""
+
+import math
+
+
+ROLLUP_BIN_WIDTH = 0.5
+ROLLUP_BIN_COUNT = 10  # 0-5 scale, 5.0 falls in the last bin
+
+
+def rollup_bin(score):
+    """
+    Get the dashboard histogram bin of a score.
+
+    Args:
+        score (float): A category score on the 0-5 scale
+
+    Returns:
+        int: Bin index between 0 and ROLLUP_BIN_COUNT - 1
+    """
+    return min(max(int(score / ROLLUP_BIN_WIDTH), 0), ROLLUP_BIN_COUNT - 1)
+
+
+def _summarize(count, total, total_sq, pass_count):
+    """Turn running sums into mean, standard deviation and pass rate."""
+    if not count:
+        return {"count": 0, "mean": None, "stddev": None, "pass_rate": None}
+
+    mean = total / count
+    variance = (total_sq - total * total / count) / (count - 1) if count > 1 else 0.0
+    return {
+        "count": count,
+        "mean": round(mean, 3),
+        "stddev": round(math.sqrt(max(variance, 0.0)), 3),
+        "pass_rate": round(pass_count / count, 4)
+    }
+
+
+def build_dashboard(rollups, pass_threshold):
+    """
+    Build the dashboard payload from daily rollups.
+
+    Args:
+        rollups (list): Rollup dictionaries (see ScoreRollup.to_dict)
+        pass_threshold (float): Score counted as a pass, for display
+
+    Returns:
+        dict: Overall totals, per-category statistics and a daily trend
+    """
+    categories = {}
+    trend = []
+
+    for rollup in rollups:
+        aggregate = categories.setdefault(rollup["category"], {
+            "count": 0, "total": 0.0, "total_sq": 0.0, "pass_count": 0,
+            "histogram": [0] * ROLLUP_BIN_COUNT
+        })
+        aggregate["count"] += rollup["count"]
+        aggregate["total"] += rollup["total"]
+        aggregate["total_sq"] += rollup["total_sq"]
+        aggregate["pass_count"] += rollup["pass_count"]
+        aggregate["histogram"] = [a + b for a, b in zip(aggregate["histogram"], rollup["histogram"])]
+
+        # Each result contributes exactly one overall score per day
+        if rollup["category"] == "overall":
+            day = _summarize(rollup["count"], rollup["total"], rollup["total_sq"], rollup["pass_count"])
+            day["day"] = rollup["day"]
+            trend.append(day)
+
+    category_stats = {}
+    for category, aggregate in categories.items():
+        stats = _summarize(aggregate["count"], aggregate["total"], aggregate["total_sq"], aggregate["pass_count"])
+        stats["histogram"] = aggregate["histogram"]
+        category_stats[category] = stats
+
+    overall = category_stats.get("overall", _summarize(0, 0.0, 0.0, 0))
+
+    return {
+        "pass_threshold": pass_threshold,
+        "histogram_bin_width": ROLLUP_BIN_WIDTH,
+        "results": overall["count"],
+        "pass_rate": overall["pass_rate"],
+        "categories": {category: stats for category, stats in category_stats.items() if category != "overall"},
+        "overall": overall,
+        "trend": trend
+    }
@@ -0,0 +1,187 @@
+"""
+Streaming export of test results for the sales aptitude test.
+"""
+
+import csv
+import json
+
+from sqlalchemy import select
+
+from src.data.database import db, TestResult, User, Answer
+from src.data.question_bank import CATEGORIES
+
+
+# Score columns written by the flat (CSV/Parquet) formats
+SCORE_COLUMNS = list(CATEGORIES) + ['overall']
+
+FLAT_COLUMNS = (
+    ['id', 'user_id', 'username', 'email', 'timestamp', 'overall_score']
+    + [f'score_{category}' for category in SCORE_COLUMNS]
+    + ['analysis', 'recommendations', 'answers']
+)
+
+
+def iter_result_batches(batch_size=1000, since=None, until=None, user_id=None, after_id=0):
+    """
+    Stream test results joined with their users and answers, in ID order.
+
+    Rows are fetched through a server-side cursor ``batch_size`` at a time
+    as plain tuples (never ORM objects, so the identity map stays empty),
+    and the answers of each batch are loaded with one query.
+
+    Args:
+        batch_size (int): Number of results per batch
+        since (datetime): Only results at or after this time
+        until (datetime): Only results before this time
+        user_id (int): Only results of this user
+        after_id (int): Only results with a greater ID (resume point)
+
+    Yields:
+        list: Decoded result records (dicts) of one batch
+    """
+    query = (
+        select(
+            TestResult.id, TestResult.user_id, User.username, User.email,
+            TestResult.timestamp, TestResult.overall_score, TestResult.scores_json,
+            TestResult.analysis_json, TestResult.recommendations_json
+        )
+        .outerjoin(User, User.id == TestResult.user_id)
+        .where(TestResult.id > (after_id or 0))
+        .order_by(TestResult.id)
+    )
+    if since is not None:
+        query = query.where(TestResult.timestamp >= since)
+    if until is not None:
+        query = query.where(TestResult.timestamp < until)
+    if user_id is not None:
+        query = query.where(TestResult.user_id == user_id)
+
+    rows = db.session.execute(query.execution_options(yield_per=batch_size))
+    for partition in rows.partitions():
+        ids = [row.id for row in partition]
+
+        answers = {result_id: {} for result_id in ids}
+        for result_id, question_id, answer_text in db.session.execute(
+            select(Answer.test_result_id, Answer.question_id, Answer.answer_text)
+            .where(Answer.test_result_id.in_(ids))
+            .order_by(Answer.test_result_id, Answer.question_id)
+        ):
+            answers[result_id][str(question_id)] = answer_text
+
+        yield [
+            {
+                "id": row.id,
+                "user_id": row.user_id,
+                "username": row.username,
+                "email": row.email,
+                "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                "overall_score": row.overall_score,
+                "scores": json.loads(row.scores_json) if row.scores_json else {},
+                "analysis": json.loads(row.analysis_json) if row.analysis_json else {},
+                "recommendations": json.loads(row.recommendations_json) if row.recommendations_json else [],
+                "answers": answers[row.id]
+            }
+            for row in partition
+        ]
+
+
+def flatten_record(record):
+    """
+    Flatten a result record into one value per FLAT_COLUMNS column.
+
+    Args:
+        record (dict): A record yielded by iter_result_batches
+
+    Returns:
+        dict: Column name -> scalar value
+    """
+    flat = {key: record[key] for key in ('id', 'user_id', 'username', 'email', 'timestamp', 'overall_score')}
+    for category in SCORE_COLUMNS:
+        flat[f'score_{category}'] = record['scores'].get(category)
+    flat['analysis'] = json.dumps(record['analysis'])
+    flat['recommendations'] = json.dumps(record['recommendations'])
+    flat['answers'] = json.dumps(record['answers'])
+    return flat
+
+
+class CsvResultWriter:
+    """Write result records as CSV rows."""
+
+    def __init__(self, path, append=False):
+        """Open the output file, appending when resuming an export."""
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=FLAT_COLUMNS)
+        if not append or self._file.tell() == 0:
+            self._writer.writeheader()
+
+    def write_batch(self, records):
+        """Write one batch of records and flush it to disk."""
+        self._writer.writerows(flatten_record(record) for record in records)
+        self._file.flush()
+
+    def close(self):
+        """Close the output file."""
+        self._file.close()
+
+
+class JsonlResultWriter:
+    """Write result records as JSON Lines, keeping nested scores and answers."""
+
+    def __init__(self, path, append=False):
+        """Open the output file, appending when resuming an export."""
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write_batch(self, records):
+        """Write one batch of records and flush it to disk."""
+        self._file.writelines(json.dumps(record) + '\n' for record in records)
+        self._file.flush()
+
+    def close(self):
+        """Close the output file."""
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """Write result records as Parquet, one row group per batch (requires pyarrow)."""
+
+    def __init__(self, path, append=False):
+        """Open the output file; Parquet exports cannot be appended to."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow).")
+
+        if append:
+            raise RuntimeError("Parquet files cannot be appended to; resume into a new output file.")
+
+        fields = [
+            pa.field('id', pa.int64()),
+            pa.field('user_id', pa.int64()),
+            pa.field('username', pa.string()),
+            pa.field('email', pa.string()),
+            pa.field('timestamp', pa.string()),
+            pa.field('overall_score', pa.float64())
+        ]
+        fields += [pa.field(f'score_{category}', pa.float64()) for category in SCORE_COLUMNS]
+        fields += [pa.field(name, pa.string()) for name in ('analysis', 'recommendations', 'answers')]
+
+        self._pa = pa
+        self._schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write_batch(self, records):
+        """Write one batch of records and flush it to disk."""
+        rows = [flatten_record(record) for record in records]
+        self._writer.write_table(self._pa.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        """Close the output file."""
+        self._writer.close()
+
+
+WRITERS = {
+    'csv': CsvResultWriter,
+    'jsonl': JsonlResultWriter,
+    'parquet': ParquetResultWriter
+}
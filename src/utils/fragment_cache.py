@@ -0,0 +1,260 @@
+"""
+Rendered page fragment cache for the sales aptitude test.
+"""
+
+import glob
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from src.utils.result_cache import ResultCache
+
+
+class MemoryFragmentStore:
+    """In-process fragment store, bounded by an LRU/TTL result cache."""
+
+    def __init__(self, max_entries=512, ttl=None):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries (int): Maximum number of cached fragments
+            ttl (float): Seconds a fragment stays valid (None for no expiry)
+        """
+        self._cache = ResultCache(max_entries=max_entries, ttl=ttl)
+
+    def get(self, result_id, version):
+        """Get the HTML rendered for a result with a given template version."""
+        entry = self._cache.get(result_id)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+
+    def set(self, result_id, version, html):
+        """Store the HTML rendered for a result, replacing older versions."""
+        self._cache.set(result_id, (version, html))
+
+    def delete(self, result_id):
+        """Drop every version cached for a result."""
+        self._cache.invalidate(result_id)
+
+    def clear(self):
+        """Drop all fragments."""
+        self._cache.clear()
+
+    def stats(self):
+        """Report entry count and memory use."""
+        stats = self._cache.stats()
+        return {
+            "entries": stats["entries"],
+            "memory_bytes": stats["memory_bytes"]
+        }
+
+
+class FileFragmentStore:
+    """On-disk fragment store, shared by every worker using the same directory."""
+
+    def __init__(self, directory, ttl=None):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory holding one file per cached fragment
+            ttl (float): Seconds a fragment stays valid (None for no expiry)
+        """
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, result_id, version):
+        return os.path.join(self.directory, f'{int(result_id)}-{version}.html')
+
+    def get(self, result_id, version):
+        """Get the HTML rendered for a result with a given template version."""
+        path = self._path(result_id, version)
+        try:
+            if self.ttl and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def set(self, result_id, version, html):
+        """Store the HTML rendered for a result, replacing older versions."""
+        self.delete(result_id)
+
+        # Write to a temporary file first so readers never see a partial page
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html)
+        os.replace(tmp_path, self._path(result_id, version))
+
+    def delete(self, result_id):
+        """Drop every version cached for a result."""
+        for path in glob.glob(os.path.join(self.directory, f'{int(result_id)}-*.html')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop all fragments."""
+        for path in glob.glob(os.path.join(self.directory, '*.html')):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """Report entry count and disk use."""
+        paths = glob.glob(os.path.join(self.directory, '*.html'))
+        return {
+            "entries": len(paths),
+            "memory_bytes": 0,
+            "disk_bytes": sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+        }
+
+
+class FragmentCache:
+    """Cache of rendered HTML keyed by result ID and template version."""
+
+    def __init__(self, store=None):
+        """
+        Initialize the fragment cache.
+
+        Args:
+            store: A MemoryFragmentStore, FileFragmentStore or None to disable caching
+        """
+        self.store = store
+        self._versions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        """
+        Configure the storage backend from the Flask app config.
+
+        FRAGMENT_CACHE_BACKEND selects 'memory', 'filesystem' or 'none';
+        FRAGMENT_CACHE_DIR and FRAGMENT_CACHE_TTL tune the backends.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('FRAGMENT_CACHE_BACKEND', 'memory')
+        app.config.setdefault('FRAGMENT_CACHE_SIZE', 512)
+        app.config.setdefault('FRAGMENT_CACHE_TTL', None)
+        app.config.setdefault('FRAGMENT_CACHE_DIR', os.path.join(app.instance_path, 'fragment_cache'))
+
+        backend = app.config['FRAGMENT_CACHE_BACKEND']
+        ttl = app.config['FRAGMENT_CACHE_TTL']
+
+        if backend == 'memory':
+            self.store = MemoryFragmentStore(app.config['FRAGMENT_CACHE_SIZE'], ttl)
+        elif backend == 'filesystem':
+            self.store = FileFragmentStore(app.config['FRAGMENT_CACHE_DIR'], ttl)
+        elif backend in (None, '', 'none'):
+            self.store = None
+        else:
+            raise ValueError(f"Unknown fragment cache backend: {backend}")
+
+        with self._lock:
+            self._versions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def template_version(self, env, template_name):
+        """
+        Get a short hash identifying the current source of a template.
+
+        The hash is computed once and recomputed only when the loader reports
+        the template file as changed.
+
+        Args:
+            env (jinja2.Environment): The Jinja environment
+            template_name (str): Name of the template
+
+        Returns:
+            str: Hex digest of the template source
+        """
+        with self._lock:
+            cached = self._versions.get(template_name)
+        if cached is not None and (cached[1] is None or cached[1]()):
+            return cached[0]
+
+        source, _, uptodate = env.loader.get_source(env, template_name)
+        version = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+
+        with self._lock:
+            self._versions[template_name] = (version, uptodate)
+        return version
+
+    def get_or_render(self, result_id, env, template_name, render):
+        """
+        Get the cached HTML for a result, rendering and storing it on a miss.
+
+        Args:
+            result_id (int): ID of the test result the page shows
+            env (jinja2.Environment): The Jinja environment
+            template_name (str): Name of the template being rendered
+            render (callable): Function returning the rendered HTML, or None
+                when there is nothing to render (which is not cached)
+
+        Returns:
+            str: The rendered HTML, or None
+        """
+        if self.store is None:
+            return render()
+
+        version = self.template_version(env, template_name)
+        html = self.store.get(result_id, version)
+        if html is not None:
+            with self._lock:
+                self.hits += 1
+            return html
+
+        with self._lock:
+            self.misses += 1
+        html = render()
+        if html is not None:
+            self.store.set(result_id, version, html)
+        return html
+
+    def invalidate(self, result_id):
+        """Drop every cached fragment for a result."""
+        if self.store is not None:
+            self.store.delete(result_id)
+
+    def clear(self):
+        """Drop all fragments and reset the statistics."""
+        if self.store is not None:
+            self.store.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Report cache effectiveness and footprint.
+
+        Returns:
+            dict: Backend, hit/miss counters, hit ratio and store size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": type(self.store).__name__ if self.store else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+        if self.store is not None:
+            stats.update(self.store.stats())
+        return stats
+
+
+# Shared cache of rendered results pages, keyed by result ID
+fragment_cache = FragmentCache()
@@ -0,0 +1,329 @@
+"""
+Psychometric item analysis for the sales aptitude test.
+
+Builds the attempt x item response matrix from the answers table in
+bounded-size chunks and folds each chunk into sufficient statistics
+(sums, sums of squares and cross-products), from which item difficulty,
+corrected item-total (point-biserial) discrimination, pairwise inter-item
+correlations and Cronbach's alpha per category are derived. The statistics
+are additive, so later runs only read results added since the last one.
+"""
+
+import io
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+
+from src.models.result_model import score_answer
+
+
+# Highest score an item can give, used to express difficulty as a proportion
+MAX_ITEM_SCORE = 5.0
+
+
+class ItemAnalysisAccumulator:
+    """Additive sufficient statistics of a response matrix."""
+
+    def __init__(self, questions):
+        """
+        Initialize empty statistics.
+
+        Args:
+            questions (list): Scorable questions, defining the matrix columns
+        """
+        self.item_ids = np.array([q.id for q in questions], dtype=np.int64)
+        self.item_categories = [q.category for q in questions]
+        self.categories = list(dict.fromkeys(self.item_categories))
+        self.blocks = [
+            np.array([i for i, c in enumerate(self.item_categories) if c == category], dtype=np.int64)
+            for category in self.categories
+        ]
+        self.last_result_id = 0
+        self.attempts = 0
+
+        size = len(self.item_ids)
+        self.n = np.zeros(size)      # attempts answering the item
+        self.s = np.zeros(size)      # sum of item scores
+        self.ss = np.zeros(size)     # sum of squared item scores
+        self.st = np.zeros(size)     # sum of total scores, over attempts answering the item
+        self.stt = np.zeros(size)    # sum of squared total scores, idem
+        self.sxt = np.zeros(size)    # sum of item score x total score
+
+        # Pairwise statistics within each category block
+        self.pair_n = [np.zeros((len(b), len(b))) for b in self.blocks]
+        self.pair_s = [np.zeros((len(b), len(b))) for b in self.blocks]    # [i, j]: sum x_i where j answered
+        self.pair_ss = [np.zeros((len(b), len(b))) for b in self.blocks]   # [i, j]: sum x_i^2 where j answered
+        self.pair_sxy = [np.zeros((len(b), len(b))) for b in self.blocks]  # [i, j]: sum x_i x_j
+
+    def update(self, scores, answered):
+        """
+        Fold a chunk of the response matrix into the statistics.
+
+        Args:
+            scores (ndarray): attempts x items scores, 0 where unanswered
+            answered (ndarray): attempts x items mask, 1.0 where answered
+        """
+        totals = scores.sum(axis=1)
+
+        self.attempts += scores.shape[0]
+        self.n += answered.sum(axis=0)
+        self.s += scores.sum(axis=0)
+        self.ss += (scores * scores).sum(axis=0)
+        self.st += answered.T @ totals
+        self.stt += answered.T @ (totals * totals)
+        self.sxt += scores.T @ totals
+
+        for k, block in enumerate(self.blocks):
+            x = scores[:, block]
+            m = answered[:, block]
+            self.pair_n[k] += m.T @ m
+            self.pair_s[k] += x.T @ m
+            self.pair_ss[k] += (x * x).T @ m
+            self.pair_sxy[k] += x.T @ x
+
+    def item_statistics(self):
+        """
+        Derive per-item statistics.
+
+        Returns:
+            list: Dicts with question_id, category, responses, mean, stddev,
+                difficulty and discrimination (None where undefined)
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = self.n
+            mean = self.s / n
+            var = (self.ss - self.s * self.s / n) / (n - 1)
+            cov_xt = (self.sxt - self.s * self.st / n) / (n - 1)
+            var_t = (self.stt - self.st * self.st / n) / (n - 1)
+
+            # Corrected item-total correlation: item against the rest score
+            cov_xr = cov_xt - var
+            var_r = var_t - 2 * cov_xt + var
+            discrimination = cov_xr / np.sqrt(var * var_r)
+
+        return [
+            {
+                "question_id": int(self.item_ids[i]),
+                "category": self.item_categories[i],
+                "responses": int(n[i]),
+                "mean": _finite(mean[i]),
+                "stddev": _finite(np.sqrt(var[i])) if var[i] >= 0 else None,
+                "difficulty": _finite(mean[i] / MAX_ITEM_SCORE),
+                "discrimination": _finite(discrimination[i])
+            }
+            for i in range(len(self.item_ids))
+        ]
+
+    def category_statistics(self):
+        """
+        Derive per-category reliability and inter-item correlations.
+
+        Returns:
+            list: Dicts with category, items, alpha, mean_inter_item_correlation
+                and the pairwise correlation matrix (question IDs in item order)
+        """
+        results = []
+        for k, category in enumerate(self.categories):
+            block = self.blocks[k]
+            n = self.pair_n[k]
+            sx = self.pair_s[k]
+            sy = sx.T
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cov = (self.pair_sxy[k] - sx * sy / n) / (n - 1)
+                var_x = (self.pair_ss[k] - sx * sx / n) / (n - 1)
+                var_y = var_x.T
+                corr = cov / np.sqrt(var_x * var_y)
+
+            items = len(block)
+            alpha = None
+            mean_corr = None
+            if items > 1:
+                total_var = np.nansum(cov)
+                if total_var > 0:
+                    alpha = items / (items - 1) * (1 - np.nansum(np.diag(cov)) / total_var)
+                off_diagonal = corr[~np.eye(items, dtype=bool)]
+                if np.isfinite(off_diagonal).any():
+                    mean_corr = float(np.nanmean(off_diagonal))
+
+            results.append({
+                "category": category,
+                "items": [int(qid) for qid in self.item_ids[block]],
+                "alpha": _finite(alpha),
+                "mean_inter_item_correlation": _finite(mean_corr),
+                "correlations": [[_finite(value) for value in row] for row in corr]
+            })
+        return results
+
+    def to_bytes(self):
+        """Serialize the statistics (for incremental runs) as compressed NumPy arrays."""
+        arrays = {
+            "item_ids": self.item_ids,
+            "meta": np.array([self.last_result_id, self.attempts], dtype=np.int64),
+            "n": self.n, "s": self.s, "ss": self.ss,
+            "st": self.st, "stt": self.stt, "sxt": self.sxt
+        }
+        for k in range(len(self.blocks)):
+            arrays[f"pair_n_{k}"] = self.pair_n[k]
+            arrays[f"pair_s_{k}"] = self.pair_s[k]
+            arrays[f"pair_ss_{k}"] = self.pair_ss[k]
+            arrays[f"pair_sxy_{k}"] = self.pair_sxy[k]
+
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data, questions):
+        """
+        Restore statistics saved by to_bytes.
+
+        Args:
+            data (bytes): Serialized statistics
+            questions (list): The current scorable questions
+
+        Returns:
+            ItemAnalysisAccumulator: The restored statistics, or None when the
+                question set changed since they were saved
+        """
+        accumulator = cls(questions)
+        arrays = np.load(io.BytesIO(data))
+        if not np.array_equal(arrays["item_ids"], accumulator.item_ids):
+            return None
+
+        accumulator.last_result_id, accumulator.attempts = (int(v) for v in arrays["meta"])
+        for name in ("n", "s", "ss", "st", "stt", "sxt"):
+            setattr(accumulator, name, arrays[name])
+        for k in range(len(accumulator.blocks)):
+            accumulator.pair_n[k] = arrays[f"pair_n_{k}"]
+            accumulator.pair_s[k] = arrays[f"pair_s_{k}"]
+            accumulator.pair_ss[k] = arrays[f"pair_ss_{k}"]
+            accumulator.pair_sxy[k] = arrays[f"pair_sxy_{k}"]
+        return accumulator
+
+
+def _finite(value):
+    """Convert a NumPy scalar to a rounded float, or None if it is not finite."""
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), 4)
+
+
+def iter_response_chunks(session, questions, after_result_id=0, max_cells=4_000_000, batch_size=10000):
+    """
+    Stream the response matrix of results after a given ID in bounded chunks.
+
+    Answers are read through a server-side cursor ordered by result, scored
+    with a question/answer lookup table and scattered into dense chunks of
+    at most ``max_cells`` cells.
+
+    Args:
+        session: SQLAlchemy session
+        questions (list): Scorable questions defining the matrix columns
+        after_result_id (int): Only results with a greater ID
+        max_cells (int): Upper bound on attempts x items per chunk
+        batch_size (int): Answer rows fetched per database round trip
+
+    Yields:
+        tuple: (scores, answered, last result ID in the chunk)
+    """
+    from src.data.database import Answer
+
+    column = {q.id: i for i, q in enumerate(questions)}
+    by_id = {q.id: q for q in questions}
+    rows_per_chunk = max(1, max_cells // max(len(questions), 1))
+    value_table = {}
+
+    rows, cols, values = [], [], []
+    current_result = None
+    row = -1
+
+    def build(row_count):
+        scores = np.zeros((row_count, len(questions)))
+        answered = np.zeros((row_count, len(questions)))
+        scores[rows, cols] = values
+        answered[rows, cols] = 1.0
+        return scores, answered
+
+    query = (
+        select(Answer.test_result_id, Answer.question_id, Answer.answer_text)
+        .where(Answer.test_result_id > after_result_id)
+        .order_by(Answer.test_result_id)
+        .execution_options(yield_per=batch_size)
+    )
+    for result_id, question_id, answer_text in session.execute(query):
+        if result_id != current_result:
+            if row + 1 == rows_per_chunk:
+                yield (*build(row + 1), current_result)
+                rows, cols, values = [], [], []
+                row = -1
+            current_result = result_id
+            row += 1
+
+        if question_id not in column:
+            continue
+
+        key = (question_id, answer_text)
+        value = value_table.get(key)
+        if value is None and key not in value_table:
+            value = value_table[key] = score_answer(by_id[question_id], answer_text)
+        if value is None:
+            continue
+
+        rows.append(row)
+        cols.append(column[question_id])
+        values.append(value)
+
+    if current_result is not None:
+        yield (*build(row + 1), current_result)
+
+
+def scorable_questions(questions):
+    """
+    Get the questions whose scores vary between candidates.
+
+    Open-ended answers all score a neutral 3, so they carry no item information.
+
+    Args:
+        questions (list): Question catalog
+
+    Returns:
+        list: Likert and keyed scenario questions
+    """
+    return [
+        q for q in questions
+        if q.type == "likert" or (q.type == "scenario" and q.correct_index is not None)
+    ]
+
+
+def run_item_analysis(session, questions, state=None, max_cells=4_000_000, progress=None):
+    """
+    Update item statistics with every result not analyzed yet.
+
+    Args:
+        session: SQLAlchemy session
+        questions (list): Question catalog
+        state (bytes): Statistics saved by a previous run, or None for a full run
+        max_cells (int): Upper bound on attempts x items per chunk
+        progress (callable): Called with the accumulator after each chunk
+
+    Returns:
+        ItemAnalysisAccumulator: The updated statistics
+    """
+    items = scorable_questions(questions)
+
+    accumulator = ItemAnalysisAccumulator.from_bytes(state, items) if state else None
+    if accumulator is None:
+        accumulator = ItemAnalysisAccumulator(items)
+
+    for scores, answered, last_result_id in iter_response_chunks(
+        session, items, accumulator.last_result_id, max_cells
+    ):
+        accumulator.update(scores, answered)
+        accumulator.last_result_id = last_result_id
+        if progress:
+            progress(accumulator)
+
+    accumulator.analyzed_at = datetime.utcnow()
+    return accumulator
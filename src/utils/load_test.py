@@ -0,0 +1,386 @@
+"""
+Load generator for sizing exam-day hardware.
+
+Virtual candidates replay the session of a real candidate: fetch the
+questions, submit a generated attempt and view the results page, keeping
+the session cookie between requests. The number of active candidates
+follows a ramp profile of (duration, target) stages, interpolated linearly
+like the stages of common load testing tools. Latencies are recorded per
+endpoint and summarized as throughput and percentiles.
+"""
+
+import http.cookiejar
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+
+import numpy as np
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from src.utils.synthetic import ANSWER_SIZES, generate_answers
+
+
+# Endpoints of one candidate session, in order
+ENDPOINTS = ("/api/questions", "/api/submit", "/results")
+
+# Fragments of the database errors raised when a write cannot get its lock
+LOCK_ERROR_MARKERS = ("database is locked", "database table is locked", "deadlock", "lock wait timeout")
+
+
+def parse_stages(values):
+    """
+    Parse ramp stages given as ``DURATION:TARGET`` strings.
+
+    Args:
+        values (iterable): Stages such as ``"30:10"`` (ramp to 10 candidates
+            over 30 seconds); durations may end in ``s`` or ``m``
+
+    Returns:
+        list: (seconds, target) tuples
+
+    Raises:
+        ValueError: If a stage is malformed
+    """
+    stages = []
+    for value in values:
+        duration, sep, target = str(value).partition(':')
+        if not sep:
+            raise ValueError(f"Stage {value!r} is not DURATION:TARGET")
+        duration = duration.strip().lower()
+        scale = 60 if duration.endswith('m') else 1
+        try:
+            seconds = float(duration.rstrip('sm')) * scale
+            target = int(target)
+        except ValueError:
+            raise ValueError(f"Stage {value!r} is not DURATION:TARGET") from None
+        if seconds < 0 or target < 0:
+            raise ValueError(f"Stage {value!r} has a negative duration or target")
+        stages.append((seconds, target))
+    return stages
+
+
+class RampProfile:
+    """Number of active candidates over time, from linear ramp stages."""
+
+    def __init__(self, stages):
+        """
+        Initialize the profile.
+
+        Args:
+            stages (list): (seconds, target) tuples; each stage moves linearly
+                from the previous target (0 at the start) to its own
+        """
+        self.stages = list(stages)
+
+    @classmethod
+    def constant(cls, concurrency, duration, ramp_up=0):
+        """Ramp up to a fixed concurrency, then hold it for the rest of the duration."""
+        ramp_up = min(ramp_up, duration)
+        return cls([(ramp_up, concurrency), (duration - ramp_up, concurrency)])
+
+    @property
+    def duration(self):
+        """Total seconds of the profile."""
+        return sum(seconds for seconds, _ in self.stages)
+
+    @property
+    def peak(self):
+        """Highest number of active candidates."""
+        return max((target for _, target in self.stages), default=0)
+
+    def target(self, elapsed):
+        """
+        Get the number of candidates that should be active.
+
+        Args:
+            elapsed (float): Seconds since the start of the run
+
+        Returns:
+            int: Active candidates, 0 once the profile has ended
+        """
+        start, previous = 0.0, 0
+        for seconds, target in self.stages:
+            if elapsed < start + seconds:
+                progress = (elapsed - start) / seconds
+                return int(round(previous + (target - previous) * progress))
+            start, previous = start + seconds, target
+        return 0
+
+
+class LoadStats:
+    """Thread-safe latency and error counters of a load test run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.sessions = 0
+        self.failed_sessions = 0
+        self.lock_errors = 0
+        self._latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        self._errors = {endpoint: 0 for endpoint in ENDPOINTS}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, status):
+        """Record one request; statuses of 400 and above (and 0 for no response) are errors."""
+        with self._lock:
+            self._latencies[endpoint].append(seconds)
+            self._statuses[status] = self._statuses.get(status, 0) + 1
+            if not 200 <= status < 400:
+                self._errors[endpoint] += 1
+
+    def session_done(self, ok):
+        """Count a finished candidate session."""
+        with self._lock:
+            self.sessions += 1
+            if not ok:
+                self.failed_sessions += 1
+
+    def lock_error(self):
+        """Count a database lock error raised while handling a request."""
+        with self._lock:
+            self.lock_errors += 1
+
+    def stop(self):
+        """Mark the end of the run."""
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        """Seconds the run took (so far)."""
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self):
+        """
+        Summarize the run.
+
+        Returns:
+            dict: Overall throughput and, per endpoint, request count, errors,
+                throughput and p50/p95/p99/max latency in milliseconds
+        """
+        with self._lock:
+            elapsed = self.elapsed
+            endpoints = {}
+            for endpoint, latencies in self._latencies.items():
+                stats = {
+                    "requests": len(latencies),
+                    "errors": self._errors[endpoint],
+                    "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0
+                }
+                if latencies:
+                    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+                    stats.update(p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99),
+                                 max_ms=max(latencies) * 1000)
+                endpoints[endpoint] = stats
+
+            return {
+                "elapsed": elapsed,
+                "sessions": self.sessions,
+                "failed_sessions": self.failed_sessions,
+                "sessions_per_second": self.sessions / elapsed if elapsed > 0 else 0.0,
+                "lock_errors": self.lock_errors,
+                "statuses": {str(status): count for status, count in sorted(self._statuses.items())},
+                "endpoints": endpoints
+            }
+
+
+def is_lock_error(error):
+    """Whether an exception is a database lock (busy/deadlock) error."""
+    message = str(getattr(error, 'orig', None) or error).lower()
+    return any(marker in message for marker in LOCK_ERROR_MARKERS)
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    """Request handler without the per-request access log."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+@contextmanager
+def scratch_app(create_app):
+    """
+    Create an app on a temporary database and caches for an in-process load test.
+
+    The synthetic candidates would otherwise leave thousands of results in
+    the configured database. Everything is removed when the block exits.
+
+    Args:
+        create_app (callable): The application factory
+
+    Yields:
+        Flask: The application
+    """
+    from src.data.database import db
+    from src.data.write_behind import group_writer
+
+    directory = tempfile.mkdtemp(prefix='load-test-')
+    try:
+        app = create_app(test_config={
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'load_test.db')}",
+            'SCORE_MATRIX_DIR': os.path.join(directory, 'score_matrix'),
+            'FRAGMENT_CACHE_DIR': os.path.join(directory, 'fragments'),
+            'PROFILER_DIR': os.path.join(directory, 'profiles')
+        })
+        try:
+            yield app
+        finally:
+            group_writer.close()
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def start_server(app, host='127.0.0.1', port=0):
+    """
+    Serve an app from a background thread, one thread per request.
+
+    Args:
+        app (Flask): The application to serve
+        host (str): Interface to bind
+        port (int): Port to bind (0 for any free port)
+
+    Returns:
+        tuple: (server, root URL); stop it with ``server.shutdown()``
+    """
+    server = make_server(host, port, app, threaded=True, request_handler=_QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+class CandidateSession:
+    """One virtual candidate with its own cookie jar."""
+
+    def __init__(self, base_url, stats, answer_size="typical", timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.answer_size = answer_size
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def _request(self, endpoint, payload=None):
+        """Send a request, record its latency and return (status, body)."""
+        data = None
+        headers = {}
+        if payload is not None:
+            data = json.dumps(payload).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        request = urllib.request.Request(self.base_url + endpoint, data=data, headers=headers)
+
+        start = time.perf_counter()
+        try:
+            with self._opener.open(request, timeout=self.timeout) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except OSError:
+            status, body = 0, b''
+        self.stats.record(endpoint, time.perf_counter() - start, status)
+        return status, body
+
+    def run(self, seed):
+        """
+        Replay one candidate session.
+
+        Args:
+            seed (int): Seed of the generated answers
+
+        Returns:
+            bool: Whether every request succeeded
+        """
+        status, body = self._request("/api/questions")
+        if status != 200:
+            return False
+        try:
+            questions = json.loads(body)
+        except ValueError:
+            return False
+
+        answers = generate_answers(questions, answer_size=self.answer_size, seed=seed)
+        status, _ = self._request("/api/submit", {"answers": answers})
+        if status != 200:
+            return False
+
+        status, _ = self._request("/results")
+        return status == 200
+
+
+def run_load_test(base_url, profile, max_sessions=None, answer_size="typical", timeout=60,
+                  stats=None, progress=None, progress_interval=5.0):
+    """
+    Replay candidate sessions against a running server.
+
+    One thread per candidate up to the profile's peak; candidate ``i`` runs
+    sessions back to back while the profile wants more than ``i`` candidates.
+
+    Args:
+        base_url (str): Root URL of the application
+        profile (RampProfile): Active candidates over time
+        max_sessions (int): Stop after this many sessions were started
+        answer_size (str): Key of ANSWER_SIZES for open-ended answers
+        timeout (float): Seconds to wait for a response
+        stats (LoadStats): Counters to record into (e.g. with a lock error hook)
+        progress (callable): Called with the LoadStats every progress_interval seconds
+        progress_interval (float): Seconds between progress calls
+
+    Returns:
+        LoadStats: Counters of the finished run
+    """
+    if answer_size not in ANSWER_SIZES:
+        raise ValueError(f"Unknown answer size: {answer_size}")
+
+    stats = stats or LoadStats()
+    stop = threading.Event()
+    started = time.perf_counter()
+    counter = {"started": 0}
+    counter_lock = threading.Lock()
+
+    def next_seed():
+        with counter_lock:
+            if max_sessions is not None and counter["started"] >= max_sessions:
+                return None
+            counter["started"] += 1
+            return counter["started"]
+
+    def candidate(index):
+        session = CandidateSession(base_url, stats, answer_size, timeout)
+        while not stop.is_set():
+            elapsed = time.perf_counter() - started
+            if elapsed >= profile.duration:
+                return
+            if index >= profile.target(elapsed):
+                stop.wait(0.05)
+                continue
+            seed = next_seed()
+            if seed is None:
+                return
+            stats.session_done(session.run(seed))
+
+    threads = [threading.Thread(target=candidate, args=(i,), daemon=True) for i in range(profile.peak)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        next_progress = time.perf_counter() + progress_interval
+        while any(thread.is_alive() for thread in threads):
+            time.sleep(0.1)
+            if progress and time.perf_counter() >= next_progress:
+                progress(stats)
+                next_progress += progress_interval
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats.stop()
+
+    return stats
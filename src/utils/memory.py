@@ -0,0 +1,258 @@
+"""
+Memory accounting for the sales aptitude test.
+
+A worker's memory is broken down by subsystem in two ways:
+
+* Object sizes: the bytes reachable from each subsystem's root objects (the
+  analyzer, the question catalog, the result caches, the in-process indexes
+  and the SQLAlchemy identity map), walking references but stopping at
+  modules, classes, functions and shared SQLAlchemy machinery. Always
+  available and exact for what the subsystem holds right now.
+* Allocation sites: with tracemalloc tracing, every live allocation is
+  attributed to the innermost frame of its traceback that belongs to a
+  subsystem's source files. Tracing must start before the allocations it
+  should see: set MEMORY_TRACING (tracing starts when the app is created) or
+  PYTHONTRACEMALLOC=25 (from interpreter start, which also covers the
+  analyzer models built at import time).
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+import types
+
+from src.utils.prefork import process_memory
+
+
+MIB = 1024 * 1024
+
+# Per-subsystem object size budgets of a fully warmed worker, in bytes
+MEMORY_BUDGETS = {
+    "analyzer": 4 * MIB,
+    "catalog": 1 * MIB,
+    "result_caches": 64 * MIB,
+    "indexes": 64 * MIB,
+    "identity_map": 16 * MIB
+}
+
+# Source files whose allocations belong to each subsystem (path fragments)
+SUBSYSTEM_SOURCES = {
+    "analyzer": ("src/utils/ai_analyzer.py",),
+    "catalog": ("src/data/catalog.py", "src/data/question_bank.py", "src/models/question_model.py"),
+    "result_caches": ("src/utils/result_cache.py", "src/utils/fragment_cache.py"),
+    "indexes": ("src/utils/percentiles.py", "src/utils/adaptive.py", "src/utils/near_duplicates.py",
+                "src/utils/score_matrix.py", "src/utils/similar.py"),
+    "identity_map": ("sqlalchemy/orm/",)
+}
+
+
+def _stop_types():
+    """Types whose instances are shared machinery, not subsystem data."""
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import Mapper, Session
+    from sqlalchemy.orm.instrumentation import ClassManager
+
+    return (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+            types.CodeType, types.FrameType, Session, Mapper, ClassManager, Engine)
+
+
+def deep_sizeof(roots, stop_types=None, seen=None):
+    """
+    Measure the bytes reachable from some objects.
+
+    Args:
+        roots (iterable): Objects to measure
+        stop_types (tuple): Types not counted or followed
+        seen (set): IDs of objects already counted elsewhere (updated)
+
+    Returns:
+        tuple: (bytes, objects counted)
+    """
+    stop_types = stop_types or _stop_types()
+    seen = set() if seen is None else seen
+    stack = list(roots)
+    total = objects = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, stop_types):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        objects += 1
+        stack.extend(gc.get_referents(obj))
+    return total, objects
+
+
+def subsystem_roots(session=None):
+    """
+    Collect the root objects of each subsystem.
+
+    Args:
+        session: SQLAlchemy session whose identity map is measured (None to skip)
+
+    Returns:
+        dict: Subsystem name -> list of root objects
+    """
+    from src.data.catalog import question_catalog
+    from src.frontend.test_routes import analyzer
+    from src.utils.adaptive import adaptive_bank
+    from src.utils.fragment_cache import fragment_cache
+    from src.utils.near_duplicates import answer_index
+    from src.utils.percentiles import score_norms
+    from src.utils.result_cache import result_cache
+    from src.utils.score_matrix import score_matrix
+    from src.utils.similar import similar_index
+
+    return {
+        "analyzer": [analyzer],
+        "catalog": [question_catalog],
+        "result_caches": [result_cache, fragment_cache],
+        "indexes": [score_norms, adaptive_bank, answer_index, score_matrix, similar_index],
+        "identity_map": list(session.identity_map.values()) if session is not None else []
+    }
+
+
+def subsystem_sizes(session=None):
+    """
+    Measure the objects held by each subsystem.
+
+    Objects reachable from several subsystems count towards the first.
+
+    Args:
+        session: SQLAlchemy session whose identity map is measured
+
+    Returns:
+        dict: Subsystem name -> {"bytes", "objects"}
+    """
+    stop_types = _stop_types()
+    seen = set()
+    sizes = {}
+    for name, roots in subsystem_roots(session).items():
+        size, objects = deep_sizeof(roots, stop_types, seen)
+        sizes[name] = {"bytes": size, "objects": objects}
+    return sizes
+
+
+def start_tracing(frames=25):
+    """Start tracemalloc (if not already tracing) with enough frames to reach the callers."""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def _subsystem_of(frames, filenames):
+    """
+    Find the subsystem of an allocation.
+
+    Args:
+        frames (tuple): Raw (filename, lineno) frames, most recent first
+        filenames (dict): Cache of the subsystem of each source file
+
+    Returns:
+        str: Subsystem of the innermost frame in a subsystem's sources, or "other"
+    """
+    for filename, _ in frames:
+        name = filenames.get(filename)
+        if name is None:
+            path = filename.replace(os.sep, '/')
+            name = filenames[filename] = next(
+                (subsystem for subsystem, fragments in SUBSYSTEM_SOURCES.items()
+                 if any(fragment in path for fragment in fragments)),
+                ''
+            )
+        if name:
+            return name
+    return "other"
+
+
+def _raw_traces(snapshot):
+    """
+    Iterate a snapshot's traces as (size, frames) pairs.
+
+    A warmed worker holds hundreds of thousands of traces, so the raw
+    (domain, size, frames, ...) tuples CPython keeps behind
+    ``snapshot.traces`` are read directly when available, instead of
+    building a Trace object per allocation. Other implementations go
+    through the public API.
+
+    Yields:
+        tuple: (bytes, raw (filename, lineno) frames, most recent first)
+    """
+    raw = getattr(snapshot.traces, '_traces', None)
+    if raw is not None:
+        for _, size, frames, *_ in raw:
+            yield size, frames
+        return
+    for trace in snapshot.traces:
+        yield trace.size, tuple((frame.filename, frame.lineno) for frame in reversed(trace.traceback))
+
+
+def traced_allocations(top=10):
+    """
+    Attribute the live traced allocations to subsystems.
+
+    Args:
+        top (int): Largest allocation sites (source lines) reported
+
+    Returns:
+        dict: traced/peak bytes, bytes per subsystem and the top allocation
+            sites, or None when tracemalloc is not tracing
+    """
+    if not tracemalloc.is_tracing():
+        return None
+
+    snapshot = tracemalloc.take_snapshot()
+    by_subsystem = {name: 0 for name in SUBSYSTEM_SOURCES}
+    by_subsystem["other"] = 0
+    sites = {}
+    filenames = {}
+    tracebacks = {}
+    # Classify each distinct traceback once
+    for size, frames in _raw_traces(snapshot):
+        name = tracebacks.get(frames)
+        if name is None:
+            name = tracebacks[frames] = _subsystem_of(frames, filenames)
+        by_subsystem[name] += size
+        key = frames[0] if frames else ('<unknown>', 0)
+        site = sites.get(key)
+        if site is None:
+            site = sites[key] = [0, 0]
+        site[0] += size
+        site[1] += 1
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "traced_bytes": current,
+        "peak_bytes": peak,
+        "subsystems": by_subsystem,
+        "top": [
+            {"site": f"{filename}:{lineno}", "bytes": size, "blocks": blocks}
+            for (filename, lineno), (size, blocks) in sorted(sites.items(), key=lambda item: -item[1][0])[:top]
+        ]
+    }
+
+
+def memory_report(session=None, top=10):
+    """
+    Build the memory report of this worker.
+
+    Args:
+        session: SQLAlchemy session whose identity map is measured
+        top (int): Largest allocation sites reported when tracing
+
+    Returns:
+        dict: Process memory, object sizes and budgets per subsystem, and
+            traced allocations (None unless tracemalloc is tracing)
+    """
+    sizes = subsystem_sizes(session)
+    for name, size in sizes.items():
+        budget = MEMORY_BUDGETS.get(name)
+        size["budget"] = budget
+        size["over_budget"] = budget is not None and size["bytes"] > budget
+
+    return {
+        "pid": os.getpid(),
+        "process": process_memory(),
+        "subsystems": sizes,
+        "tracemalloc": traced_allocations(top)
+    }
@@ -0,0 +1,261 @@
+"""
+Request and stage timing metrics for the sales aptitude test.
+
+Code marks its stages with ``metrics.stage(name)``; each stage's duration
+goes into an in-process histogram and, during a request, into the
+``Server-Timing`` response header so browser dev tools show where a slow
+submit spent its time. ``/metrics`` exposes request counts, request and
+stage latencies, cache hit ratios and database pool usage in the Prometheus
+text format. Every pre-forked worker keeps its own counters.
+
+Metrics are off unless METRICS_ENABLED is set; disabled, a stage is a
+shared no-op context manager and the request hooks return immediately.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+
+from flask import g, has_request_context, request
+
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefix of every exported metric name
+PREFIX = "aptitude"
+
+_NULL_STAGE = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        """Add one observation; the caller must hold the registry lock."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """(upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class _Stage:
+    """Context manager timing one stage."""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """In-process registry of request and stage timings."""
+
+    def __init__(self, enabled=False):
+        """
+        Initialize an empty registry.
+
+        Args:
+            enabled (bool): Whether to record anything
+        """
+        self.enabled = enabled
+        self._requests = {}        # (method, endpoint, status) -> count
+        self._request_seconds = {}  # endpoint -> Histogram
+        self._stage_seconds = {}    # stage -> Histogram
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure metrics from the Flask app config and install the request hooks.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('METRICS_ENABLED', self.enabled)
+        self.enabled = app.config['METRICS_ENABLED']
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def stage(self, name):
+        """
+        Time a block of code as a named stage.
+
+        Args:
+            name (str): Stage name, e.g. ``scoring``
+
+        Returns:
+            A context manager (a shared no-op one when metrics are disabled)
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def observe_stage(self, name, seconds):
+        """
+        Record the duration of a stage.
+
+        Args:
+            name (str): Stage name
+            seconds (float): Duration
+        """
+        with self._lock:
+            histogram = self._stage_seconds.get(name)
+            if histogram is None:
+                histogram = self._stage_seconds[name] = Histogram()
+            histogram.observe(seconds)
+
+        if has_request_context():
+            timings = g.setdefault('stage_timings', {})
+            timings[name] = timings.get(name, 0.0) + seconds
+
+    def _before_request(self):
+        if self.enabled:
+            g.request_started = time.perf_counter()
+
+    def _after_request(self, response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+
+        seconds = time.perf_counter() - started
+        # Label by route, not URL, so result IDs do not explode the series
+        endpoint = request.endpoint or 'unmatched'
+        key = (request.method, endpoint, response.status_code)
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._request_seconds.get(endpoint)
+            if histogram is None:
+                histogram = self._request_seconds[endpoint] = Histogram()
+            histogram.observe(seconds)
+
+        timings = g.get('stage_timings', {})
+        entries = [f"{name};dur={value * 1000:.2f}" for name, value in timings.items()]
+        entries.append(f"total;dur={seconds * 1000:.2f}")
+        response.headers.add('Server-Timing', ', '.join(entries))
+        return response
+
+    def snapshot(self):
+        """
+        Copy the recorded counters.
+
+        Returns:
+            dict: requests ((method, endpoint, status) -> count), and
+                request_seconds / stage_seconds (label -> (cumulative buckets, count, sum))
+        """
+        def copy(histograms):
+            return {label: (h.cumulative(), h.count, h.sum) for label, h in histograms.items()}
+
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "request_seconds": copy(self._request_seconds),
+                "stage_seconds": copy(self._stage_seconds)
+            }
+
+    def render(self, caches=None, pool=None):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Args:
+            caches (dict): Cache name -> stats dict with hits, misses and hit_ratio
+            pool: SQLAlchemy connection pool, reported if it keeps counters
+
+        Returns:
+            str: The exposition text
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f"# HELP {PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        def sample(name, labels, value):
+            label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{PREFIX}_{name}{{{label_text}}} {_number(value)}" if label_text
+                         else f"{PREFIX}_{name} {_number(value)}")
+
+        def histogram(name, label, histograms):
+            for value, (buckets, count, total) in sorted(histograms.items()):
+                for bound, cumulative in buckets:
+                    sample(f"{name}_bucket", {label: value, "le": "+Inf" if bound == float('inf') else repr(bound)},
+                           cumulative)
+                sample(f"{name}_count", {label: value}, count)
+                sample(f"{name}_sum", {label: value}, total)
+
+        header("requests_total", "counter", "HTTP requests handled by this worker.")
+        for (method, endpoint, status), count in sorted(snapshot["requests"].items()):
+            sample("requests_total", {"method": method, "endpoint": endpoint, "status": status}, count)
+
+        header("request_duration_seconds", "histogram", "Time to handle a request, by endpoint.")
+        histogram("request_duration_seconds", "endpoint", snapshot["request_seconds"])
+
+        header("stage_duration_seconds", "histogram", "Time spent in each processing stage.")
+        histogram("stage_duration_seconds", "stage", snapshot["stage_seconds"])
+
+        if caches:
+            header("cache_hits_total", "counter", "Cache lookups answered from the cache.")
+            for name, stats in caches.items():
+                sample("cache_hits_total", {"cache": name}, stats.get("hits", 0))
+            header("cache_misses_total", "counter", "Cache lookups that missed.")
+            for name, stats in caches.items():
+                sample("cache_misses_total", {"cache": name}, stats.get("misses", 0))
+            header("cache_hit_ratio", "gauge", "Share of cache lookups answered from the cache.")
+            for name, stats in caches.items():
+                sample("cache_hit_ratio", {"cache": name}, stats.get("hit_ratio", 0.0))
+
+        # QueuePool-style pools keep counters; others (e.g. NullPool) do not
+        if pool is not None and hasattr(pool, 'checkedout'):
+            for name, method, description in (
+                ("db_pool_size", "size", "Connections the pool keeps open."),
+                ("db_pool_checked_out", "checkedout", "Connections in use."),
+                ("db_pool_checked_in", "checkedin", "Idle connections in the pool."),
+                ("db_pool_overflow", "overflow", "Connections opened beyond the pool size.")
+            ):
+                header(name, "gauge", description)
+                sample(name, {}, getattr(pool, method)())
+
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """Reset every counter."""
+        with self._lock:
+            self._requests.clear()
+            self._request_seconds.clear()
+            self._stage_seconds.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Shared metrics registry
+metrics = Metrics()
@@ -0,0 +1,310 @@
+"""
+Near-duplicate detection for open-ended answers of the sales aptitude test.
+
+Answers are reduced to sets of character shingles and summarized by MinHash
+signatures, whose agreement estimates the Jaccard similarity of the sets.
+Signatures are split into bands and bucketed (locality-sensitive hashing),
+so a lookup only compares an answer against the few stored answers sharing
+a bucket instead of against the whole history.
+"""
+
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 8  # 8 bands of 8 rows: pairs above ~0.77 similarity share a bucket
+SIGNATURE_DTYPE = np.uint32
+
+# Largest prime below 2**32: a * x + b stays below 2**64 for a, b, x < p,
+# so (a * x + b) mod p is computed exactly in uint64
+_PRIME = (1 << 32) - 5
+_WHITESPACE = re.compile(r'\s+')
+_NON_WORD = re.compile(r'[^\w\s]')
+
+
+def normalize_text(text):
+    """Lowercase an answer and collapse punctuation and whitespace."""
+    return _WHITESPACE.sub(' ', _NON_WORD.sub(' ', text.lower())).strip()
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """
+    Hash the distinct character shingles of an answer.
+
+    Args:
+        text (str): The answer text
+        size (int): Shingle length in characters
+
+    Returns:
+        ndarray: Unique 32-bit shingle hashes (empty for blank answers)
+    """
+    text = normalize_text(text)
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    if len(text) <= size:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+class MinHasher:
+    """MinHash signatures from a fixed family of random hash permutations."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        """
+        Initialize the permutations.
+
+        Args:
+            num_perm (int): Signature length
+            seed (int): Random seed; signatures are only comparable with the same seed
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of an answer.
+
+        Args:
+            text (str): The answer text
+
+        Returns:
+            ndarray: Signature of num_perm 32-bit values, or None for blank answers
+        """
+        hashes = shingle_hashes(text) % np.uint64(_PRIME)
+        if not len(hashes):
+            return None
+        permuted = (hashes[:, None] * self._a + self._b) % np.uint64(_PRIME)
+        return permuted.min(axis=0).astype(SIGNATURE_DTYPE)
+
+
+def similarity(first, second):
+    """Estimate the Jaccard similarity of two answers from their signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LshIndex:
+    """Banded LSH buckets over MinHash signatures."""
+
+    def __init__(self, bands=BANDS):
+        """
+        Initialize an empty index.
+
+        Args:
+            bands (int): Number of bands the signatures are split into
+        """
+        self.bands = bands
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _band_keys(self, signature):
+        return [band.tobytes() for band in np.split(signature, self.bands)]
+
+    def add(self, key, signature):
+        """
+        Index a signature.
+
+        Args:
+            key: Identifier of the answer
+            signature (ndarray): Its MinHash signature
+        """
+        if key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, []).append(key)
+
+    def query(self, signature, threshold):
+        """
+        Find indexed answers similar to a signature.
+
+        Args:
+            signature (ndarray): MinHash signature to look up
+            threshold (float): Minimum estimated Jaccard similarity
+
+        Returns:
+            list: (key, similarity) pairs, most similar first
+        """
+        candidates = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            value = similarity(signature, self._signatures[key])
+            if value >= threshold:
+                matches.append((key, value))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+    def candidate_pairs(self):
+        """
+        Yield every pair of indexed keys sharing at least one bucket.
+
+        Yields:
+            tuple: (key, key, estimated similarity), each pair once
+        """
+        seen = set()
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                for i in range(len(keys)):
+                    for j in range(i + 1, len(keys)):
+                        pair = (keys[i], keys[j]) if keys[i] < keys[j] else (keys[j], keys[i])
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        yield pair[0], pair[1], similarity(self._signatures[pair[0]], self._signatures[pair[1]])
+
+
+def duplicate_clusters(pairs):
+    """
+    Group near-duplicate pairs into clusters (connected components).
+
+    Args:
+        pairs (iterable): (key, key) pairs judged near-duplicates
+
+    Returns:
+        list: Sorted key lists, largest cluster first
+    """
+    parent = {}
+
+    def find(key):
+        parent.setdefault(key, key)
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for first, second in pairs:
+        root_first, root_second = find(first), find(second)
+        if root_first != root_second:
+            parent[root_second] = root_first
+
+    clusters = {}
+    for key in parent:
+        clusters.setdefault(find(key), []).append(key)
+    return sorted((sorted(keys) for keys in clusters.values()), key=lambda keys: (-len(keys), keys[0]))
+
+
+class AnswerIndex:
+    """
+    Process-wide LSH index of stored open-ended answers.
+
+    Keys are ``(test_result_id, question_id)`` pairs. Answers saved by this
+    process are added right after commit; answers saved by other workers
+    are picked up from the ``answer_signatures_v2`` table every
+    ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, threshold=0.8, refresh_interval=60):
+        """
+        Initialize an empty index.
+
+        Args:
+            threshold (float): Estimated Jaccard similarity flagged as a near-duplicate
+            refresh_interval (float): Seconds between loads of other workers' signatures
+        """
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self.hasher = MinHasher()
+        self._index = LshIndex()
+        self._last_result_id = 0
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the index from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('DUPLICATE_THRESHOLD', self.threshold)
+        app.config.setdefault('DUPLICATE_INDEX_REFRESH_INTERVAL', self.refresh_interval)
+        self.threshold = app.config['DUPLICATE_THRESHOLD']
+        self.refresh_interval = app.config['DUPLICATE_INDEX_REFRESH_INTERVAL']
+        self.clear()
+
+    @property
+    def is_stale(self):
+        """Whether signatures stored by other workers should be loaded."""
+        return self._synced_at is None or time.monotonic() - self._synced_at > self.refresh_interval
+
+    def sync(self):
+        """Load signatures stored since the last sync (inside an app context)."""
+        from src.data.database import iter_answer_signatures
+
+        with self._lock:
+            for result_id, question_id, signature in iter_answer_signatures(after_result_id=self._last_result_id):
+                self._index.add((result_id, question_id), signature)
+                self._last_result_id = max(self._last_result_id, result_id)
+            self._synced_at = time.monotonic()
+
+    def add(self, entries):
+        """
+        Index newly committed signatures.
+
+        Args:
+            entries (iterable): (test_result_id, question_id, signature) tuples
+        """
+        with self._lock:
+            for result_id, question_id, signature in entries:
+                self._index.add((result_id, question_id), signature)
+
+    def find(self, answers, questions_by_id, exclude_result_id=None):
+        """
+        Flag open-ended answers that nearly duplicate stored answers.
+
+        Args:
+            answers (dict): Question ID -> response of one attempt
+            questions_by_id (callable): Question ID -> question, or None
+            exclude_result_id (int): Result whose own answers are ignored
+
+        Returns:
+            dict: Question ID -> list of {"result_id", "question_id",
+                "similarity"} matches, only for flagged answers
+        """
+        if self.is_stale:
+            self.sync()
+
+        flagged = {}
+        for qid, answer in answers.items():
+            question = questions_by_id(int(qid)) if str(qid).isdigit() else None
+            if question is None or question.type != 'open_ended' or not isinstance(answer, str):
+                continue
+            signature = self.hasher.signature(answer)
+            if signature is None:
+                continue
+
+            with self._lock:
+                matches = self._index.query(signature, self.threshold)
+            matches = [
+                {"result_id": key[0], "question_id": key[1], "similarity": round(value, 3)}
+                for key, value in matches if key[0] != exclude_result_id
+            ]
+            if matches:
+                flagged[str(qid)] = matches
+        return flagged
+
+    def clear(self):
+        """Forget every indexed signature so the next lookup reloads them."""
+        with self._lock:
+            self._index = LshIndex()
+            self._last_result_id = 0
+            self._synced_at = None
+
+
+# Shared index of stored open-ended answers
+answer_index = AnswerIndex()
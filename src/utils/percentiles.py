@@ -0,0 +1,163 @@
+"""
+Percentile ranking against historical score norms for the sales aptitude test.
+
+Category scores are rounded to two decimals on a 0-5 scale, so a fixed-bin
+histogram with one bin per 0.01 represents the norm group exactly in 501
+counters per category. Lookups read precomputed cumulative counts and are
+O(1); the histograms themselves live in the ``score_norm_bins`` table.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+NORM_BIN_WIDTH = 0.01
+NORM_BIN_COUNT = 501  # 0.00 to 5.00 inclusive
+
+
+def score_bin(score):
+    """
+    Get the histogram bin of a score.
+
+    Args:
+        score (float): A category score on the 0-5 scale
+
+    Returns:
+        int: Bin index between 0 and NORM_BIN_COUNT - 1
+    """
+    return min(max(int(round(score / NORM_BIN_WIDTH)), 0), NORM_BIN_COUNT - 1)
+
+
+def top_percent(percentile):
+    """
+    Convert a percentile into a "top X%" figure for display.
+
+    Args:
+        percentile (float): Percentage of candidates scoring below this one
+
+    Returns:
+        int: The share of candidates at or above this score, at least 1
+    """
+    return max(int(round(100 - percentile)), 1)
+
+
+class ScoreNorms:
+    """In-process percentile lookup tables built from per-category histograms."""
+
+    def __init__(self, refresh_interval=60):
+        """
+        Initialize empty norms.
+
+        Args:
+            refresh_interval (float): Seconds before the tables are reloaded from
+                the database, picking up submissions handled by other workers
+        """
+        self.refresh_interval = refresh_interval
+        self._tables = {}  # category -> (counts, below, total)
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the norms from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('NORMS_REFRESH_INTERVAL', self.refresh_interval)
+        self.refresh_interval = app.config['NORMS_REFRESH_INTERVAL']
+        self.clear()
+
+    @property
+    def is_stale(self):
+        """Whether the tables should be reloaded from the database."""
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_interval
+
+    def set_histograms(self, histograms):
+        """
+        Replace the lookup tables.
+
+        Args:
+            histograms (dict): Category -> array of NORM_BIN_COUNT bin counts
+        """
+        tables = {}
+        for category, counts in histograms.items():
+            counts = np.asarray(counts, dtype=np.int64)
+            tables[category] = self._build_table(counts)
+
+        with self._lock:
+            self._tables = tables
+            self._loaded_at = time.monotonic()
+
+    def add(self, scores):
+        """
+        Count a newly committed result in the local tables.
+
+        Args:
+            scores (dict): Category -> score for one result
+        """
+        with self._lock:
+            for category, score in scores.items():
+                if not isinstance(score, (int, float)):
+                    continue
+                table = self._tables.get(category)
+                counts = table[0].copy() if table else np.zeros(NORM_BIN_COUNT, dtype=np.int64)
+                counts[score_bin(score)] += 1
+                self._tables[category] = self._build_table(counts)
+
+    def percentile(self, category, score):
+        """
+        Get the percentile of a score within its category's norm group.
+
+        Args:
+            category (str): Category name (or 'overall')
+            score (float): The score to rank
+
+        Returns:
+            float: Percentage of results scoring below (counting ties as half),
+                or None when there are no norms for the category
+        """
+        table = self._tables.get(category)
+        if table is None or not isinstance(score, (int, float)):
+            return None
+
+        counts, below, total = table
+        if not total:
+            return None
+
+        b = score_bin(score)
+        return round(100.0 * (below[b] + 0.5 * counts[b]) / total, 1)
+
+    def percentiles(self, scores):
+        """
+        Rank every score of a result.
+
+        Args:
+            scores (dict): Category -> score
+
+        Returns:
+            dict: Category -> percentile, for categories with norms
+        """
+        ranked = {}
+        for category, score in scores.items():
+            value = self.percentile(category, score)
+            if value is not None:
+                ranked[category] = value
+        return ranked
+
+    def clear(self):
+        """Drop the tables so the next lookup reloads them."""
+        with self._lock:
+            self._tables = {}
+            self._loaded_at = None
+
+    @staticmethod
+    def _build_table(counts):
+        below = np.cumsum(counts) - counts
+        return counts, below, int(counts.sum())
+
+
+# Shared percentile lookup tables
+score_norms = ScoreNorms()
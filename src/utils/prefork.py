@@ -0,0 +1,107 @@
+"""
+Pre-fork deployment support for the sales aptitude test.
+"""
+
+import gc
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows: no pre-forking server
+    resource = None
+
+
+def process_memory(pid='self'):
+    """
+    Measure the memory of a process.
+
+    On Linux the figures come from /proc/<pid>/smaps_rollup: ``pss`` splits
+    shared pages between the processes sharing them and ``private`` is memory
+    only this process holds, which is what copy-on-write sharing reduces.
+
+    Args:
+        pid: Process ID, or 'self' for the current process
+
+    Returns:
+        dict: Memory figures in bytes (rss, and pss/shared/private where
+            available), empty where neither source exists (Windows)
+    """
+    fields = {
+        'Rss': 'rss',
+        'Pss': 'pss',
+        'Shared_Clean': 'shared_clean',
+        'Shared_Dirty': 'shared_dirty',
+        'Private_Clean': 'private_clean',
+        'Private_Dirty': 'private_dirty'
+    }
+    memory = {}
+
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                key = parts[0].rstrip(':')
+                if key in fields:
+                    memory[fields[key]] = int(parts[1]) * 1024
+    except OSError:
+        # Not Linux: fall back to the peak resident set size
+        if resource is None:
+            return {}
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss": maxrss if sys.platform == 'darwin' else maxrss * 1024}
+
+    memory['shared'] = memory.get('shared_clean', 0) + memory.get('shared_dirty', 0)
+    memory['private'] = memory.get('private_clean', 0) + memory.get('private_dirty', 0)
+    return memory
+
+
+def format_memory(memory):
+    """Format a process_memory() result as a short log string."""
+    return ', '.join(f"{key}={value / (1024 * 1024):.1f}MiB" for key, value in sorted(memory.items()))
+
+
+def preload(app):
+    """
+    Load shared read-only state once in the master process before forking.
+
+    Loads the question catalog, builds the response analyzer models and
+    compiles every template, then moves all surviving objects into the
+    permanent GC generation so the garbage collector in the forked workers
+    never writes to (and so never copies) their pages. Database connections
+    are closed so each worker opens its own.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        dict: Master process memory before and after preloading
+    """
+    from src.data.catalog import question_catalog
+    from src.data.database import db
+    from src.frontend import test_routes
+    from src.utils.templates import precompile_templates
+
+    before = process_memory()
+
+    with app.app_context():
+        question_catalog.load(app.json.dumps)
+
+        # Connections must not be shared across fork: let every worker open its own
+        db.session.remove()
+        db.engine.dispose()
+
+    # Touch the analyzer so its vectorizer and reference matrices are built
+    test_routes.analyzer.analyze_open_ended_response("warm up", "persuasion")
+
+    precompile_templates(app)
+
+    gc.collect()
+    gc.freeze()
+
+    after = process_memory()
+    report = {"before": before, "after": after, "frozen_objects": gc.get_freeze_count()}
+    app.extensions['prefork'] = report
+
+    app.logger.info("Preloaded shared state: before [%s], after [%s], %d objects frozen",
+                    format_memory(before), format_memory(after), report['frozen_objects'])
+    return report
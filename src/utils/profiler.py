@@ -0,0 +1,335 @@
+"""
+On-demand request profiling for the sales aptitude test.
+
+Two capture modes, both opt-in through PROFILER_ENABLED:
+
+* A random PROFILER_SAMPLE_RATE share of requests runs under cProfile and
+  is always captured.
+* Every other request is watched by a background stack sampler that reads
+  the request thread's stack every PROFILER_SAMPLE_INTERVAL seconds; the
+  samples are kept only when the request takes longer than
+  PROFILER_SLOW_THRESHOLD, so slow requests are captured without the cost of
+  deterministic profiling.
+
+Each capture is a JSON file of request metadata and per-function self and
+cumulative seconds (cProfile captures also keep the raw ``.prof`` file for
+pstats or snakeviz). The directory keeps the newest PROFILER_MAX_FILES
+captures. ``flask profile-cli hotspots`` aggregates them.
+"""
+
+import cProfile
+import glob
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request
+
+
+def function_key(filename, lineno, name):
+    """Identify a function the way pstats prints it: ``file:line(name)``."""
+    return f"{filename}:{lineno}({name})"
+
+
+def profile_functions(profile):
+    """
+    Summarize a cProfile run per function.
+
+    Args:
+        profile (cProfile.Profile): A finished profile
+
+    Returns:
+        dict: Function key -> [self seconds, cumulative seconds, calls]
+    """
+    stats = pstats.Stats(profile).stats
+    return {
+        function_key(*func): [tottime, cumtime, calls]
+        for func, (_, calls, tottime, cumtime, _) in stats.items()
+    }
+
+
+def sample_functions(samples, interval):
+    """
+    Summarize sampled stacks per function.
+
+    A function's self time is the time it was the innermost frame; its
+    cumulative time is the time it was anywhere on the stack.
+
+    Args:
+        samples (dict): Stack (tuple of function keys, outermost first) -> count
+        interval (float): Seconds between samples
+
+    Returns:
+        dict: Function key -> [self seconds, cumulative seconds, samples]
+    """
+    functions = {}
+    for stack, count in samples.items():
+        for key in set(stack):
+            entry = functions.setdefault(key, [0.0, 0.0, 0])
+            entry[1] += count * interval
+            entry[2] += count
+        if stack:
+            functions[stack[-1]][0] += count * interval
+    return functions
+
+
+class StackSampler:
+    """Background thread sampling the stacks of registered threads."""
+
+    # Frames recorded per sample, innermost kept when deeper
+    MAX_DEPTH = 128
+
+    def __init__(self, interval=0.005):
+        """
+        Initialize an idle sampler.
+
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self._watched = {}  # Thread ident -> {stack: count}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_running(self):
+        # Threads do not survive fork, so each worker starts its own
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def start(self, ident):
+        """Start sampling a thread."""
+        with self._lock:
+            self._watched[ident] = {}
+            self._ensure_running()
+
+    def stop(self, ident):
+        """
+        Stop sampling a thread.
+
+        Returns:
+            dict: Stack -> number of samples taken
+        """
+        with self._lock:
+            return self._watched.pop(ident, {})
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._watched:
+                    continue
+                frames = sys._current_frames()
+                for ident, samples in self._watched.items():
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < self.MAX_DEPTH:
+                        code = frame.f_code
+                        stack.append(function_key(code.co_filename, code.co_firstlineno, code.co_name))
+                        frame = frame.f_back
+                    stack = tuple(reversed(stack))
+                    samples[stack] = samples.get(stack, 0) + 1
+
+
+class RequestProfiler:
+    """Captures profiles of sampled and slow requests into a rotating directory."""
+
+    def __init__(self, sample_rate=0.01, slow_threshold=1.0, max_files=200, sample_interval=0.005):
+        """
+        Initialize a disabled profiler.
+
+        Args:
+            sample_rate (float): Share of requests profiled with cProfile
+            slow_threshold (float): Seconds after which a sampled request is
+                captured (0 or less to disable the stack sampler)
+            max_files (int): Captures kept in the directory
+            sample_interval (float): Seconds between stack samples
+        """
+        self.enabled = False
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.max_files = max_files
+        self.directory = None
+        self.sampler = StackSampler(sample_interval)
+        self._write_lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the profiler from the Flask app config and install the request hooks.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('PROFILER_ENABLED', False)
+        app.config.setdefault('PROFILER_SAMPLE_RATE', self.sample_rate)
+        app.config.setdefault('PROFILER_SLOW_THRESHOLD', self.slow_threshold)
+        app.config.setdefault('PROFILER_SAMPLE_INTERVAL', self.sampler.interval)
+        app.config.setdefault('PROFILER_MAX_FILES', self.max_files)
+        app.config.setdefault('PROFILER_DIR', os.path.join(app.root_path, 'cache', 'profiles'))
+        self.enabled = app.config['PROFILER_ENABLED']
+        self.sample_rate = app.config['PROFILER_SAMPLE_RATE']
+        self.slow_threshold = app.config['PROFILER_SLOW_THRESHOLD']
+        self.sampler.interval = app.config['PROFILER_SAMPLE_INTERVAL']
+        self.max_files = app.config['PROFILER_MAX_FILES']
+        self.directory = app.config['PROFILER_DIR']
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def _before_request(self):
+        if not self.enabled:
+            return
+        g.profile_started = time.perf_counter()
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # Another profiler is active in this thread
+                return
+            g.profile = profile
+        elif self.slow_threshold > 0:
+            g.profile_sampled = threading.get_ident()
+            self.sampler.start(g.profile_sampled)
+
+    def _after_request(self, response):
+        if 'profile_started' in g:
+            g.profile_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        started = g.pop('profile_started', None)
+        if started is None:
+            return
+        profile = g.pop('profile', None)
+        if profile is not None:
+            profile.disable()
+        samples = self.sampler.stop(g.pop('profile_sampled')) if 'profile_sampled' in g else None
+        duration = time.perf_counter() - started
+
+        if profile is not None:
+            self.capture('cprofile', duration, profile_functions(profile), profile=profile, error=exc)
+        elif samples is not None and duration >= self.slow_threshold:
+            self.capture('sampling', duration, sample_functions(samples, self.sampler.interval),
+                         samples=sum(samples.values()), error=exc)
+
+    def capture(self, mode, duration, functions, profile=None, samples=None, error=None):
+        """
+        Write a capture of the current request and rotate the directory.
+
+        Args:
+            mode (str): ``cprofile`` or ``sampling``
+            duration (float): Request duration in seconds
+            functions (dict): Function key -> [self seconds, cumulative seconds, calls/samples]
+            profile (cProfile.Profile): Raw profile saved next to the capture
+            samples (int): Stack samples taken (sampling mode)
+            error (Exception): Exception that ended the request, if any
+
+        Returns:
+            str: Path of the capture file
+        """
+        now = datetime.utcnow()
+        endpoint = request.endpoint or 'unmatched'
+        metadata = {
+            "mode": mode,
+            "method": request.method,
+            "path": request.path,
+            "endpoint": endpoint,
+            "status": g.pop('profile_status', 500 if error else None),
+            "duration": duration,
+            "timestamp": now.isoformat(),
+            "pid": os.getpid(),
+            "error": repr(error) if error else None,
+            "samples": samples,
+            "sample_interval": self.sampler.interval if mode == 'sampling' else None
+        }
+        name = f"{now:%Y%m%dT%H%M%S%f}-{os.getpid()}-{threading.get_ident() % 100000}-{endpoint.replace('.', '_')}"
+
+        with self._write_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, name + '.json')
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"request": metadata, "functions": functions}, f)
+            os.replace(tmp_path, path)
+            if profile is not None:
+                profile.dump_stats(os.path.join(self.directory, name + '.prof'))
+            self._rotate()
+        return path
+
+    def _rotate(self):
+        """Delete the oldest captures beyond max_files (names sort by time)."""
+        captures = sorted(glob.glob(os.path.join(self.directory, '*.json')))
+        for path in captures[:max(0, len(captures) - self.max_files)]:
+            for stale in (path, path[:-len('.json')] + '.prof'):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+
+def load_captures(directory, endpoint=None, mode=None, min_duration=0.0):
+    """
+    Read the captures of a profile directory.
+
+    Args:
+        directory (str): Directory written by the profiler
+        endpoint (str): Only captures of this endpoint (e.g. ``test.submit_test``)
+        mode (str): Only ``cprofile`` or ``sampling`` captures
+        min_duration (float): Only requests at least this slow
+
+    Yields:
+        dict: Capture with ``request`` metadata and ``functions``
+    """
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        try:
+            with open(path, encoding='utf-8') as f:
+                capture = json.load(f)
+        except (OSError, ValueError):
+            continue  # Rotated away or half-written by another worker
+        meta = capture.get("request", {})
+        if endpoint and meta.get("endpoint") != endpoint:
+            continue
+        if mode and meta.get("mode") != mode:
+            continue
+        if meta.get("duration", 0.0) < min_duration:
+            continue
+        yield capture
+
+
+def aggregate_hotspots(captures):
+    """
+    Sum per-function times across captures.
+
+    Args:
+        captures (iterable): Captures from load_captures
+
+    Returns:
+        tuple: (number of captures, total request seconds, dict of function
+            key -> [self seconds, cumulative seconds, captures it appears in])
+    """
+    count = 0
+    total = 0.0
+    functions = {}
+    for capture in captures:
+        count += 1
+        total += capture["request"].get("duration", 0.0)
+        for key, (self_seconds, cumulative, _) in capture["functions"].items():
+            entry = functions.setdefault(key, [0.0, 0.0, 0])
+            entry[0] += self_seconds
+            entry[1] += cumulative
+            entry[2] += 1
+    return count, total, functions
+
+
+# Shared request profiler
+request_profiler = RequestProfiler()
@@ -0,0 +1,161 @@
+"""
+SQL statement counting for the sales aptitude test.
+
+Engine events time every statement the app executes. Statements slower than
+SQL_SLOW_QUERY_THRESHOLD are logged with their parameters. With
+SQL_QUERY_STATS enabled, each request logs how many statements it issued and
+how long they took, and warns when the same statement ran
+SQL_REPEAT_THRESHOLD times or more in one request, the signature of an N+1
+lazy-loading loop. Tests use ``query_stats.record()`` to hold endpoints to a
+statement budget.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+
+_log = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """Statements executed while a recording is active."""
+
+    def __init__(self):
+        self.statements = []  # (SQL, parameters, seconds)
+
+    @property
+    def count(self):
+        """Number of statements executed."""
+        return len(self.statements)
+
+    @property
+    def seconds(self):
+        """Total time spent executing statements."""
+        return sum(seconds for _, _, seconds in self.statements)
+
+    def repeated(self, min_count):
+        """
+        Find statements executed many times (with any parameters).
+
+        Args:
+            min_count (int): Minimum number of executions
+
+        Returns:
+            list: (SQL, executions) pairs, most executed first
+        """
+        counts = {}
+        for sql, _, _ in self.statements:
+            counts[sql] = counts.get(sql, 0) + 1
+        return sorted(((sql, n) for sql, n in counts.items() if n >= min_count), key=lambda pair: -pair[1])
+
+    def report(self):
+        """Numbered list of the recorded statements, for assertion messages."""
+        return '\n'.join(f"{i}. {sql}" for i, (sql, _, _) in enumerate(self.statements, 1))
+
+
+class QueryStats:
+    """Engine-event hooks counting and timing SQL statements."""
+
+    def __init__(self, slow_threshold=0.5, repeat_threshold=5):
+        """
+        Initialize the hooks.
+
+        Args:
+            slow_threshold (float): Seconds above which a statement is logged
+                (0 or less to disable)
+            repeat_threshold (int): Executions of one statement in a request
+                reported as a possible N+1 pattern
+        """
+        self.slow_threshold = slow_threshold
+        self.repeat_threshold = repeat_threshold
+        self.per_request = False
+        self._local = threading.local()
+
+    def init_app(self, app, engine):
+        """
+        Configure the hooks and listen to an engine.
+
+        Args:
+            app (Flask): The Flask application
+            engine (Engine): The app's SQLAlchemy engine
+        """
+        app.config.setdefault('SQL_SLOW_QUERY_THRESHOLD', self.slow_threshold)
+        app.config.setdefault('SQL_REPEAT_THRESHOLD', self.repeat_threshold)
+        app.config.setdefault('SQL_QUERY_STATS', self.per_request)
+        self.slow_threshold = app.config['SQL_SLOW_QUERY_THRESHOLD']
+        self.repeat_threshold = app.config['SQL_REPEAT_THRESHOLD']
+        self.per_request = app.config['SQL_QUERY_STATS']
+
+        if not event.contains(engine, 'before_cursor_execute', self._before_execute):
+            event.listen(engine, 'before_cursor_execute', self._before_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_execute)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _recorders(self):
+        recorders = getattr(self._local, 'recorders', None)
+        if recorders is None:
+            recorders = self._local.recorders = []
+        return recorders
+
+    @contextmanager
+    def record(self):
+        """
+        Record the statements executed by this thread inside the block.
+
+        Yields:
+            QueryRecorder: Filled as statements execute
+        """
+        recorder = QueryRecorder()
+        recorders = self._recorders()
+        recorders.append(recorder)
+        try:
+            yield recorder
+        finally:
+            recorders.remove(recorder)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        seconds = time.perf_counter() - conn.info['query_started'].pop()
+
+        for recorder in self._recorders():
+            recorder.statements.append((statement, parameters, seconds))
+
+        if 0 < self.slow_threshold <= seconds:
+            _logger().warning("Slow query (%.1f ms): %s; parameters: %r", seconds * 1000, statement, parameters)
+
+    def _before_request(self):
+        if self.per_request:
+            recording = self.record()
+            g.query_recording = recording
+            g.query_recorder = recording.__enter__()
+
+    def _after_request(self, response):
+        recording = g.pop('query_recording', None)
+        if recording is None:
+            return response
+        recording.__exit__(None, None, None)
+        recorder = g.pop('query_recorder')
+
+        logger = _logger()
+        logger.info("%s %s: %d SQL statements in %.1f ms", request.method, request.path,
+                    recorder.count, recorder.seconds * 1000)
+        for sql, executions in recorder.repeated(self.repeat_threshold):
+            logger.warning("Possible N+1 query in %s %s: executed %d times: %s",
+                           request.method, request.path, executions, sql)
+        return response
+
+
+def _logger():
+    return current_app.logger if has_app_context() else _log
+
+
+# Shared statement counter
+query_stats = QueryStats()
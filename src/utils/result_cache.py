@@ -0,0 +1,187 @@
+"""
+Result view cache for the sales aptitude test.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+def deep_sizeof(obj):
+    """
+    Estimate the memory footprint of a decoded JSON-like object.
+
+    Args:
+        obj: A dict, list, tuple, string or scalar
+
+    Returns:
+        int: Approximate size in bytes, including nested containers
+    """
+    size = 0
+    seen = set()
+    stack = [obj]
+
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+
+    return size
+
+
+class ResultCache:
+    """Thread-safe bounded LRU cache of decoded test result views with a TTL."""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached views (0 disables caching)
+            ttl (float): Seconds a cached view stays valid (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def init_app(self, app, prefix='RESULT_CACHE'):
+        """
+        Configure the cache from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+            prefix (str): Config key prefix, e.g. RESULT_CACHE_SIZE / RESULT_CACHE_TTL
+        """
+        app.config.setdefault(f'{prefix}_SIZE', self.max_entries)
+        app.config.setdefault(f'{prefix}_TTL', self.ttl)
+        self.max_entries = app.config[f'{prefix}_SIZE']
+        self.ttl = app.config[f'{prefix}_TTL']
+        self.clear()
+
+    def get(self, key):
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key (e.g. a result ID)
+
+        Returns:
+            The cached value, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, size, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """
+        Store a value, evicting the least recently used entries when full.
+
+        Args:
+            key: Cache key
+            value: Value to cache; callers must treat it as read-only
+        """
+        if not self.max_entries:
+            return
+
+        size = deep_sizeof(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._memory_bytes += size
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """
+        Get a cached value, loading and caching it on a miss.
+
+        The loader runs outside the lock so a slow database read does not
+        block other threads; a ``None`` result is not cached.
+
+        Args:
+            key: Cache key
+            loader (callable): Function taking the key and returning the value
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = loader(key)
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        """Drop a single entry, e.g. after its result was rescored or deleted."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        Report cache effectiveness and footprint.
+
+        Returns:
+            dict: Entry count, hit/miss/eviction counters, hit ratio and memory use
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_bytes": self._memory_bytes
+            }
+
+    def _remove(self, key):
+        """Remove an entry; the caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[1]
+
+
+# Shared cache of decoded result views, keyed by result ID
+result_cache = ResultCache()
@@ -0,0 +1,380 @@
+"""
+Dense category score matrix for ranking candidates against role profiles.
+
+Every stored result is one row of float32 category scores in a memory-mapped
+file, with a parallel mask of measured categories and an int64 row of
+(result ID, user ID, timestamp) metadata. Workers map the same files
+read-mostly and append new results incrementally, so ranking hundreds of
+thousands of results is two matrix-vector products and a partial sort.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.data.question_bank import CATEGORIES
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development server
+    fcntl = None
+
+
+META_COLUMNS = 3  # result ID, user ID, timestamp (epoch milliseconds)
+MIN_CAPACITY = 1024
+
+
+def _epoch_ms(moment):
+    """Convert a datetime to integer epoch milliseconds."""
+    return int(moment.timestamp() * 1000)
+
+
+class ScoreMatrix:
+    """Append-only memory-mapped matrix of category scores, one row per result."""
+
+    def __init__(self, columns, refresh_interval=30):
+        """
+        Initialize an unopened matrix.
+
+        Args:
+            columns (list): Category names, in column order
+            refresh_interval (float): Seconds between checks for new results
+        """
+        self.columns = list(columns)
+        self.refresh_interval = refresh_interval
+        self.directory = None
+        self._maps = None  # (scores, measured, meta) memmaps
+        self._capacity = 0
+        self._rows = 0
+        self._generation = None  # Changes whenever the files are recreated
+        self._refreshed_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the matrix location from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('SCORE_MATRIX_DIR', os.path.join(app.root_path, 'cache', 'score_matrix'))
+        app.config.setdefault('SCORE_MATRIX_REFRESH_INTERVAL', self.refresh_interval)
+        self.directory = app.config['SCORE_MATRIX_DIR']
+        self.refresh_interval = app.config['SCORE_MATRIX_REFRESH_INTERVAL']
+        self.close()
+
+    @property
+    def rows(self):
+        """Number of results in the matrix."""
+        return self._rows
+
+    @property
+    def generation(self):
+        """Token that changes whenever the matrix is rebuilt."""
+        return self._generation
+
+    def arrays(self, start=0, stop=None):
+        """
+        Get views of a range of rows.
+
+        Args:
+            start (int): First row
+            stop (int): Row after the last (default: all rows)
+
+        Returns:
+            tuple: (scores, measured, meta) arrays, empty before the first refresh
+        """
+        stop = self._rows if stop is None else min(stop, self._rows)
+        if self._maps is None:
+            width = len(self.columns)
+            return (np.zeros((0, width), dtype=np.float32), np.zeros((0, width), dtype=np.float32),
+                    np.zeros((0, META_COLUMNS), dtype=np.int64))
+        return tuple(array[start:stop] for array in self._maps)
+
+    def find(self, result_id):
+        """
+        Get the row of a result.
+
+        Args:
+            result_id (int): ID of the test result
+
+        Returns:
+            int: Row index, or None if the result is not in the matrix
+        """
+        if self._maps is None:
+            return None
+        # Rows are appended in result ID order
+        ids = self._maps[2][:self._rows, 0]
+        row = int(np.searchsorted(ids, result_id))
+        return row if row < self._rows and ids[row] == result_id else None
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_state(self):
+        try:
+            with open(self._path('state.json'), encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"rows": 0, "capacity": 0, "last_result_id": 0, "columns": self.columns, "generation": None}
+        return state
+
+    def _write_state(self, state):
+        tmp_path = self._path('state.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._path('state.json'))
+
+    @contextmanager
+    def _writer_lock(self):
+        """Serialize appends across worker processes."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path('lock'), 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _map(self, capacity):
+        """(Re)map the data files at a given row capacity, growing them if needed."""
+        shapes = {
+            'scores.f32': (np.float32, len(self.columns)),
+            'measured.f32': (np.float32, len(self.columns)),
+            'meta.i64': (np.int64, META_COLUMNS)
+        }
+        maps = []
+        for name, (dtype, width) in shapes.items():
+            path = self._path(name)
+            size = capacity * width * np.dtype(dtype).itemsize
+            with open(path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            maps.append(np.memmap(path, dtype=dtype, mode='r+', shape=(capacity, width)))
+        self._maps = tuple(maps)
+        self._capacity = capacity
+
+    def _sync_state(self, state):
+        """Follow appends (and rebuilds) made by other processes."""
+        if state.get("columns") != self.columns:
+            return False
+        if state["capacity"] and (state["capacity"] != self._capacity or state.get("generation") != self._generation):
+            self._map(state["capacity"])
+        self._generation = state.get("generation")
+        self._rows = state["rows"]
+        return True
+
+    def refresh(self, max_result_id, iter_rows, force=False):
+        """
+        Append results stored since the last refresh.
+
+        Args:
+            max_result_id (callable): Returns the highest stored result ID
+            iter_rows (callable): Given a result ID, yields (result ID, user ID,
+                timestamp, scores dict) of later results in ID order
+            force (bool): Check for new results even if refreshed recently
+        """
+        if not force and self._refreshed_at is not None and \
+                time.monotonic() - self._refreshed_at <= self.refresh_interval:
+            return
+
+        with self._lock:
+            state = self._read_state()
+            newest = max_result_id() or 0
+
+            # Rebuild when the files belong to another database or category set
+            if state["last_result_id"] > newest or not self._sync_state(state):
+                self.rebuild(iter_rows, locked=True)
+                state = self._read_state()
+
+            if newest > state["last_result_id"]:
+                with self._writer_lock():
+                    state = self._read_state()
+                    self._sync_state(state)
+                    self._append(state, iter_rows(state["last_result_id"]))
+
+            self._refreshed_at = time.monotonic()
+
+    def _append(self, state, rows, batch_size=4096):
+        column_index = {category: i for i, category in enumerate(self.columns)}
+        batch = []
+
+        def flush():
+            needed = state["rows"] + len(batch)
+            if needed > self._capacity or self._maps is None:
+                self._map(max(needed, 2 * self._capacity, MIN_CAPACITY))
+            scores, measured, meta = self._maps
+
+            start = state["rows"]
+            block_scores = np.zeros((len(batch), len(self.columns)), dtype=np.float32)
+            block_measured = np.zeros_like(block_scores)
+            for i, (_, _, _, values) in enumerate(batch):
+                for category, value in values.items():
+                    column = column_index.get(category)
+                    if column is not None and isinstance(value, (int, float)):
+                        block_scores[i, column] = value
+                        block_measured[i, column] = 1.0
+            scores[start:needed] = block_scores
+            measured[start:needed] = block_measured
+            meta[start:needed] = [
+                (result_id, user_id or 0, _epoch_ms(timestamp) if timestamp else 0)
+                for result_id, user_id, timestamp, _ in batch
+            ]
+            for array in self._maps:
+                array.flush()
+
+            state.update(rows=needed, capacity=self._capacity, last_result_id=batch[-1][0], columns=self.columns)
+            self._write_state(state)
+            self._rows = needed
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    def rebuild(self, iter_rows, locked=False):
+        """
+        Recreate the matrix from every stored result, e.g. after rescoring.
+
+        Args:
+            iter_rows (callable): See refresh
+            locked (bool): Whether the caller already holds the in-process lock
+        """
+        def run():
+            with self._writer_lock():
+                self._maps = None
+                self._capacity = 0
+                self._rows = 0
+                for name in ('scores.f32', 'measured.f32', 'meta.i64', 'state.json'):
+                    if os.path.exists(self._path(name)):
+                        os.remove(self._path(name))
+                state = {"rows": 0, "capacity": 0, "last_result_id": 0, "columns": self.columns,
+                         "generation": time.time_ns()}
+                self._generation = state["generation"]
+                self._write_state(state)
+                self._append(state, iter_rows(0))
+            self._refreshed_at = time.monotonic()
+
+        if locked:
+            run()
+        else:
+            with self._lock:
+                run()
+
+    def rank(self, weights, offset=0, limit=20, since=None, until=None, user_id=None,
+             min_coverage=0.5, distinct_users=True):
+        """
+        Rank results by their weighted fit to a role profile.
+
+        The fit is the weighted mean of the measured category scores; results
+        measuring less than ``min_coverage`` of the profile's weight are left out.
+
+        Args:
+            weights (dict): Category -> non-negative weight
+            offset (int): Ranked results skipped (pagination)
+            limit (int): Ranked results returned
+            since (datetime): Only results at or after this time
+            until (datetime): Only results before this time
+            user_id (int): Only results of this user
+            min_coverage (float): Minimum share of the profile's weight measured
+            distinct_users (bool): Keep only each candidate's best result
+
+        Returns:
+            tuple: (total matching, list of dicts with result_id, user_id,
+                fit and coverage)
+        """
+        rows = self._rows
+        if not rows or self._maps is None:
+            return 0, []
+
+        w = np.array([float(weights.get(category, 0.0)) for category in self.columns], dtype=np.float32)
+        total_weight = w.sum()
+        if total_weight <= 0:
+            return 0, []
+
+        scores, measured, meta = (array[:rows] for array in self._maps)
+        weighted = scores @ w
+        covered = measured @ w
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fit = weighted / covered
+        valid = covered >= min_coverage * total_weight
+        if since is not None:
+            valid &= meta[:, 2] >= _epoch_ms(since)
+        if until is not None:
+            valid &= meta[:, 2] < _epoch_ms(until)
+        if user_id is not None:
+            valid &= meta[:, 1] == user_id
+
+        candidates = np.flatnonzero(valid)
+        if distinct_users and len(candidates):
+            users = meta[candidates, 1]
+            present = np.zeros(int(users.max()) + 1, dtype=bool)
+            present[users] = True
+            total = int(np.count_nonzero(present))
+        elif distinct_users:
+            total = 0
+        else:
+            total = len(candidates)
+
+        wanted = offset + limit
+        if wanted <= 0 or not len(candidates):
+            return total, []
+
+        # Partially sort a growing prefix until it holds enough distinct users
+        fits = fit[candidates]
+        take = min(len(candidates), wanted * (4 if distinct_users else 1))
+        while True:
+            if take < len(candidates):
+                top = np.argpartition(-fits, take - 1)[:take]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.lexsort((meta[candidates[top], 0], -fits[top]))]
+
+            ranked = []
+            seen_users = set()
+            for position in top:
+                row = candidates[position]
+                user = int(meta[row, 1])
+                if distinct_users:
+                    if user in seen_users:
+                        continue
+                    seen_users.add(user)
+                ranked.append(row)
+                if len(ranked) == wanted:
+                    break
+
+            if len(ranked) == wanted or take == len(candidates):
+                break
+            take = min(len(candidates), take * 2)
+
+        return total, [
+            {
+                "result_id": int(meta[row, 0]),
+                "user_id": int(meta[row, 1]),
+                "fit": round(float(fit[row]), 3),
+                "coverage": round(float(covered[row] / total_weight), 3)
+            }
+            for row in ranked[offset:]
+        ]
+
+    def close(self):
+        """Unmap the files so the next use reopens them."""
+        with self._lock:
+            self._maps = None
+            self._capacity = 0
+            self._rows = 0
+            self._refreshed_at = None
+
+
+# Shared score matrix over the assessed categories
+score_matrix = ScoreMatrix(CATEGORIES)
@@ -0,0 +1,181 @@
+"""
+Similar-candidate search for the sales aptitude test.
+
+Results are points in the 10-dimensional space of category scores,
+standardized per category (unmeasured categories sit at the mean). A KD-tree
+over every indexed result answers nearest-neighbour queries in logarithmic
+time; results added since the tree was built are kept in a small buffer
+that is scanned directly until it grows large enough to trigger a rebuild.
+"""
+
+import threading
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+
+class SimilarCandidateIndex:
+    """KD-tree over standardized category score vectors, fed by the score matrix."""
+
+    def __init__(self, rebuild_size=1000, rebuild_fraction=0.1):
+        """
+        Initialize an empty index.
+
+        Args:
+            rebuild_size (int): Buffered results that always trigger a rebuild
+            rebuild_fraction (float): Buffer size, relative to the tree, that
+                triggers a rebuild once it exceeds ``rebuild_size``
+        """
+        self.rebuild_size = rebuild_size
+        self.rebuild_fraction = rebuild_fraction
+        self._tree = None
+        self._tree_rows = 0      # Matrix rows 0..n-1 are in the tree
+        self._buffer_rows = 0    # Matrix rows tree_rows..n-1 are buffered
+        self._buffer = np.zeros((0, 0))
+        self._mean = None
+        self._std = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """
+        Configure the index from the Flask app config.
+
+        Args:
+            app (Flask): The Flask application
+        """
+        app.config.setdefault('SIMILAR_INDEX_REBUILD_SIZE', self.rebuild_size)
+        self.rebuild_size = app.config['SIMILAR_INDEX_REBUILD_SIZE']
+        self.clear()
+
+    def _normalize(self, scores, measured):
+        z = (scores - self._mean) / self._std
+        return np.where(measured > 0, z, 0.0)
+
+    def rebuild(self, matrix):
+        """
+        Rebuild the tree (and normalization) from every row of the matrix.
+
+        Args:
+            matrix (ScoreMatrix): Refreshed score matrix
+        """
+        scores, measured, _ = matrix.arrays()
+        scores = np.asarray(scores, dtype=np.float64)
+        measured = np.asarray(measured, dtype=np.float64)
+
+        counts = measured.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(counts > 0, (scores * measured).sum(axis=0) / counts, 0.0)
+            variance = np.where(counts > 1, (((scores - mean) * measured) ** 2).sum(axis=0) / (counts - 1), 0.0)
+        self._mean = mean
+        self._std = np.where(variance > 0, np.sqrt(variance), 1.0)
+
+        vectors = self._normalize(scores, measured)
+        self._tree = KDTree(vectors) if len(vectors) else None
+        self._tree_rows = len(vectors)
+        self._buffer = np.zeros((0, scores.shape[1]))
+        self._buffer_rows = 0
+        self._generation = matrix.generation
+
+    def sync(self, matrix):
+        """
+        Index the matrix rows added since the last sync.
+
+        New rows are buffered; the tree is rebuilt when the buffer outgrows
+        the rebuild thresholds or the matrix itself was rebuilt.
+
+        Args:
+            matrix (ScoreMatrix): Refreshed score matrix
+        """
+        with self._lock:
+            indexed = self._tree_rows + self._buffer_rows
+            if self._mean is None or matrix.generation != self._generation or matrix.rows < indexed:
+                self.rebuild(matrix)
+                return
+            if matrix.rows == indexed:
+                return
+
+            scores, measured, _ = matrix.arrays(indexed)
+            vectors = self._normalize(np.asarray(scores, dtype=np.float64), np.asarray(measured, dtype=np.float64))
+            buffered = self._buffer_rows + len(vectors)
+            # Small indexes are rebuilt every time, keeping the normalization current
+            if self._tree_rows < self.rebuild_size or \
+                    buffered >= max(self.rebuild_size, self.rebuild_fraction * self._tree_rows):
+                self.rebuild(matrix)
+            else:
+                self._buffer = np.vstack([self._buffer, vectors])
+                self._buffer_rows = buffered
+
+    def query(self, matrix, row, k=10, distinct_users=True):
+        """
+        Find the results most similar to a result.
+
+        Args:
+            matrix (ScoreMatrix): The score matrix the index was synced with
+            row (int): Matrix row of the reference result
+            k (int): Number of similar results wanted
+            distinct_users (bool): Return one result per candidate and skip
+                the reference candidate's own results
+
+        Returns:
+            list: (row, distance) pairs, closest first
+        """
+        with self._lock:
+            tree, tree_rows = self._tree, self._tree_rows
+            buffer = self._buffer
+            if self._mean is None:
+                return []
+
+            scores, measured, meta = matrix.arrays()
+            point = self._normalize(np.asarray(scores[row], dtype=np.float64),
+                                    np.asarray(measured[row], dtype=np.float64))
+
+        reference_user = int(meta[row, 1])
+        total = tree_rows + len(buffer)
+        want = min(total, 2 * k + 1)
+
+        while True:
+            rows = np.empty(0, dtype=np.int64)
+            distances = np.empty(0)
+            if tree is not None:
+                tree_distances, tree_rows_found = tree.query(point[None, :], k=min(want, tree_rows))
+                rows, distances = tree_rows_found[0], tree_distances[0]
+            if len(buffer):
+                buffer_distances = np.sqrt(((buffer - point) ** 2).sum(axis=1))
+                rows = np.concatenate([rows, tree_rows + np.arange(len(buffer))])
+                distances = np.concatenate([distances, buffer_distances])
+
+            order = np.argsort(distances, kind='stable')
+            found = []
+            seen_users = {reference_user} if distinct_users else set()
+            for position in order:
+                candidate = int(rows[position])
+                if candidate == row:
+                    continue
+                if distinct_users:
+                    user = int(meta[candidate, 1])
+                    if user in seen_users:
+                        continue
+                    seen_users.add(user)
+                found.append((candidate, float(distances[position])))
+                if len(found) == k:
+                    return found
+
+            if want >= total:
+                return found
+            want = min(total, want * 2)
+
+    def clear(self):
+        """Drop the tree so the next sync rebuilds it."""
+        with self._lock:
+            self._tree = None
+            self._tree_rows = 0
+            self._buffer = np.zeros((0, 0))
+            self._buffer_rows = 0
+            self._mean = None
+            self._std = None
+            self._generation = None
+
+
+# Shared similar-candidate index
+similar_index = SimilarCandidateIndex()
@@ -0,0 +1,120 @@
+"""
+Synthetic question banks and attempts for benchmarks and load tests.
+
+Generated banks keep the mix of the real bank (10 Likert, 5 scenario and 3
+open-ended questions in every 18) spread over all categories, and generated
+answers use the same response vocabulary as real candidates. Everything is
+seeded, so repeated runs measure the same work.
+"""
+
+import random
+
+from src.data.question_bank import CATEGORIES
+from src.models.question_model import LikertQuestion, ScenarioQuestion, OpenEndedQuestion
+from src.models.result_model import LIKERT_VALUES
+
+
+# Number of words in generated open-ended answers
+ANSWER_SIZES = {
+    "tiny": 3,
+    "typical": 80,
+    "heavy": 2000
+}
+
+# Question types in the proportions of the real bank
+_TYPE_CYCLE = ["likert"] * 10 + ["scenario"] * 5 + ["open_ended"] * 3
+
+_SCENARIO_OPTIONS = [
+    "Immediately offer a discount to close the deal",
+    "Emphasize the value and ROI of your product",
+    "Ask more questions to understand their budget constraints",
+    "Suggest a smaller package or alternative solution"
+]
+
+_VOCABULARY = (
+    "client customer listen ask question understand need value budget timeline "
+    "follow up rapport trust relationship objection price negotiate solution "
+    "product demo pipeline quota goal team learn research prepare present close "
+    "deal feedback adapt persist call email meeting proposal benefit outcome"
+).split()
+
+
+def generate_questions(count, seed=0):
+    """
+    Generate a question bank.
+
+    Args:
+        count (int): Number of questions
+        seed (int): Random seed
+
+    Returns:
+        list: Question objects with IDs 1..count
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORIES)
+    questions = []
+
+    for qid in range(1, count + 1):
+        question_type = _TYPE_CYCLE[(qid - 1) % len(_TYPE_CYCLE)]
+        category = categories[rng.randrange(len(categories))]
+        text = f"Synthetic {question_type} question {qid} about {CATEGORIES[category].lower()}."
+
+        if question_type == "likert":
+            questions.append(LikertQuestion(id=qid, text=text, category=category))
+        elif question_type == "scenario":
+            questions.append(ScenarioQuestion(
+                id=qid, text=text, category=category,
+                options=list(_SCENARIO_OPTIONS), correct_index=rng.randrange(len(_SCENARIO_OPTIONS))
+            ))
+        else:
+            questions.append(OpenEndedQuestion(id=qid, text=text, category=category, min_words=50))
+
+    return questions
+
+
+def generate_text(words, rng):
+    """
+    Generate an open-ended answer.
+
+    Args:
+        words (int): Number of words
+        rng (random.Random): Random source
+
+    Returns:
+        str: Sentences built from sales vocabulary
+    """
+    tokens = [rng.choice(_VOCABULARY) for _ in range(words)]
+    sentences = [" ".join(tokens[i:i + 12]).capitalize() + "." for i in range(0, len(tokens), 12)]
+    return " ".join(sentences)
+
+
+def generate_answers(questions, answer_size="typical", seed=0):
+    """
+    Generate one attempt answering every question.
+
+    Args:
+        questions (list): Questions to answer (objects or dicts with id/type/options)
+        answer_size (str): Key of ANSWER_SIZES for open-ended answers
+        seed (int): Random seed
+
+    Returns:
+        dict: Question ID (str) -> response
+    """
+    rng = random.Random(seed)
+    likert_options = list(LIKERT_VALUES)
+    answers = {}
+
+    for question in questions:
+        if isinstance(question, dict):
+            qid, question_type, options = question["id"], question["type"], question.get("options")
+        else:
+            qid, question_type, options = question.id, question.type, getattr(question, "options", None)
+
+        if question_type == "likert":
+            answers[str(qid)] = rng.choice(options or likert_options)
+        elif question_type == "scenario":
+            answers[str(qid)] = rng.choice(options)
+        else:
+            answers[str(qid)] = generate_text(ANSWER_SIZES[answer_size], rng)
+
+    return answers
@@ -0,0 +1,50 @@
+"""
+Template compilation utilities for the sales aptitude test.
+"""
+
+import os
+from jinja2 import FileSystemBytecodeCache
+
+
+def init_template_cache(app):
+    """
+    Configure a filesystem bytecode cache for the app's Jinja templates.
+
+    Compiled templates are written to TEMPLATE_CACHE_DIR, so every worker
+    after the first (or after a build-time precompile) loads bytecode
+    instead of parsing and compiling template source.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    app.config.setdefault('TEMPLATE_CACHE_DIR', os.path.join(app.instance_path, 'template_cache'))
+    app.config.setdefault('TEMPLATE_PRELOAD', False)
+
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    if not cache_dir:
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    if app.config['TEMPLATE_PRELOAD']:
+        precompile_templates(app)
+
+
+def precompile_templates(app):
+    """
+    Compile every HTML template, filling the bytecode and in-process caches.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        list: Names of the compiled templates
+    """
+    env = app.jinja_env
+    names = [name for name in env.list_templates() if name.endswith('.html')]
+
+    for name in names:
+        env.get_template(name)
+
+    return names
@@ -0,0 +1,131 @@
+"""
+Worker warm-up and readiness tracking for the sales aptitude test.
+"""
+
+import time
+
+from flask import render_template
+
+
+# Text used for synthetic open-ended answers during warm-up
+WARMUP_RESPONSE = "I focus on understanding their needs first, then align my proposal with those needs."
+
+
+def init_readiness(app):
+    """
+    Set up the readiness state of an app.
+
+    An app that will be warmed up starts as not ready; otherwise it is ready
+    as soon as it is created.
+
+    Args:
+        app (Flask): The Flask application
+    """
+    app.extensions['readiness'] = {
+        "ready": not app.config.get('WARMUP', False),
+        "warmed_up": False,
+        "warmup_seconds": None,
+        "error": None
+    }
+
+
+def get_readiness(app):
+    """
+    Get the readiness state of an app.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        dict: Ready flag, whether warm-up ran, its duration and any error
+    """
+    return app.extensions.get('readiness', {"ready": True, "warmed_up": False})
+
+
+def _synthetic_answers(questions):
+    """Build one plausible answer for every question in the catalog."""
+    answers = {}
+    for question in questions:
+        if question.type == 'open_ended':
+            answers[str(question.id)] = WARMUP_RESPONSE
+        elif question.options:
+            answers[str(question.id)] = question.options[len(question.options) // 2]
+    return answers
+
+
+def warm_up(app):
+    """
+    Drive a synthetic submission through every hot path of a submit.
+
+    Loads the question catalog, scores and analyzes a synthetic attempt with
+    TestResult and ResponseAnalyzer, writes it to the database inside a
+    transaction that is rolled back (configuring the mappers, opening a
+    connection and compiling the INSERT statements), and renders every
+    page template. The app is marked ready only when this succeeds.
+
+    Args:
+        app (Flask): The Flask application
+
+    Returns:
+        dict: The resulting readiness state
+    """
+    from src.data.catalog import question_catalog
+    from src.data.database import db, save_test_result
+    from src.frontend.test_routes import analyzer
+    from src.models.result_model import TestResult
+    from src.data.question_bank import CATEGORIES
+    from src.utils.templates import precompile_templates
+
+    readiness = app.extensions.setdefault('readiness', {})
+    readiness.update({"ready": False, "warmed_up": False, "error": None})
+    started = time.perf_counter()
+
+    try:
+        with app.app_context():
+            questions = question_catalog.questions
+            answers = _synthetic_answers(questions)
+
+            # Scoring and analysis
+            result = TestResult(None, answers)
+            scores = result.calculate_scores(questions)
+            result.generate_analysis()
+            analyzer.analyze_response_patterns(answers)
+            for question in questions:
+                if question.type == 'open_ended':
+                    analyzer.analyze_open_ended_response(WARMUP_RESPONSE, question.category)
+            feedback = analyzer.generate_personalized_feedback(scores, result.analysis)
+
+            # Database write, rolled back so nothing is persisted
+            try:
+                save_test_result(
+                    user_id=0,
+                    answers=answers,
+                    scores=scores,
+                    analysis=result.analysis,
+                    recommendations=result.recommendations,
+                    commit=False
+                )
+            finally:
+                db.session.rollback()
+
+            # Templates
+            precompile_templates(app)
+            with app.test_request_context('/results'):
+                render_template(
+                    'results.html',
+                    result={"scores": scores, "analysis": result.analysis},
+                    feedback=feedback,
+                    categories=CATEGORIES
+                )
+    except Exception as e:
+        readiness["error"] = f"{type(e).__name__}: {e}"
+        app.logger.exception("Warm-up failed")
+        return readiness
+
+    readiness.update({
+        "ready": True,
+        "warmed_up": True,
+        "warmup_seconds": round(time.perf_counter() - started, 4)
+    })
+    app.logger.info("Warm-up completed in %.3fs", readiness["warmup_seconds"])
+    return readiness
@@ -0,0 +1,267 @@
+/**
+ * Service Worker for the test interface
+ * Serves the question payload and static assets from a cache, and queues a
+ * submission in IndexedDB when the connection drops, submitting it once the
+ * candidate is back online
+ */
+
+const CACHE_NAME = 'aptitude-test-v1';
+const PRECACHE_URLS = [
+    '/test',
+    '/api/questions',
+    '/static/js/test.js',
+    '/static/css/style.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js'
+];
+
+// Queued submissions are retried with exponential backoff
+const DB_NAME = 'aptitude-test';
+const QUEUE_STORE = 'submissions';
+const RETRY_DELAY = 1000;
+const MAX_RETRY_DELAY = 60000;
+let retryTimer = null;
+let retryDelay = RETRY_DELAY;
+let flushing = null;
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => Promise.all(PRECACHE_URLS.map(url =>
+                cache.add(url).catch(error => console.warn('Not precached:', url, error))
+            )))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // Drop the caches of older versions, then submit anything left queued
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+            .then(() => flushQueue())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    
+    if (request.method === 'POST' && url.origin === self.location.origin && url.pathname === '/api/submit') {
+        event.respondWith(submitOrQueue(request));
+        return;
+    }
+    if (request.method !== 'GET') {
+        return;
+    }
+    
+    if (request.mode === 'navigate') {
+        // Pages are always fetched fresh; the cached test page only serves offline reloads
+        if (url.pathname === '/test') {
+            event.respondWith(networkFirst(request));
+        }
+        return;
+    }
+    
+    const isAsset = url.origin === self.location.origin
+        ? url.pathname.startsWith('/static/') || (url.pathname === '/api/questions' && !url.search)
+        : PRECACHE_URLS.includes(request.url);
+    if (isAsset) {
+        event.respondWith(staleWhileRevalidate(event));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === 'flush-submissions') {
+        event.waitUntil(flushQueue());
+    }
+});
+
+self.addEventListener('message', event => {
+    if (event.data && event.data.type === 'flush') {
+        event.waitUntil(flushQueue());
+    }
+});
+
+/**
+ * Serve from the cache right away and refresh the cached copy in the background
+ * @param {FetchEvent} event - The fetch event
+ * @returns {Promise<Response>} The cached or fetched response
+ */
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(event.request);
+    
+    const refresh = fetch(event.request).then(response => {
+        if (response.ok) {
+            cache.put(event.request, response.clone());
+        }
+        return response;
+    });
+    
+    if (cached) {
+        event.waitUntil(refresh.catch(() => {}));
+        return cached;
+    }
+    return refresh;
+}
+
+/**
+ * Fetch from the network, falling back to the cache when offline
+ * @param {Request} request - The request
+ * @returns {Promise<Response>} The fetched or cached response
+ */
+async function networkFirst(request) {
+    const cache = await caches.open(CACHE_NAME);
+    try {
+        const response = await fetch(request);
+        if (response.ok) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        const cached = await cache.match(request);
+        if (cached) {
+            return cached;
+        }
+        throw error;
+    }
+}
+
+/**
+ * Forward a submission, or queue it when the network is unreachable
+ * @param {Request} request - The submit request
+ * @returns {Promise<Response>} The server's response, or 202 when queued
+ */
+async function submitOrQueue(request) {
+    const body = await request.clone().text();
+    try {
+        return await fetch(request);
+    } catch (error) {
+        let attemptId = null;
+        try {
+            attemptId = JSON.parse(body).attempt_id || null;
+        } catch (parseError) {
+            // Not JSON: the server will reject it once it is sent
+        }
+        
+        await enqueue({ attemptId: attemptId || `queued_${Date.now()}`, body: body, queuedAt: Date.now() });
+        scheduleFlush();
+        
+        return new Response(JSON.stringify({ queued: true, attempt_id: attemptId }), {
+            status: 202,
+            headers: { 'Content-Type': 'application/json' }
+        });
+    }
+}
+
+/**
+ * Open the submission queue database
+ * @returns {Promise<IDBDatabase>} The database
+ */
+function openQueue() {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open(DB_NAME, 1);
+        open.onupgradeneeded = () => open.result.createObjectStore(QUEUE_STORE, { keyPath: 'attemptId' });
+        open.onsuccess = () => resolve(open.result);
+        open.onerror = () => reject(open.error);
+    });
+}
+
+/**
+ * Run one operation on the submission queue
+ * @param {string} mode - 'readonly' or 'readwrite'
+ * @param {Function} operation - Called with the object store, returns an IDBRequest
+ * @returns {Promise<*>} The request's result
+ */
+async function withQueue(mode, operation) {
+    const db = await openQueue();
+    try {
+        return await new Promise((resolve, reject) => {
+            const transaction = db.transaction(QUEUE_STORE, mode);
+            const request = operation(transaction.objectStore(QUEUE_STORE));
+            transaction.oncomplete = () => resolve(request.result);
+            transaction.onerror = () => reject(transaction.error);
+        });
+    } finally {
+        db.close();
+    }
+}
+
+/**
+ * Queue a submission (a retry of the same attempt replaces it)
+ * @param {Object} entry - attemptId, body and queuedAt
+ */
+function enqueue(entry) {
+    return withQueue('readwrite', store => store.put(entry));
+}
+
+/**
+ * Submit the queued submissions once the connection is back
+ */
+function scheduleFlush() {
+    if (self.registration.sync) {
+        self.registration.sync.register('flush-submissions').catch(() => {});
+    }
+    if (!retryTimer) {
+        retryTimer = setTimeout(() => {
+            retryTimer = null;
+            flushQueue();
+        }, retryDelay);
+    }
+}
+
+/**
+ * Send every queued submission, keeping the ones that still cannot be delivered
+ * @returns {Promise<void>} Resolves when this pass is done
+ */
+function flushQueue() {
+    if (!flushing) {
+        flushing = sendQueued().finally(() => {
+            flushing = null;
+        });
+    }
+    return flushing;
+}
+
+/**
+ * Send the queued submissions in order, stopping at the first that cannot be delivered
+ */
+async function sendQueued() {
+    const entries = await withQueue('readonly', store => store.getAll());
+    
+    for (const entry of entries) {
+        let response;
+        try {
+            response = await fetch('/api/submit', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: entry.body,
+                credentials: 'same-origin'
+            });
+        } catch (error) {
+            response = null;
+        }
+        
+        if (!response || response.status >= 500) {
+            // Still unreachable: back off before the next pass
+            retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY);
+            scheduleFlush();
+            return;
+        }
+        
+        // Delivered, or rejected for good (a 4xx will not succeed on retry)
+        await withQueue('readwrite', store => store.delete(entry.attemptId));
+        retryDelay = RETRY_DELAY;
+        
+        const windows = await self.clients.matchAll({ type: 'window' });
+        for (const client of windows) {
+            client.postMessage({
+                type: 'submission-flushed',
+                attempt_id: entry.attemptId,
+                ok: response.ok
+            });
+        }
+    }
+}
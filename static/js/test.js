@@ -8,6 +8,33 @@ let questions = [];
 let currentQuestionIndex = 0;
 let answers = {};
 let testStarted = false;
+let adaptiveMode = false;
+let adaptiveDone = false;
+let adaptiveProgress = 0;
+let attemptId = null;
+
+// Submit retries on network and server errors, with exponential backoff
+const SUBMIT_RETRIES = 4;
+const SUBMIT_RETRY_DELAY = 1000;
+
+// Autosave: answers changed since the last save are sent as a delta patch
+// once typing pauses, so a reloaded page can resume the attempt
+const AUTOSAVE_DELAY = 1500;
+const AUTOSAVE_CHOICE_DELAY = 300;
+const AUTOSAVE_MAX_DELAY = 30000;
+const ATTEMPT_STORAGE_KEY = 'aptitude_attempt';
+let draftSeq = 0;
+let dirtyAnswers = {};
+let positionDirty = false;
+let savedQuestionCount = 0;
+let autosaveTimer = null;
+let autosaveInFlight = false;
+let inFlightChanges = null;
+let autosaveFailures = 0;
+let draftRebound = false;
+
+// Submission queued by the service worker while offline
+let queuedAttemptId = null;
 
 // DOM Elements
 const startContainer = document.getElementById('start-container');
@@ -22,6 +49,7 @@ const nextButton = document.getElementById('next-button');
 const submitButton = document.getElementById('submit-button');
 const startButton = document.getElementById('start-button');
 const loadingIndicator = document.getElementById('loading-indicator');
+const offlineNotice = document.getElementById('offline-notice');
 
 /**
  * Initialize the test interface
@@ -44,6 +72,12 @@ function initTest() {
         submitButton.addEventListener('click', submitTest);
     }
     
+    // Save unsent answers when the page is closed or reloaded
+    window.addEventListener('pagehide', () => flushAutosave(true));
+    
+    // Cache the questions and assets, and queue submissions made offline
+    registerServiceWorker();
+    
     // Hide test and result containers initially
     if (testContainer) testContainer.style.display = 'none';
     if (resultContainer) resultContainer.style.display = 'none';
@@ -58,21 +92,57 @@ async function startTest() {
     if (startContainer) startContainer.style.display = 'none';
     
     try {
-        // Fetch questions from API
-        const response = await fetch('/api/questions');
-        if (!response.ok) {
-            throw new Error('Failed to fetch questions');
+        // Initialize the test
+        currentQuestionIndex = 0;
+        answers = {};
+        adaptiveMode = testContainer && testContainer.dataset.mode === 'adaptive';
+        adaptiveDone = false;
+        adaptiveProgress = 0;
+        dirtyAnswers = {};
+        positionDirty = false;
+        
+        // Resume the autosaved attempt of a reloaded page
+        const draft = await loadDraft();
+        if (draft) {
+            attemptId = draft.attempt_id;
+            draftSeq = draft.seq;
+            answers = draft.answers;
+            savedQuestionCount = draft.question_ids.length;
+            if (draft.local) {
+                // Restored from this browser's copy: the server may not have these yet
+                dirtyAnswers = Object.assign({}, draft.answers);
+                positionDirty = true;
+                savedQuestionCount = 0;
+            }
+        } else {
+            attemptId = generateAttemptId();
+            draftSeq = 0;
+            savedQuestionCount = 0;
+            storeAttempt();
         }
         
-        questions = await response.json();
+        if (adaptiveMode && draft && draft.question_ids.length > 0) {
+            // Rebuild the questions already served from the catalog
+            const catalog = await fetchQuestions();
+            const byId = new Map(catalog.map(q => [q.id, q]));
+            questions = draft.question_ids.map(id => byId.get(id)).filter(Boolean);
+        } else if (adaptiveMode) {
+            // Adaptive tests fetch one question at a time
+            questions = [];
+            await fetchNextAdaptiveQuestion();
+        } else {
+            // Fetch questions from API
+            questions = await fetchQuestions();
+        }
+        
+        if (draft) {
+            currentQuestionIndex = Math.min(draft.position, Math.max(questions.length - 1, 0));
+        }
         
         if (questions.length === 0) {
             throw new Error('No questions available');
         }
         
-        // Initialize the test
-        currentQuestionIndex = 0;
-        answers = {};
         testStarted = true;
         
         // Show the first question
@@ -91,6 +161,247 @@ async function startTest() {
     }
 }
 
+/**
+ * Register the service worker and follow the submissions it delivers
+ */
+function registerServiceWorker() {
+    if (!('serviceWorker' in navigator)) return;
+    
+    navigator.serviceWorker.register('/sw.js').catch(error => {
+        console.error('Service worker registration failed:', error);
+    });
+    
+    navigator.serviceWorker.addEventListener('message', event => {
+        const data = event.data || {};
+        if (data.type !== 'submission-flushed' || !queuedAttemptId || data.attempt_id !== queuedAttemptId) {
+            return;
+        }
+        
+        queuedAttemptId = null;
+        if (offlineNotice) offlineNotice.style.display = 'none';
+        if (data.ok) {
+            finishSubmission();
+        } else {
+            alert('There was an error submitting your test. Please try again.');
+            if (testContainer) testContainer.style.display = 'block';
+            if (submitButton) submitButton.disabled = false;
+        }
+    });
+    
+    // Ask the service worker to send the queue as soon as the connection is back
+    window.addEventListener('online', () => {
+        if (navigator.serviceWorker.controller) {
+            navigator.serviceWorker.controller.postMessage({ type: 'flush' });
+        }
+    });
+}
+
+/**
+ * Fetch the question catalog
+ * @returns {Promise<Array>} The questions
+ */
+async function fetchQuestions() {
+    const response = await fetch('/api/questions');
+    if (!response.ok) {
+        throw new Error('Failed to fetch questions');
+    }
+    
+    return response.json();
+}
+
+/**
+ * Fetch the autosaved draft of this browser's unfinished attempt, falling back
+ * to the copy kept in this browser when offline or when it is newer
+ * @returns {Promise<Object|null>} The draft, or null if there is none to resume
+ */
+async function loadDraft() {
+    let stored = null;
+    try {
+        stored = JSON.parse(localStorage.getItem(ATTEMPT_STORAGE_KEY));
+    } catch (error) {
+        return null;
+    }
+    
+    if (!stored || !stored.attemptId || stored.adaptive !== adaptiveMode) {
+        return null;
+    }
+    
+    const local = stored.seq > 0 ? {
+        attempt_id: stored.attemptId,
+        seq: stored.seq,
+        position: stored.position || 0,
+        answers: stored.answers || {},
+        question_ids: stored.questionIds || [],
+        local: true
+    } : null;
+    
+    try {
+        const response = await fetch(`/api/drafts/${encodeURIComponent(stored.attemptId)}`);
+        const draft = response.ok ? await response.json() : null;
+        // Changes that never reached the server (e.g. made offline) win
+        return local && (!draft || local.seq > draft.seq) ? local : draft;
+    } catch (error) {
+        // Offline: resume from the local copy, its patches catch up once the connection is back
+        console.error('Error loading the autosaved answers:', error);
+        return local || { attempt_id: stored.attemptId, seq: 0, position: 0, answers: {}, question_ids: [] };
+    }
+}
+
+/**
+ * Remember the current attempt and its answers, so a reload can resume it even offline
+ */
+function storeAttempt() {
+    try {
+        localStorage.setItem(ATTEMPT_STORAGE_KEY, JSON.stringify({
+            attemptId: attemptId,
+            adaptive: adaptiveMode,
+            seq: draftSeq,
+            position: currentQuestionIndex,
+            answers: answers,
+            questionIds: adaptiveMode ? questions.map(q => q.id) : []
+        }));
+    } catch (error) {
+        // Storage unavailable (e.g. private browsing): autosave cannot be resumed
+    }
+}
+
+/**
+ * Record an answer and schedule its autosave
+ * @param {number} questionId - The question ID
+ * @param {string} value - The answer
+ * @param {number} delay - Milliseconds to wait for further changes
+ */
+function setAnswer(questionId, value, delay) {
+    answers[questionId] = value;
+    dirtyAnswers[questionId] = value;
+    scheduleAutosave(delay);
+}
+
+/**
+ * (Re)start the autosave timer
+ * @param {number} delay - Milliseconds to wait for further changes
+ */
+function scheduleAutosave(delay) {
+    if (autosaveTimer) clearTimeout(autosaveTimer);
+    autosaveTimer = setTimeout(() => flushAutosave(false), delay);
+}
+
+/**
+ * Send the answers changed since the last autosave
+ * @param {boolean} unloading - The page is going away: send without waiting for the reply
+ */
+async function flushAutosave(unloading) {
+    if (autosaveTimer) {
+        clearTimeout(autosaveTimer);
+        autosaveTimer = null;
+    }
+    
+    const questionsChanged = adaptiveMode && questions.length !== savedQuestionCount;
+    const resendInFlight = unloading && autosaveInFlight && inFlightChanges !== null;
+    if (!attemptId || !testStarted || (Object.keys(dirtyAnswers).length === 0 && !positionDirty && !questionsChanged && !resendInFlight)) {
+        return;
+    }
+    if (autosaveInFlight && !unloading) {
+        // One patch at a time, so patches arrive in order
+        scheduleAutosave(AUTOSAVE_CHOICE_DELAY);
+        return;
+    }
+    
+    // The page may go away before the patch in flight is acknowledged: resend
+    // its changes too (newer edits win), a later seq supersedes it either way
+    const changes = resendInFlight ? Object.assign({}, inFlightChanges, dirtyAnswers) : dirtyAnswers;
+    const patch = { seq: ++draftSeq, changes: changes, position: currentQuestionIndex };
+    if (questionsChanged) {
+        patch.question_ids = questions.map(q => q.id);
+    }
+    dirtyAnswers = {};
+    positionDirty = false;
+    storeAttempt();
+    
+    autosaveInFlight = true;
+    inFlightChanges = changes;
+    try {
+        const response = await fetch(`/api/drafts/${encodeURIComponent(attemptId)}`, {
+            method: 'PATCH',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(patch),
+            keepalive: unloading
+        });
+        
+        if (response.ok) {
+            autosaveFailures = 0;
+            if (patch.question_ids) savedQuestionCount = patch.question_ids.length;
+            return;
+        }
+        
+        const data = await response.json().catch(() => ({}));
+        if (response.status === 409 && data.seq === undefined) {
+            return;  // Already submitted
+        }
+        if (response.status === 404 && !draftRebound) {
+            // The draft belongs to a session this browser no longer has (e.g. the
+            // cookie expired): save every answer under a new attempt instead
+            draftRebound = true;
+            attemptId = generateAttemptId();
+            draftSeq = 0;
+            savedQuestionCount = 0;
+            dirtyAnswers = Object.assign({}, answers);
+            positionDirty = true;
+            storeAttempt();
+            scheduleAutosave(AUTOSAVE_CHOICE_DELAY);
+            return;
+        }
+        if (response.status === 409) {
+            draftSeq = Math.max(draftSeq, data.seq);
+        } else if (response.status < 500) {
+            console.error('Autosave rejected:', data.error);
+            return;
+        }
+        throw new Error('Autosave failed');
+    } catch (error) {
+        // Keep the unsent changes (newer edits win) and retry with backoff
+        dirtyAnswers = Object.assign({}, changes, dirtyAnswers);
+        positionDirty = true;
+        autosaveFailures++;
+        if (!unloading) {
+            scheduleAutosave(Math.min(AUTOSAVE_DELAY * 2 ** autosaveFailures, AUTOSAVE_MAX_DELAY));
+        }
+    } finally {
+        if (inFlightChanges === changes) {
+            autosaveInFlight = false;
+            inFlightChanges = null;
+        }
+    }
+}
+
+/**
+ * Fetch the next adaptive question, chosen from the answers so far
+ */
+async function fetchNextAdaptiveQuestion() {
+    const response = await fetch('/api/adaptive/next', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ answers: answers })
+    });
+    
+    if (!response.ok) {
+        throw new Error('Failed to fetch the next question');
+    }
+    
+    const data = await response.json();
+    adaptiveProgress = data.progress;
+    
+    if (data.done) {
+        adaptiveDone = true;
+    } else {
+        questions.push(data.question);
+    }
+}
+
 /**
  * Display a question
  * @param {number} index - The index of the question to display
@@ -126,6 +437,10 @@ function showQuestion(index) {
     
     // Update button states
     updateButtonStates();
+    
+    // Autosave the position with the next patch
+    positionDirty = true;
+    scheduleAutosave(AUTOSAVE_DELAY);
 }
 
 /**
@@ -153,7 +468,7 @@ function createLikertOptions(question) {
             optionDiv.classList.add('selected');
             
             // Save answer
-            answers[question.id] = option;
+            setAnswer(question.id, option, AUTOSAVE_CHOICE_DELAY);
             
             // Update button states
             updateButtonStates();
@@ -188,7 +503,7 @@ function createScenarioOptions(question) {
             optionDiv.classList.add('selected');
             
             // Save answer
-            answers[question.id] = option;
+            setAnswer(question.id, option, AUTOSAVE_CHOICE_DELAY);
             
             // Update button states
             updateButtonStates();
@@ -248,7 +563,7 @@ function createOpenEndedInput(question) {
             wordCountDisplay.textContent = countText;
             
             // Save answer
-            answers[question.id] = textarea.value;
+            setAnswer(question.id, textarea.value, AUTOSAVE_DELAY);
             
             // Update button states
             updateButtonStates();
@@ -256,7 +571,7 @@ function createOpenEndedInput(question) {
     } else {
         // Save answer on input
         textarea.addEventListener('input', () => {
-            answers[question.id] = textarea.value;
+            setAnswer(question.id, textarea.value, AUTOSAVE_DELAY);
             
             // Update button states
             updateButtonStates();
@@ -284,7 +599,24 @@ function showPreviousQuestion() {
 /**
  * Show the next question
  */
-function showNextQuestion() {
+async function showNextQuestion() {
+    if (adaptiveMode && currentQuestionIndex === questions.length - 1 && !adaptiveDone) {
+        if (nextButton) nextButton.disabled = true;
+        try {
+            await fetchNextAdaptiveQuestion();
+        } catch (error) {
+            console.error('Error fetching next question:', error);
+            alert('There was an error loading the next question. Please try again.');
+        }
+        
+        if (adaptiveDone) {
+            // Precision reached: the answered questions can be submitted
+            updateProgress();
+            updateButtonStates();
+            return;
+        }
+    }
+    
     if (currentQuestionIndex < questions.length - 1) {
         currentQuestionIndex++;
         showQuestion(currentQuestionIndex);
@@ -297,6 +629,13 @@ function showNextQuestion() {
 function updateProgress() {
     if (!progressBar || !progressText || questions.length === 0) return;
     
+    if (adaptiveMode) {
+        // The number of questions is not known in advance
+        progressBar.style.width = `${adaptiveProgress * 100}%`;
+        progressText.textContent = `Question ${currentQuestionIndex + 1}`;
+        return;
+    }
+    
     const progress = ((currentQuestionIndex + 1) / questions.length) * 100;
     progressBar.style.width = `${progress}%`;
     progressText.textContent = `Question ${currentQuestionIndex + 1} of ${questions.length}`;
@@ -315,13 +654,16 @@ function updateButtonStates() {
     const currentQuestion = questions[currentQuestionIndex];
     const hasAnswer = answers[currentQuestion.id] !== undefined;
     
-    nextButton.disabled = currentQuestionIndex >= questions.length - 1 || !hasAnswer;
+    const isLastQuestion = currentQuestionIndex === questions.length - 1;
+    const moreQuestions = adaptiveMode ? !isLastQuestion || !adaptiveDone : !isLastQuestion;
+    
+    nextButton.disabled = !moreQuestions || !hasAnswer;
     
     // Submit button is enabled on last question if all questions are answered
-    const isLastQuestion = currentQuestionIndex === questions.length - 1;
+    // (and, in adaptive mode, once no further question is needed)
     const allAnswered = questions.every(q => answers[q.id] !== undefined);
     
-    submitButton.disabled = !isLastQuestion || !allAnswered;
+    submitButton.disabled = !isLastQuestion || !allAnswered || (adaptiveMode && !adaptiveDone);
 }
 
 /**
@@ -337,16 +679,12 @@ async function submitTest() {
     if (submitButton) submitButton.disabled = true;
     
     try {
-        // Submit answers to API
-        const response = await fetch('/api/submit', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                user_id: generateUserId(),
-                answers: answers
-            })
+        // Submit answers to API; the attempt ID makes retries safe, the
+        // server answers a repeated attempt from storage
+        const response = await postWithRetry('/api/submit', {
+            user_id: generateUserId(),
+            attempt_id: attemptId,
+            answers: answers
         });
         
         if (!response.ok) {
@@ -355,8 +693,17 @@ async function submitTest() {
         
         const result = await response.json();
         
-        // Redirect to results page
-        window.location.href = '/results';
+        if (response.status === 202 && result.queued) {
+            // Offline: the service worker submits the answers once the connection is back
+            queuedAttemptId = result.attempt_id;
+            if (autosaveTimer) clearTimeout(autosaveTimer);
+            autosaveTimer = null;
+            if (testContainer) testContainer.style.display = 'none';
+            if (offlineNotice) offlineNotice.style.display = 'block';
+            return;
+        }
+        
+        finishSubmission();
     } catch (error) {
         console.error('Error submitting test:', error);
         alert('There was an error submitting your test. Please try again.');
@@ -367,6 +714,56 @@ async function submitTest() {
     }
 }
 
+/**
+ * POST a JSON payload, retrying network and server errors with exponential backoff
+ * @param {string} url - The endpoint
+ * @param {Object} payload - The request body
+ * @returns {Promise<Response>} The last response
+ */
+async function postWithRetry(url, payload) {
+    const body = JSON.stringify(payload);
+    
+    for (let attempt = 0; ; attempt++) {
+        try {
+            const response = await fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: body
+            });
+            
+            if (response.status < 500 || attempt >= SUBMIT_RETRIES) {
+                return response;
+            }
+        } catch (error) {
+            if (attempt >= SUBMIT_RETRIES) {
+                throw error;
+            }
+        }
+        
+        await new Promise(resolve => setTimeout(resolve, SUBMIT_RETRY_DELAY * 2 ** attempt));
+    }
+}
+
+/**
+ * Forget the submitted attempt and show its results
+ */
+function finishSubmission() {
+    // The server dropped the draft with the submission
+    if (autosaveTimer) clearTimeout(autosaveTimer);
+    autosaveTimer = null;
+    attemptId = null;
+    try {
+        localStorage.removeItem(ATTEMPT_STORAGE_KEY);
+    } catch (error) {
+        // Storage unavailable
+    }
+    
+    // Redirect to results page
+    window.location.href = '/results';
+}
+
 /**
  * Check if all questions have been answered
  * @returns {boolean} True if all questions are answered
@@ -383,5 +780,16 @@ function generateUserId() {
     return 'user_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
 }
 
+/**
+ * Generate the ID of a test attempt, sent with every try of its submission
+ * @returns {string} A unique attempt ID
+ */
+function generateAttemptId() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return 'attempt_' + Date.now() + '_' + Math.random().toString(36).substr(2, 12);
+}
+
 // Initialize the test when the DOM is loaded
 document.addEventListener('DOMContentLoaded', initTest); 
\ No newline at end of file
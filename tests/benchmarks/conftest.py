@@ -0,0 +1,142 @@
+"""
+Timing fixtures for the benchmark suite.
+
+Each benchmark is timed over repeated rounds and summarized by its median.
+Timings are written to results.json after every run and compared with
+baseline.json; a benchmark fails when its median is slower than the
+baseline by more than --benchmark-threshold. Run with --benchmark-update to
+add the timings to the baseline, which keeps the medians of the last
+BASELINE_SAMPLES updating runs and compares against their median, so one
+unusually fast or slow process does not set the bar. After a hardware
+change, delete baseline.json and update a few times.
+"""
+
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+RESULTS_PATH = Path(__file__).with_name('results.json')
+BASELINE_SAMPLES = 5
+
+
+class BenchmarkRecorder:
+    """Time benchmarks and check them against the baseline."""
+
+    def __init__(self, baseline, threshold, update):
+        """
+        Initialize the recorder.
+
+        Args:
+            baseline (dict): Benchmark name -> recorded statistics
+            threshold (float): Allowed relative slowdown of the median
+            update (bool): Record timings without checking them
+        """
+        self.baseline = baseline
+        self.threshold = threshold
+        self.update = update
+        self.results = {}
+
+    def measure(self, name, func, min_time=0.5, min_rounds=5, max_rounds=10000):
+        """
+        Time a function and check it against the baseline.
+
+        Args:
+            name (str): Benchmark name, the key in the baseline file
+            func (callable): The code to time, called without arguments
+            min_time (float): Minimum total seconds spent timing
+            min_rounds (int): Minimum number of timed calls
+            max_rounds (int): Maximum number of timed calls
+
+        Returns:
+            dict: Timing statistics in seconds
+        """
+        func()  # Warm up caches and lazy initialization
+
+        timings = []
+        started = time.perf_counter()
+        while len(timings) < max_rounds and (len(timings) < min_rounds or time.perf_counter() - started < min_time):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+
+        stats = {
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "min": min(timings),
+            "p95": float(np.percentile(timings, 95)),
+            "rounds": len(timings)
+        }
+        self.results[name] = stats
+
+        reference = self.baseline.get(name)
+        if not self.update and reference:
+            limit = reference["median"] * (1 + self.threshold)
+            if stats["median"] > limit:
+                pytest.fail(
+                    f"{name} regressed: median {stats['median'] * 1000:.3f} ms against a baseline of "
+                    f"{reference['median'] * 1000:.3f} ms (limit {limit * 1000:.3f} ms)"
+                )
+        return stats
+
+
+def _environment():
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "numpy": np.__version__,
+        "recorded_at": datetime.utcnow().isoformat(timespec='seconds')
+    }
+
+
+@pytest.fixture(scope='session')
+def bench_app(tmp_path_factory):
+    """An app on a fresh database, so persistence timings do not depend on earlier runs."""
+    from app import create_app
+
+    app = create_app('testing', {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path_factory.mktemp('bench') / 'bench.db'}",
+        'SCORE_MATRIX_DIR': str(tmp_path_factory.mktemp('matrix'))
+    })
+    yield app
+
+
+@pytest.fixture(scope='session')
+def bench(request):
+    """Session-wide benchmark recorder; writes results (and the baseline) at the end."""
+    baseline = {}
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text()).get("benchmarks", {})
+
+    recorder = BenchmarkRecorder(
+        baseline,
+        request.config.getoption('--benchmark-threshold'),
+        request.config.getoption('--benchmark-update')
+    )
+    yield recorder
+
+    if not recorder.results:
+        return
+
+    RESULTS_PATH.write_text(json.dumps(
+        {"environment": _environment(), "benchmarks": recorder.results}, indent=2, sort_keys=True
+    ) + "\n")
+
+    if recorder.update:
+        updated = dict(baseline)
+        for name, stats in recorder.results.items():
+            samples = (baseline.get(name, {}).get("samples", []) + [stats["median"]])[-BASELINE_SAMPLES:]
+            updated[name] = dict(stats, samples=samples, median=statistics.median(samples))
+
+        BASELINE_PATH.write_text(json.dumps(
+            {"environment": _environment(), "benchmarks": updated}, indent=2, sort_keys=True
+        ) + "\n")
@@ -0,0 +1,83 @@
+"""
+Performance benchmarks for scoring, analysis, persistence and submission.
+
+Run with ``pytest tests/benchmarks --run-benchmarks``.
+"""
+
+import random
+
+import pytest
+
+from src.models.result_model import TestResult
+from src.utils.ai_analyzer import ResponseAnalyzer
+from src.utils.synthetic import ANSWER_SIZES, generate_questions, generate_answers, generate_text
+
+
+pytestmark = pytest.mark.benchmark
+
+BANK_SIZES = {"18": 18, "1k": 1000, "10k": 10000}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    """A response analyzer with its reference models built."""
+    return ResponseAnalyzer()
+
+
+@pytest.mark.parametrize('bank', BANK_SIZES)
+def test_calculate_scores(bench, bank):
+    """Benchmark scoring one attempt that answers the whole bank."""
+    questions = generate_questions(BANK_SIZES[bank])
+    answers = generate_answers(questions, answer_size='tiny')
+
+    bench.measure(f"calculate_scores[{bank}]", lambda: TestResult(1, answers).calculate_scores(questions))
+
+
+@pytest.mark.parametrize('size', ANSWER_SIZES)
+def test_analyze_open_ended_response(bench, analyzer, size):
+    """Benchmark analyzing one open-ended answer."""
+    text = generate_text(ANSWER_SIZES[size], random.Random(0))
+
+    bench.measure(f"analyze_open_ended_response[{size}]",
+                  lambda: analyzer.analyze_open_ended_response(text, "persuasion"))
+
+
+@pytest.mark.parametrize('bank', BANK_SIZES)
+def test_analyze_response_patterns(bench, analyzer, bank):
+    """Benchmark the response pattern analysis of one attempt."""
+    answers = generate_answers(generate_questions(BANK_SIZES[bank]), answer_size='tiny')
+
+    bench.measure(f"analyze_response_patterns[{bank}]", lambda: analyzer.analyze_response_patterns(answers))
+
+
+@pytest.mark.parametrize('bank', ["18", "1k"])
+def test_save_test_result(bench, bench_app, bank):
+    """Benchmark persisting one scored attempt (answers, norms, rollups, commit)."""
+    from src.data.database import save_test_result
+
+    questions = generate_questions(BANK_SIZES[bank])
+    answers = generate_answers(questions)
+    result = TestResult(1, answers)
+    scores = result.calculate_scores(questions)
+    result.generate_analysis()
+
+    with bench_app.app_context():
+        bench.measure(
+            f"save_test_result[{bank}]",
+            lambda: save_test_result(1, answers, scores, result.analysis, result.recommendations),
+            min_rounds=3
+        )
+
+
+@pytest.mark.parametrize('size', ANSWER_SIZES)
+def test_submit_round_trip(bench, bench_app, size):
+    """Benchmark a full /api/submit request against the seeded question bank."""
+    client = bench_app.test_client()
+    questions = client.get('/api/questions').get_json()
+    answers = generate_answers(questions, answer_size=size)
+
+    def submit():
+        response = client.post('/api/submit', json={"user_id": 1, "answers": answers})
+        assert response.status_code == 200
+
+    bench.measure(f"submit_round_trip[{size}]", submit, min_rounds=3)
@@ -3,23 +3,54 @@ Pytest configuration file with fixtures for testing.
 """
 
 import os
+import shutil
 import tempfile
+from contextlib import contextmanager
 import pytest
 from app import create_app
+from src.data.database import db
 from src.utils.cli import register_cli
 
 
+def pytest_addoption(parser):
+    """Add the benchmark options."""
+    group = parser.getgroup('benchmarks')
+    group.addoption('--run-benchmarks', action='store_true', default=False,
+                    help='Run the performance benchmarks in tests/benchmarks')
+    group.addoption('--benchmark-update', action='store_true', default=False,
+                    help='Record the measured timings as the new baseline')
+    group.addoption('--benchmark-threshold', type=float, default=0.5,
+                    help='Allowed slowdown against the baseline (0.5 = 50%%)')
+
+
+def pytest_configure(config):
+    """Register the benchmark marker."""
+    config.addinivalue_line('markers', 'benchmark: performance benchmark, run with --run-benchmarks')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless they were asked for."""
+    if config.getoption('--run-benchmarks'):
+        return
+    
+    skip = pytest.mark.skip(reason='benchmarks run with --run-benchmarks')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
 @pytest.fixture
 def app():
     """Create and configure a Flask app for testing."""
-    # Create a temporary file to isolate the database for each test
-    db_fd, db_path = tempfile.mkstemp()
+    # Create a temporary directory to isolate the database and caches for each test
+    tmp_dir = tempfile.mkdtemp()
     
     # Create the app with test configuration
-    app = create_app('testing')
-    app.config.update({
+    app = create_app('testing', {
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp_dir, 'app.db')}",
+        'SCORE_MATRIX_DIR': os.path.join(tmp_dir, 'score_matrix'),
+        'FRAGMENT_CACHE_DIR': os.path.join(tmp_dir, 'fragments'),
         'WTF_CSRF_ENABLED': False,
         'SERVER_NAME': 'localhost',  # Add server name for url_for to work in tests
     })
@@ -35,8 +66,9 @@ def app():
     yield app
 
     # Close and remove the temporary database
-    os.close(db_fd)
-    os.unlink(db_path)
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
 @pytest.fixture
@@ -51,6 +83,25 @@ def runner(app):
     return app.test_cli_runner()
 
 
+@pytest.fixture
+def query_budget(app):
+    """
+    Assert that a block issues at most a number of SQL statements.
+    
+    Usage: ``with query_budget(5): client.post('/api/submit', ...)``
+    """
+    from src.utils.query_stats import query_stats
+    
+    @contextmanager
+    def budget(limit):
+        with query_stats.record() as recorder:
+            yield recorder
+        assert recorder.count <= limit, \
+            f"{recorder.count} SQL statements, budget {limit}:\n{recorder.report()}"
+    
+    return budget
+
+
 @pytest.fixture
 def sample_questions():
     """Return a list of sample questions for testing."""
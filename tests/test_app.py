@@ -196,4 +196,701 @@ def test_database_models(app):
         # Clean up
         db.session.delete(user)
         db.session.delete(question)
-        db.session.commit() 
\ No newline at end of file
+        db.session.commit() 
+
+def test_result_api_uses_cache_and_invalidates(client, app):
+    """Test that result views are cached and dropped when the result changes."""
+    from src.utils.result_cache import result_cache
+    
+    with app.app_context():
+        test_result = TestResult(
+            user_id=1,
+            overall_score=3.5,
+            scores_json=json.dumps({"persuasion": 3.5, "overall": 3.5}),
+            analysis_json=json.dumps({"overall_assessment": "Good sales potential."}),
+            recommendations_json=json.dumps([])
+        )
+        db.session.add(test_result)
+        db.session.commit()
+        result_id = test_result.id
+    
+    result_cache.clear()
+    
+    # Only the result submitted in the caller's session is served
+    assert client.get(f'/api/results/{result_id}').status_code == 404
+    with client.session_transaction() as sess:
+        sess['test_result_id'] = result_id
+    
+    # First read misses, second read is served from the cache
+    assert client.get(f'/api/results/{result_id}').status_code == 200
+    response = client.get(f'/api/results/{result_id}')
+    assert json.loads(response.data)['scores']['persuasion'] == 3.5
+    
+    stats = json.loads(client.get('/api/cache/stats').data)['results']
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['memory_bytes'] > 0
+    
+    # Rescoring the result invalidates the cached view
+    with app.app_context():
+        test_result = db.session.get(TestResult, result_id)
+        test_result.scores_json = json.dumps({"persuasion": 4.5, "overall": 4.5})
+        db.session.commit()
+    
+    response = client.get(f'/api/results/{result_id}')
+    assert json.loads(response.data)['scores']['persuasion'] == 4.5
+    
+    # Deleting the result invalidates it too
+    with app.app_context():
+        db.session.delete(db.session.get(TestResult, result_id))
+        db.session.commit()
+    
+    assert client.get(f'/api/results/{result_id}').status_code == 404
+
+
+def test_results_page_served_from_fragment_cache(client, app):
+    """Test that repeat views of a results page skip the template render."""
+    from src.utils.fragment_cache import fragment_cache
+    
+    with app.app_context():
+        test_result = TestResult(
+            user_id=1,
+            overall_score=4.0,
+            scores_json=json.dumps({"negotiation": 4.0, "overall": 4.0}),
+            analysis_json=json.dumps({"overall_assessment": "Strong sales aptitude."}),
+            recommendations_json=json.dumps([])
+        )
+        db.session.add(test_result)
+        db.session.commit()
+        result_id = test_result.id
+    
+    fragment_cache.clear()
+    with client.session_transaction() as session:
+        session['test_result_id'] = result_id
+    
+    first = client.get('/results')
+    second = client.get('/results')
+    assert first.data == second.data
+    assert b'Strong sales aptitude' in second.data
+    
+    stats = fragment_cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    
+    # The cached page is ranked against the current norms on every view
+    import numpy as np
+    from src.utils.percentiles import NORM_BIN_COUNT, score_bin, score_norms
+    
+    def norms_at(score):
+        counts = np.zeros(NORM_BIN_COUNT, dtype=np.int64)
+        counts[score_bin(score)] = 100
+        return {"negotiation": counts}
+    
+    try:
+        score_norms.set_histograms(norms_at(1.0))
+        assert b'Top 1%' in client.get('/results').data
+        score_norms.set_histograms(norms_at(5.0))
+        assert b'Top 100%' in client.get('/results').data
+    finally:
+        score_norms.clear()
+    assert fragment_cache.stats()['hits'] == 3
+    
+    # Deleting the result drops its cached page
+    with app.app_context():
+        db.session.delete(db.session.get(TestResult, result_id))
+        db.session.commit()
+    
+    response = client.get('/results')
+    assert b'No Test Results Found' in response.data
+
+
+def test_prefork_preload(client, app):
+    """Test that preloading fills the shared catalog and freezes it for forking."""
+    import gc
+    from src.data.catalog import question_catalog
+    from src.utils.prefork import preload
+    
+    question_catalog.clear()
+    try:
+        report = preload(app)
+    finally:
+        gc.unfreeze()
+    
+    assert question_catalog.loaded
+    assert report['frozen_objects'] > 0
+    assert report['after']['rss'] > 0
+    
+    # The pre-serialized payload matches the per-question serialization
+    response = client.get('/api/questions')
+    assert json.loads(response.data) == [q.to_dict() for q in question_catalog.questions]
+    
+    # Filtered requests are served from the same catalog
+    response = client.get('/api/questions?categories=negotiation')
+    assert all(q['category'] == 'negotiation' for q in json.loads(response.data))
+
+
+def test_readiness_after_warm_up(client, app):
+    """Test that the readiness probe reports ready only after warm-up."""
+    from src.utils.warmup import warm_up
+    
+    app.extensions['readiness']['ready'] = False
+    assert client.get('/readyz').status_code == 503
+    assert client.get('/healthz').status_code == 200
+    
+    with app.app_context():
+        results_before = TestResult.query.count()
+    
+    state = warm_up(app)
+    assert state['ready'] and state['warmed_up']
+    
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert json.loads(response.data)['warmup_seconds'] is not None
+    
+    # The synthetic submission was rolled back
+    with app.app_context():
+        assert TestResult.query.count() == results_before
+
+
+def test_submit_reports_percentiles(client, app):
+    """Test that submissions are ranked against the stored score norms."""
+    low = {"1": "Disagree", "2": "Disagree"}
+    high = {"1": "Strongly Agree", "2": "Strongly Agree"}
+    
+    client.post('/api/submit', json={"user_id": 1, "answers": low})
+    response = client.post('/api/submit', json={"user_id": 1, "answers": high})
+    percentiles = json.loads(response.data)['percentiles']
+    
+    # The top score in the norm group ranks above every lower score
+    assert percentiles['relationship_building'] > 50
+    assert 0 <= percentiles['overall'] <= 100
+    
+    # The result API ranks the stored scores too
+    with app.app_context():
+        result_id = TestResult.query.order_by(TestResult.id.desc()).first().id
+    data = json.loads(client.get(f'/api/results/{result_id}').data)
+    assert 'relationship_building' in data['percentiles']
+
+
+def test_submit_batch_api(client, app):
+    """Test the API endpoint for submitting many attempts at once."""
+    attempts = [
+        {"user_id": 1, "answers": {"1": "Agree", "2": "Neutral"}},
+        {"user_id": 1, "answers": {}},
+        {"user_id": 1, "answers": {"3": "Strongly Agree", "16": "I listen first and ask questions."}},
+        {"user_id": 1, "answers": {"1": None}}
+    ]
+    
+    response = client.post('/api/submit/batch', json={"attempts": attempts})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['saved'] == 2
+    assert data['failed'] == 2
+    
+    first, invalid, last, non_string = data['results']
+    assert invalid['error'] == 'No answers provided'
+    assert 'result_id' not in invalid
+    assert non_string['error'] == 'Answers must be strings'
+    
+    # Scores match the single-submission scoring path
+    from src.data.catalog import question_catalog
+    from src.models.result_model import TestResult as ScoringResult
+    with app.app_context():
+        assert first['scores'] == ScoringResult(1, attempts[0]['answers']).calculate_scores(question_catalog.questions)
+        
+        saved = db.session.get(TestResult, first['result_id'])
+        assert saved.to_dict()['scores'] == first['scores']
+        assert Answer.query.filter_by(test_result_id=last['result_id']).count() == 2
+    
+    assert '16' in last['open_ended_scores']
+    
+    # Empty batches are rejected
+    assert client.post('/api/submit/batch', json={"attempts": []}).status_code == 400
+
+
+def test_dashboard_api_reads_rollups(client, app):
+    """Test that the dashboard reflects submissions through the daily rollups."""
+    before = json.loads(client.get('/api/dashboard?days=1').data)
+    
+    client.post('/api/submit', json={"user_id": 1, "answers": {"1": "Strongly Agree"}})
+    client.post('/api/submit/batch', json={"attempts": [{"user_id": 1, "answers": {"1": "Disagree"}}]})
+    
+    after = json.loads(client.get('/api/dashboard?days=1').data)
+    assert after['results'] == before['results'] + 2
+    
+    category = after['categories']['relationship_building']
+    previous = before['categories'].get('relationship_building', {"count": 0, "histogram": [0] * 10})
+    assert category['count'] == previous['count'] + 2
+    assert category['histogram'][9] == previous['histogram'][9] + 1
+    assert category['histogram'][4] == previous['histogram'][4] + 1
+    assert after['trend'][-1]['count'] == after['results']
+    assert 0 <= after['pass_rate'] <= 1
+
+
+def test_adaptive_next_question_api(client, app):
+    """Test that adaptive mode serves each question once and then stops."""
+    from src.utils.adaptive import adaptive_bank
+    
+    answers = {}
+    served = []
+    while True:
+        data = json.loads(client.post('/api/adaptive/next', json={"answers": answers}).data)
+        if data['done']:
+            break
+        question = data['question']
+        assert str(question['id']) not in answers
+        served.append(question['id'])
+        answers[str(question['id'])] = question['options'][3] if question.get('options') else "I ask questions first."
+    
+    # The 18-question bank is too small to reach the target precision, so every
+    # item is asked, open-ended questions last
+    assert len(served) == 18
+    assert data['progress'] == 1.0
+    assert all(estimate['se'] < 1.0 for estimate in data['estimates'].values())
+    
+    # A looser precision target stops before the bank is exhausted
+    adaptive_bank.se_target = 0.9
+    try:
+        data = json.loads(client.post('/api/adaptive/next', json={"answers": {"1": "Agree"}}).data)
+        assert data['estimates']['relationship_building']['se'] < 0.9
+        assert data['question']['category'] != 'relationship_building'
+    finally:
+        adaptive_bank.se_target = app.config['ADAPTIVE_SE_TARGET']
+    
+    # The test page switches to adaptive mode on request
+    assert b'data-mode="adaptive"' in client.get('/test?mode=adaptive').data
+
+
+def test_submit_flags_near_duplicate_answers(client, app):
+    """Test that copied open-ended answers are flagged against earlier results."""
+    text = "I would first listen to the client's concerns, then ask open questions about their budget and timeline before proposing options."
+    
+    first = json.loads(client.post('/api/submit', json={"user_id": 1, "answers": {"16": text}}).data)
+    assert '16' not in first['duplicate_answers']
+    
+    with app.app_context():
+        first_id = TestResult.query.order_by(TestResult.id.desc()).first().id
+    
+    # A lightly edited copy, submitted to another question, is still caught
+    copied = text.replace("open questions", "open-ended questions").upper()
+    second = json.loads(client.post('/api/submit', json={"user_id": 1, "answers": {"17": copied}}).data)
+    matches = second['duplicate_answers']['17']
+    assert {"result_id": first_id, "question_id": 16} == {k: matches[0][k] for k in ("result_id", "question_id")}
+    assert matches[0]['similarity'] >= app.config['DUPLICATE_THRESHOLD']
+    
+    # Unrelated answers are not flagged
+    other = json.loads(client.post('/api/submit', json={
+        "user_id": 1, "answers": {"18": "Cold calling taught me to keep a steady routine and track every follow-up."}
+    }).data)
+    assert other['duplicate_answers'] == {}
+
+
+def test_rank_candidates_for_role(client, app, tmp_path):
+    """Test ranking candidates against a weighted role profile."""
+    from src.utils.score_matrix import score_matrix
+    
+    app.config.update(SCORE_MATRIX_DIR=str(tmp_path / 'matrix'), SCORE_MATRIX_REFRESH_INTERVAL=0)
+    score_matrix.init_app(app)
+    
+    response = client.post('/api/roles', json={
+        "name": f"Enterprise AE {tmp_path.name}",
+        "weights": {"negotiation": 3, "persuasion": 1}
+    })
+    assert response.status_code == 201
+    role_id = json.loads(response.data)['id']
+    assert client.post('/api/roles', json={"name": "Bad", "weights": {"charisma": 1}}).status_code == 400
+    
+    # Three candidates, the best negotiator submitting twice
+    from datetime import datetime
+    since = datetime.utcnow().isoformat()
+    with app.app_context():
+        from src.data.database import save_test_result
+        ids = {}
+        for user_id, negotiation, persuasion in ((9001, 4.5, 2.0), (9002, 3.0, 5.0), (9003, 1.0, 1.0), (9001, 2.0, 2.0)):
+            scores = {"negotiation": negotiation, "persuasion": persuasion, "overall": 3.0}
+            ids.setdefault(user_id, save_test_result(user_id, {"1": "Agree"}, scores, {}, []).id)
+    
+    data = json.loads(client.get(f'/api/roles/{role_id}/candidates?per_page=2&since={since}').data)
+    assert data['total'] == 3
+    top = data['candidates']
+    assert [c['result_id'] for c in top] == [ids[9001], ids[9002]]
+    assert top[0]['fit'] == pytest.approx((3 * 4.5 + 2.0) / 4, abs=1e-3)
+    assert top[0]['rank'] == 1
+    
+    # Later pages continue the ranking; each candidate appears once
+    page_two = json.loads(client.get(f'/api/roles/{role_id}/candidates?per_page=2&page=2&since={since}').data)
+    assert [c['result_id'] for c in page_two['candidates']] == [ids[9003]]
+    assert ids[9001] not in [c['result_id'] for c in page_two['candidates']]
+    
+    # Filters narrow the ranked set
+    only = json.loads(client.get(f'/api/roles/{role_id}/candidates?user_id=9003').data)
+    assert only['total'] == 1
+    assert only['candidates'][0]['result_id'] == ids[9003]
+
+
+def test_similar_candidates_api(client, app, tmp_path):
+    """Test nearest-neighbour search over category score vectors."""
+    from src.data.database import save_test_result
+    from src.utils.score_matrix import score_matrix
+    from src.utils.similar import similar_index
+    
+    app.config.update(SCORE_MATRIX_DIR=str(tmp_path / 'matrix'), SCORE_MATRIX_REFRESH_INTERVAL=0,
+                      SIMILAR_INDEX_REBUILD_SIZE=2)
+    score_matrix.init_app(app)
+    similar_index.init_app(app)
+    
+    profiles = {
+        9101: {"negotiation": 4.8, "persuasion": 4.6, "resilience": 1.5},
+        9102: {"negotiation": 4.7, "persuasion": 4.5, "resilience": 1.6},  # Near the reference
+        9103: {"negotiation": 1.2, "persuasion": 1.0, "resilience": 4.9},
+        9104: {"negotiation": 4.2, "persuasion": 4.0, "resilience": 2.2}
+    }
+    with app.app_context():
+        ids = {user_id: save_test_result(user_id, {"1": "Agree"}, dict(scores, overall=3.0), {}, []).id
+               for user_id, scores in profiles.items()}
+    
+    data = json.loads(client.get(f'/api/results/{ids[9101]}/similar?k=50').data)
+    found = [c['result_id'] for c in data['candidates']]
+    assert ids[9101] not in found
+    assert found.index(ids[9102]) < found.index(ids[9104]) < found.index(ids[9103])
+    
+    # A result added after the index was built is found through the buffer
+    with app.app_context():
+        twin = save_test_result(9105, {"1": "Agree"}, dict(profiles[9101], overall=3.0), {}, []).id
+    data = json.loads(client.get(f'/api/results/{ids[9101]}/similar?k=1').data)
+    assert similar_index._buffer_rows == 1
+    assert data['candidates'][0]['result_id'] == twin
+    assert data['candidates'][0]['distance'] == 0
+    
+    assert client.get('/api/results/999999/similar').status_code == 404
+
+
+def test_stage_timings_and_metrics_endpoint(client, app):
+    """Test the Server-Timing header and the Prometheus metrics endpoint."""
+    from src.utils.metrics import metrics
+    
+    # Disabled: no header, no endpoint
+    response = client.post('/api/submit', json={"user_id": 1, "answers": {"1": "Agree"}})
+    assert 'Server-Timing' not in response.headers
+    assert client.get('/metrics').status_code == 404
+    
+    metrics.enabled = True
+    metrics.clear()
+    try:
+        response = client.post('/api/submit', json={"user_id": 1, "answers": {"1": "Agree", "16": "I listen first."}})
+        timing = response.headers['Server-Timing']
+        stages = [entry.split(';')[0] for entry in timing.split(', ')]
+        assert stages == ['catalog', 'scoring', 'analysis', 'patterns', 'feedback', 'duplicates', 'db_commit', 'total']
+        
+        client.get('/api/results/1')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        text = response.get_data(as_text=True)
+    finally:
+        metrics.enabled = False
+    
+    assert 'aptitude_requests_total{method="POST",endpoint="test.submit_test",status="200"} 1' in text
+    assert 'aptitude_stage_duration_seconds_bucket{stage="scoring",le="+Inf"} 1' in text
+    assert 'aptitude_stage_duration_seconds_count{stage="db_commit"} 1' in text
+    assert 'aptitude_request_duration_seconds_count{endpoint="test.get_result"} 1' in text
+    assert 'aptitude_cache_hit_ratio{cache="results"}' in text
+    assert 'aptitude_db_pool_checked_out' in text
+
+
+def test_submit_query_budget(client, app, query_budget, caplog):
+    """Test that submits and result views stay within their SQL statement budgets."""
+    from src.utils.query_stats import query_stats
+    from src.utils.synthetic import generate_answers
+    
+    questions = json.loads(client.get('/api/questions').data)
+    answers = generate_answers(questions)
+    client.post('/api/submit', json={"user_id": 1, "answers": answers})  # Loads the in-process indexes
+    
+    # One INSERT each for the result, its answers, norms, rollups and signatures,
+    # however many answers there are
+    with query_budget(5):
+        client.post('/api/submit', json={"user_id": 1, "answers": answers})
+    with query_budget(5):
+        client.post('/api/submit', json={"user_id": 1, "answers": {"1": "Agree", "2": "Neutral"}})
+    
+    with query_budget(1):
+        client.get('/results')
+    with query_budget(0):
+        client.get('/results')
+        client.get('/api/questions')
+    
+    # Lazy loading in a loop repeats one statement, flagged as a possible N+1 query
+    with app.app_context():
+        result_ids = [r.id for r in TestResult.query.order_by(TestResult.id.desc()).limit(3)]
+        with query_stats.record() as recorder:
+            for result_id in result_ids:
+                len(db.session.get(TestResult, result_id).answers)
+    assert any('FROM answers' in sql and count == 3 for sql, count in recorder.repeated(3))
+    
+    # Per-request statistics are logged when enabled
+    query_stats.per_request = True
+    try:
+        with caplog.at_level('INFO'):
+            client.get(f'/api/results/{result_ids[0]}')
+    finally:
+        query_stats.per_request = False
+    assert any(f'/api/results/{result_ids[0]}: ' in r.getMessage() and 'SQL statements' in r.getMessage()
+               for r in caplog.records)
+
+
+def test_warmed_worker_memory_budget(client, app):
+    """Test that a warmed worker's subsystems stay within their memory budgets."""
+    import tracemalloc
+    from src.utils.memory import MEMORY_BUDGETS, memory_report, start_tracing
+    from src.utils.result_cache import result_cache
+    from src.utils.fragment_cache import fragment_cache
+    from src.utils.synthetic import generate_answers
+    from src.utils.warmup import warm_up
+    
+    warm_up(app)
+    questions = json.loads(client.get('/api/questions').data)
+    for seed in range(10):
+        client.post('/api/submit', json={"user_id": 1, "answers": generate_answers(questions, seed=seed)})
+        client.get('/results')
+    
+    # Trace a few more sessions (tracing slows every allocation down)
+    tracing = tracemalloc.is_tracing()
+    start_tracing(5)
+    try:
+        for seed in range(10, 12):
+            client.post('/api/submit', json={"user_id": 1, "answers": generate_answers(questions, seed=seed)})
+            client.get('/results')
+        with app.app_context():
+            for result in TestResult.query.order_by(TestResult.id.desc()).limit(10):
+                client.get(f'/api/results/{result.id}')
+            report = memory_report(db.session, top=5)
+            # Load rows into the identity map, as a dashboard page would
+            TestResult.query.order_by(TestResult.id.desc()).limit(50).all()
+            identity_map = memory_report(db.session)['subsystems']['identity_map']
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    
+    subsystems = report['subsystems']
+    for name, size in subsystems.items():
+        assert not size['over_budget'], f"{name} uses {size['bytes']} bytes, budget {size['budget']}"
+    assert subsystems['analyzer']['bytes'] > 0 and subsystems['catalog']['bytes'] > 0
+    assert 0 < identity_map['bytes'] <= MEMORY_BUDGETS['identity_map']
+    
+    # Full caches, at the measured size per entry, still fit the budget
+    entries = result_cache.stats()['entries'] + fragment_cache.stats()['entries']
+    capacity = result_cache.max_entries + app.config['FRAGMENT_CACHE_SIZE']
+    assert subsystems['result_caches']['bytes'] / entries * capacity <= MEMORY_BUDGETS['result_caches']
+    
+    # Traced allocations are attributed to subsystems
+    traced = report['tracemalloc']
+    assert traced['traced_bytes'] > 0 and len(traced['top']) == 5
+    assert traced['subsystems']['result_caches'] > 0
+    
+    # The endpoint is off unless enabled
+    assert client.get('/debug/memory').status_code == 404
+    app.config['MEMORY_DIAGNOSTICS'] = True
+    data = json.loads(client.get('/debug/memory').data)
+    assert set(data['subsystems']) == set(MEMORY_BUDGETS)
+
+
+def test_write_behind_group_commit(client, app):
+    """Test that write-behind batches submissions into group commits and flushes them on close."""
+    from src.data.database import AttemptKey, get_attempt_result_id
+    from src.data.write_behind import group_writer
+    
+    answers = {"1": "Agree", "2": "Neutral"}
+    with app.app_context():
+        before = TestResult.query.count()
+        keys_before = AttemptKey.query.count()
+    
+    group_writer.enabled = True
+    try:
+        # Acknowledged on commit: the result is saved before the response
+        group_writer.ack = 'commit'
+        response = client.post('/api/submit', json={"user_id": 1, "answers": answers})
+        assert response.status_code == 200
+        with client.session_transaction() as session:
+            assert session['test_result_id']
+            assert 'pending_attempt' not in session
+        
+        # Acknowledged on enqueue: submissions arriving together share one batch
+        group_writer.ack = 'enqueue'
+        group_writer.max_delay = 0.5
+        batches = group_writer.batches
+        for _ in range(3):
+            assert client.post('/api/submit', json={"user_id": 1, "answers": answers}).status_code == 200
+        with client.session_transaction() as session:
+            assert 'test_result_id' not in session
+            attempt_id = session['pending_attempt']
+        
+        # The results page waits for the pending submission
+        response = client.get('/results')
+        assert b'Your Sales Aptitude Results' in response.data
+        assert group_writer.batches == batches + 1
+        with client.session_transaction() as session:
+            assert session['test_result_id']
+        with app.app_context():
+            assert get_attempt_result_id(attempt_id) == session['test_result_id']
+        
+        # Closing commits what is still queued
+        group_writer.max_delay = 10.0
+        client.post('/api/submit', json={"user_id": 1, "answers": answers})
+        with client.session_transaction() as session:
+            attempt_id = session['pending_attempt']
+        group_writer.close()
+        with app.app_context():
+            assert get_attempt_result_id(attempt_id) is not None
+            assert AttemptKey.query.count() == keys_before + 5
+            assert TestResult.query.count() == before + 5
+        assert group_writer.stats()["queued"] == 0
+        
+        # Closing disables write-behind: a late submit is saved directly
+        assert not group_writer.enabled
+        client.post('/api/submit', json={"user_id": 1, "answers": answers})
+        with client.session_transaction() as session:
+            assert session['test_result_id']
+            assert 'pending_attempt' not in session
+        assert group_writer._thread is None
+    finally:
+        group_writer.close()
+        group_writer.enabled = False
+        group_writer.ack = 'commit'
+        group_writer.max_delay = 0.005
+
+
+def test_submit_retry_is_idempotent(client, app, query_budget, monkeypatch):
+    """Test that a retried submission returns the stored response without saving or scoring again."""
+    import uuid
+    from src.frontend import test_routes
+    
+    attempt_id = uuid.uuid4().hex
+    answers = {"1": "Agree", "2": "Neutral"}
+    with app.app_context():
+        before = TestResult.query.count()
+    
+    first = client.post('/api/submit', json={"user_id": 1, "attempt_id": attempt_id, "answers": answers})
+    assert first.status_code == 200
+    assert 'Idempotent-Replayed' not in first.headers
+    
+    # The retry is answered from storage with one lookup, skipping the pipeline
+    def fail(*args, **kwargs):
+        raise AssertionError("retry was scored again")
+    monkeypatch.setattr(test_routes.analyzer, 'analyze_response_patterns', fail)
+    with client.session_transaction() as session:
+        session.clear()
+    with query_budget(1):
+        retry = client.post('/api/submit', json={"user_id": 1, "attempt_id": attempt_id, "answers": answers})
+    assert retry.status_code == 200
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert json.loads(retry.data) == json.loads(first.data)
+    
+    with app.app_context():
+        assert TestResult.query.count() == before + 1
+    with client.session_transaction() as session:
+        assert session['test_result_id']
+    
+    # Reusing the attempt ID for another submission does not reveal the result
+    other = app.test_client()
+    response = other.post('/api/submit', json={"user_id": 2, "attempt_id": attempt_id, "answers": answers})
+    assert response.status_code == 409
+    response = other.post('/api/submit', json={"user_id": 1, "attempt_id": attempt_id, "answers": {"1": "Agree"}})
+    assert response.status_code == 409
+    with other.session_transaction() as session:
+        assert 'test_result_id' not in session
+    
+    response = client.post('/api/submit', json={"user_id": 1, "attempt_id": "x" * 65, "answers": answers})
+    assert response.status_code == 400
+
+
+def test_autosave_draft_patches_and_resume(client, app):
+    """Test that autosave applies delta patches in order and the draft is resumed until submission."""
+    import uuid
+    
+    attempt_id = uuid.uuid4().hex
+    url = f'/api/drafts/{attempt_id}'
+    assert client.get(url).status_code == 404
+    
+    # Each patch only carries the changed answers
+    response = client.patch(url, json={"seq": 1, "changes": {"1": "Agree", "16": "I listen"}, "position": 1})
+    assert response.status_code == 200
+    assert json.loads(response.data) == {"seq": 1}
+    client.patch(url, json={"seq": 2, "changes": {"16": "I listen first, then ask questions", "2": "Neutral"}})
+    client.patch(url, json={"seq": 3, "changes": {"2": None}, "position": 2})
+    
+    # A delayed retry of an older patch is rejected
+    response = client.patch(url, json={"seq": 2, "changes": {"1": "Disagree"}})
+    assert response.status_code == 409
+    assert json.loads(response.data)["seq"] == 3
+    
+    assert client.patch(url, json={"seq": 4, "changes": {"99999": "Agree"}}).status_code == 400
+    assert client.patch(url, json={"seq": 0, "changes": {}}).status_code == 400
+    
+    draft = json.loads(client.get(url).data)
+    assert draft["answers"] == {"1": "Agree", "16": "I listen first, then ask questions"}
+    assert draft["seq"] == 3
+    assert draft["position"] == 2
+    
+    # The draft belongs to the session that saved it
+    other = app.test_client()
+    assert other.get(url).status_code == 404
+    assert other.patch(url, json={"seq": 9, "changes": {"1": "Disagree"}}).status_code == 404
+    assert json.loads(client.get(url).data)["seq"] == 3
+    
+    # Submitting the attempt drops its draft, and late patches do not bring it back
+    response = client.post('/api/submit', json={"user_id": 1, "attempt_id": attempt_id, "answers": draft["answers"]})
+    assert response.status_code == 200
+    assert client.get(url).status_code == 404
+    assert client.patch(url, json={"seq": 5, "changes": {"1": "Agree"}}).status_code == 409
+    assert client.get(url).status_code == 404
+
+
+def test_service_worker_served_from_root(client):
+    """Test that the service worker is served from the root and revalidated on every visit."""
+    response = client.get('/sw.js')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/javascript'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert b"'/api/questions'" in response.data
+    assert b'indexedDB' in response.data
+    
+    # The test page registers it
+    assert b"register('/sw.js')" in client.get('/static/js/test.js').data
+    assert b'offline-notice' in client.get('/test').data
+
+
+def test_concurrent_autosave_patches(app):
+    """Test that racing autosave patches are applied atomically, never failing or losing an applied change."""
+    import threading
+    import uuid
+    
+    attempt_id = uuid.uuid4().hex
+    barrier = threading.Barrier(8)
+    statuses = {}
+    
+    def candidate_client():
+        # Clients of the same candidate session, e.g. several open tabs
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['draft_owner'] = 'candidate'
+        return client
+    
+    def patch(seq):
+        client = candidate_client()
+        barrier.wait()
+        response = client.patch(f'/api/drafts/{attempt_id}', json={"seq": seq, "changes": {str(seq): "Agree"}})
+        statuses[seq] = response.status_code
+    
+    threads = [threading.Thread(target=patch, args=(seq,)) for seq in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    # Each patch either landed or was refused as stale; the newest always lands
+    assert set(statuses.values()) <= {200, 409}
+    assert statuses[8] == 200
+    draft = json.loads(candidate_client().get(f'/api/drafts/{attempt_id}').data)
+    assert draft["seq"] == 8
+    assert set(draft["answers"]) == {str(seq) for seq, status in statuses.items() if status == 200}
@@ -131,4 +131,283 @@ def test_delete_user_command(runner, app):
     # Verify the user was deleted
     with app.app_context():
         user = get_user_by_username('testcli')
-        assert user is None 
\ No newline at end of file
+        assert user is None 
+
+def test_precompile_templates_command(runner, app):
+    """Test the template precompile command."""
+    import os
+    
+    result = runner.invoke(app.cli, ['template-cli', 'precompile'])
+    
+    # Check the output
+    assert 'Compiled results.html' in result.output
+    assert 'Compiled test.html' in result.output
+    
+    # Verify the bytecode cache was filled
+    cache_dir = app.config['TEMPLATE_CACHE_DIR']
+    assert any(name.endswith('.cache') for name in os.listdir(cache_dir))
+
+
+def test_rebuild_norms_command(runner, app):
+    """Test the norms rebuild command."""
+    from src.data.database import TestResult, ScoreNormBin
+    
+    result = runner.invoke(app.cli, ['norms-cli', 'rebuild'])
+    
+    # Check the output
+    assert 'Norms rebuilt from' in result.output
+    
+    # Verify every scored result is counted once in the overall histogram
+    with app.app_context():
+        counted = db.session.query(db.func.sum(ScoreNormBin.count)).filter_by(category='overall').scalar() or 0
+        scored = sum(1 for r in TestResult.query.all() if r.to_dict()['scores'].get('overall') is not None)
+        assert counted == scored
+
+
+def test_export_results_command(runner, app, tmp_path):
+    """Test streaming results export with checkpoint resume."""
+    import json
+    from src.data.database import save_test_result
+    
+    with app.app_context():
+        first = save_test_result(1, {"1": "Agree"}, {"relationship_building": 4.0, "overall": 4.0}, {}, []).id
+    
+    output = tmp_path / 'results.jsonl'
+    checkpoint = tmp_path / 'checkpoint'
+    result = runner.invoke(app.cli, [
+        'export-cli', 'results', str(output), '--format', 'jsonl',
+        '--after-id', str(first - 1), '--checkpoint', str(checkpoint), '--batch-size', '1'
+    ])
+    assert 'Exported 1 results' in result.output
+    assert checkpoint.read_text() == str(first)
+    
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert records[0]['id'] == first
+    assert records[0]['answers'] == {"1": "Agree"}
+    
+    # A resumed export only appends results saved after the checkpoint
+    with app.app_context():
+        second = save_test_result(1, {"2": "Neutral"}, {"resilience": 3.0, "overall": 3.0}, {}, []).id
+    
+    result = runner.invoke(app.cli, [
+        'export-cli', 'results', str(output), '--format', 'jsonl', '--checkpoint', str(checkpoint)
+    ])
+    assert 'Exported 1 results' in result.output
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r['id'] for r in records] == [first, second]
+    
+    # CSV output flattens scores into columns
+    csv_output = tmp_path / 'results.csv'
+    runner.invoke(app.cli, ['export-cli', 'results', str(csv_output), '--after-id', str(first - 1)])
+    lines = csv_output.read_text().splitlines()
+    assert lines[0].startswith('id,user_id,username')
+    assert len(lines) == 3
+
+
+def test_import_attempts_command(runner, app, tmp_path):
+    """Test bulk scoring import of offline attempts."""
+    import json
+    from src.data.database import TestResult, Answer
+    
+    with app.app_context():
+        user = get_user_by_username('importcli')
+        if not user:
+            user = User(username='importcli', email='importcli@example.com',
+                        password_hash='pbkdf2:sha256:150000$abc123')
+            db.session.add(user)
+            db.session.commit()
+        user_id = user.id
+        results_before = TestResult.query.filter_by(user_id=user_id).count()
+    
+    path = tmp_path / 'attempts.jsonl'
+    path.write_text('\n'.join([
+        json.dumps({"user": "importcli", "answers": {"1": "Agree", "2": "Strongly Agree"}}),
+        json.dumps({"user": user_id, "answers": {"3": "Neutral"}, "timestamp": "2026-01-05T10:00:00"}),
+        json.dumps({"user": "nobody", "answers": {"1": "Agree"}}),
+        'not json',
+        json.dumps({"user": user_id, "answers": {"q1": "Agree"}}),
+        json.dumps({"user": user_id, "answers": {"1": None}})
+    ]))
+    
+    for workers in ('0', '2'):
+        result = runner.invoke(app.cli, ['import-cli', 'attempts', str(path), '--workers', workers, '--batch-size', '1'])
+        assert result.exit_code == 0
+        assert 'Imported 2 of 6 attempts' in result.output
+        assert 'Unknown user' in result.output
+        assert 'Invalid JSON' in result.output
+        assert 'Invalid question ID' in result.output
+        assert 'Invalid answer' in result.output
+    
+    with app.app_context():
+        results = TestResult.query.filter_by(user_id=user_id).order_by(TestResult.id).all()
+        assert len(results) == results_before + 4
+        
+        imported = results[-1].to_dict()
+        assert imported['timestamp'].startswith('2026-01-05')
+        assert 'pattern_analysis' in imported['analysis']
+        assert Answer.query.filter_by(test_result_id=results[-2].id).count() == 2
+
+
+def test_rebuild_rollups_command(runner, app):
+    """Test the rollups rebuild command."""
+    from src.data.database import TestResult, ScoreRollup
+    
+    result = runner.invoke(app.cli, ['rollups-cli', 'rebuild'])
+    
+    # Check the output
+    assert 'Rollups rebuilt from' in result.output
+    
+    # Verify every scored result is counted once in the overall rollups
+    with app.app_context():
+        counted = db.session.query(db.func.sum(ScoreRollup.count)).filter_by(category='overall').scalar() or 0
+        scored = sum(1 for r in TestResult.query.all() if r.to_dict()['scores'].get('overall') is not None)
+        assert counted == scored
+
+
+def test_analyze_items_command(runner, app):
+    """Test that incremental item analysis matches a full reanalysis."""
+    from src.data.database import save_test_result, ItemStatistic, CategoryReliability
+    
+    responses = ["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"]
+    with app.app_context():
+        for i in range(6):
+            answers = {str(qid): responses[(i + qid) % 5] for qid in (1, 2, 3)}
+            save_test_result(1, answers, {"overall": 3.0}, {}, [])
+    
+    result = runner.invoke(app.cli, ['items-cli', 'analyze'])
+    assert 'Item analysis covers' in result.output
+    
+    with app.app_context():
+        save_test_result(1, {"1": "Agree", "2": "Agree", "3": "Disagree"}, {"overall": 3.0}, {}, [])
+    
+    runner.invoke(app.cli, ['items-cli', 'analyze'])
+    with app.app_context():
+        incremental = {item.question_id: item.to_dict() for item in ItemStatistic.query}
+        alphas = {r.category: r.alpha for r in CategoryReliability.query}
+    
+    result = runner.invoke(app.cli, ['items-cli', 'analyze', '--full'])
+    with app.app_context():
+        full = {item.question_id: item.to_dict() for item in ItemStatistic.query}
+        assert alphas == {r.category: r.alpha for r in CategoryReliability.query}
+    
+    for question_id, item in full.items():
+        for key in ('responses', 'mean', 'difficulty', 'discrimination'):
+            assert incremental[question_id][key] == item[key]
+    assert full[1]['responses'] >= 7
+    assert 0 < full[1]['difficulty'] <= 1
+
+
+def test_duplicate_clusters_command(runner, app):
+    """Test clustering near-duplicate answers across stored results."""
+    from src.data.database import save_test_result
+    
+    text = "Build rapport, uncover the real objection, and tie the price back to measurable value for the customer."
+    with app.app_context():
+        ids = [
+            save_test_result(1, {"16": answer}, {"overall": 3.0}, {}, []).id
+            for answer in (text, text.upper(), text + " Always.", "Something entirely different about prospecting lists.")
+        ]
+    
+    result = runner.invoke(app.cli, ['duplicates-cli', 'clusters', '--limit', '100'])
+    assert 'clusters of near-duplicate answers' in result.output
+    
+    # The three copies form one cluster; the unrelated answer is in none
+    cluster_line = next(line for line in result.output.splitlines() if f"{ids[0]}/q16" in line)
+    assert f"{ids[1]}/q16" in cluster_line and f"{ids[2]}/q16" in cluster_line
+    assert f"{ids[3]}/q16" not in result.output
+
+
+def test_load_test_command(runner, app):
+    """Test replaying candidate sessions against the app served in-process."""
+    from src.utils.load_test import RampProfile, parse_stages
+    
+    profile = RampProfile(parse_stages(["2s:4", "1m:4", "2:0"]))
+    assert profile.duration == 64 and profile.peak == 4
+    assert profile.target(1) == 2 and profile.target(30) == 4 and profile.target(100) == 0
+    
+    result = runner.invoke(app.cli, [
+        'load-cli', 'run', '--concurrency', '2', '--duration', '60', '--sessions', '3', '--answer-size', 'tiny'
+    ])
+    assert result.exit_code == 0
+    assert '3 sessions (0 failed)' in result.output
+    for endpoint in ('/api/questions', '/api/submit', '/results'):
+        assert any(line.startswith(endpoint) and line.split()[1:3] == ['3', '0']
+                   for line in result.output.splitlines())
+    assert 'Database lock errors: 0' in result.output
+    
+    # The in-process server used a throwaway database
+    from src.data.database import TestResult
+    with app.app_context():
+        assert TestResult.query.count() == 0
+
+
+def test_profile_hotspots_command(runner, app, tmp_path):
+    """Test capturing sampled and slow request profiles and aggregating their hotspots."""
+    import glob
+    import json
+    from src.utils.profiler import request_profiler
+    
+    client = app.test_client()
+    answers = {"1": "Agree", "16": "I listen to the client before proposing anything."}
+    app.config['PROFILER_DIR'] = str(tmp_path)
+    settings = (request_profiler.enabled, request_profiler.directory, request_profiler.sample_rate,
+                request_profiler.slow_threshold, request_profiler.max_files)
+    request_profiler.enabled, request_profiler.directory, request_profiler.max_files = True, str(tmp_path), 3
+    try:
+        # Sampled requests run under cProfile
+        request_profiler.sample_rate = 1.0
+        client.post('/api/submit', json={"user_id": 1, "answers": answers})
+        
+        # Other requests are captured by the stack sampler only when slow
+        request_profiler.sample_rate, request_profiler.slow_threshold = 0.0, 10.0
+        client.get('/api/questions')
+        assert len(glob.glob(str(tmp_path / '*.json'))) == 1
+        
+        request_profiler.slow_threshold = 1e-9
+        for _ in range(3):
+            client.post('/api/submit', json={"user_id": 1, "answers": answers})
+    finally:
+        (request_profiler.enabled, request_profiler.directory, request_profiler.sample_rate,
+         request_profiler.slow_threshold, request_profiler.max_files) = settings
+    
+    # The directory keeps the newest captures; cProfile ones keep their raw profile
+    captures = sorted(glob.glob(str(tmp_path / '*.json')))
+    assert len(captures) == 3
+    modes = [json.load(open(path))['request']['mode'] for path in captures]
+    assert modes == ['sampling'] * 3
+    assert not glob.glob(str(tmp_path / '*.prof'))
+    
+    request_profiler.enabled, request_profiler.directory, request_profiler.sample_rate = True, str(tmp_path), 1.0
+    try:
+        client.post('/api/submit', json={"user_id": 1, "answers": answers})
+    finally:
+        request_profiler.enabled, request_profiler.directory, request_profiler.sample_rate = settings[:3]
+    assert len(glob.glob(str(tmp_path / '*.prof'))) == 1
+    
+    result = runner.invoke(app.cli, ['profile-cli', 'hotspots', '--mode', 'cprofile', '--sort', 'cumulative'])
+    assert '1 profiled requests' in result.output
+    assert 'submit_test' in result.output
+    
+    result = runner.invoke(app.cli, ['profile-cli', 'hotspots', '--endpoint', 'test.submit_test'])
+    assert '4 profiled requests' in result.output
+
+
+def test_purge_drafts_command(runner, app):
+    """Test that only drafts abandoned longer than the maximum age are purged."""
+    import uuid
+    from datetime import datetime, timedelta
+    from src.data.database import apply_draft_patch, get_draft
+    
+    stale_id, fresh_id = uuid.uuid4().hex, uuid.uuid4().hex
+    with app.app_context():
+        apply_draft_patch(stale_id, 'owner', 1, {"1": "Agree"})
+        apply_draft_patch(fresh_id, 'owner', 1, {"1": "Agree"})
+        get_draft(stale_id).updated_at = datetime.utcnow() - timedelta(days=10)
+        db.session.commit()
+    
+    result = runner.invoke(app.cli, ['drafts-cli', 'purge', '--max-age-days', '7'])
+    assert 'Deleted' in result.output
+    
+    with app.app_context():
+        assert get_draft(stale_id) is None
+        assert get_draft(fresh_id) is not None
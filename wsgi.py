@@ -0,0 +1,12 @@
+"""
+WSGI entry point for production servers.
+
+Run behind a pre-forking server with the app preloaded in the master, e.g.::
+
+    PREFORK=true gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+# Create the application instance once, before the server forks its workers
+app = create_app('production')